@@ -61,17 +61,17 @@ export class GrantsService {
   }
 
   async getFilters(): Promise<FilterOptions> {
-    const [sourceResult, currencyResult] = await Promise.all([
-      this.db.query<{ source_name: string }>(
-        'SELECT DISTINCT source_name FROM grants ORDER BY 1',
-      ),
-      this.db.query<{ currency: string }>(
-        'SELECT DISTINCT currency FROM grants WHERE currency IS NOT NULL ORDER BY 1',
-      ),
-    ]);
+    // grant_facets is maintained by the Python persistence path (GrantRepository.upsert_many)
+    const result = await this.db.query<{ facet: string; value: string }>(
+      'SELECT facet, value FROM grant_facets ORDER BY facet, value',
+    );
+    const values = (facet: string) =>
+      result.rows.filter((r) => r.facet === facet).map((r) => r.value);
     return {
-      source_names: sourceResult.rows.map((r) => r.source_name),
-      currencies: currencyResult.rows.map((r) => r.currency),
+      source_names: values('source_name'),
+      currencies: values('currency'),
+      academic_years: values('academic_year'),
+      categories: values('category'),
     };
   }
 
@@ -1,4 +1,6 @@
 export interface FilterOptions {
   source_names: string[];
   currencies: string[];
+  academic_years: string[];
+  categories: string[];
 }
@@ -1,7 +1,20 @@
-"""Database layer: connection, schema, and grant repository."""
+"""Database layer: connection, schema, grant repositories (PostgreSQL and in-memory), and details work queue."""
 
-from backend.db.connection import get_connection
-from backend.db.repository import GrantRepository
+from backend.db.connection import get_connection, get_repository
+from backend.db.memory import MemoryGrantRepository
+from backend.db.queue import DetailsQueue, QueueItem
+from backend.db.repository import FacetValue, GrantChange, GrantRepository, UpcomingGrant
 from backend.db.schema import create_tables
 
-__all__ = ["get_connection", "create_tables", "GrantRepository"]
+__all__ = [
+    "get_connection",
+    "get_repository",
+    "create_tables",
+    "GrantRepository",
+    "MemoryGrantRepository",
+    "GrantChange",
+    "FacetValue",
+    "UpcomingGrant",
+    "DetailsQueue",
+    "QueueItem",
+]
@@ -1,12 +1,20 @@
-"""Database connection for FundFinder backend."""
+"""Database connection for FundFinder backend.
+
+DATABASE_URL selects the backend: postgresql://... (default) or memory://<name> for
+the in-memory repository used by pipeline tests and benchmarks (backend/db/memory.py).
+"""
 
 from __future__ import annotations
 
 import os
+import time
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Generator
 
 import psycopg2
+import psycopg2.extras
+
+from services.scraper import codec, metrics
 
 DEFAULT_DATABASE_URL = "postgresql://localhost:5432/fundfinder"
 
@@ -16,10 +24,27 @@ def get_database_url() -> str:
     return os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URL)
 
 
+def is_memory_database() -> bool:
+    """True if DATABASE_URL selects the in-memory backend."""
+    from backend.db.memory import is_memory_url
+
+    return is_memory_url(get_database_url())
+
+
 @contextmanager
-def get_connection() -> Generator[psycopg2.extensions.connection, None, None]:
-    """Context manager yielding a psycopg2 connection. Closes on exit."""
-    conn = psycopg2.connect(get_database_url())
+def get_connection() -> Generator[Any, None, None]:
+    """Context manager yielding a psycopg2 connection (or a MemoryDatabase for memory:// URLs). Closes on exit."""
+    url = get_database_url()
+    if is_memory_database():
+        from backend.db.memory import connect
+
+        yield connect(url)
+        return
+    start = time.perf_counter()
+    conn = psycopg2.connect(url)
+    metrics.observe("db_connect_wait_seconds", time.perf_counter() - start)
+    # JSONB columns (extra) decode with the fast codec instead of stdlib json
+    psycopg2.extras.register_default_jsonb(conn, loads=codec.loads)
     try:
         yield conn
         conn.commit()
@@ -28,3 +53,14 @@ def get_connection() -> Generator[psycopg2.extensions.connection, None, None]:
         raise
     finally:
         conn.close()
+
+
+def get_repository() -> Any:
+    """Grant repository for DATABASE_URL: GrantRepository, or MemoryGrantRepository for memory:// URLs."""
+    if is_memory_database():
+        from backend.db.memory import MemoryGrantRepository
+
+        return MemoryGrantRepository()
+    from backend.db.repository import GrantRepository
+
+    return GrantRepository()
@@ -0,0 +1,138 @@
+"""Streaming export of the grants table to NDJSON, CSV or Parquet.
+
+Rows are never materialised as Grant objects and memory stays constant in the table
+size: NDJSON and Parquet read through a server-side (named) cursor in batches, CSV
+is produced by COPY ... TO STDOUT. extra is exported as its JSON text, never decoded.
+
+Parquet needs the optional pyarrow package; each batch is written as one row group.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, TextIO
+
+FORMATS = ("ndjson", "csv", "parquet")
+DEFAULT_BATCH_SIZE = 5000
+
+EXPORT_COLUMNS = (
+    "id, title, description, source_url, source_name, deadline, deadline_text, "
+    "amount, currency, eligibility, content_hash, fetched_at, {extra}, "
+    "created_at, updated_at"
+)
+
+
+def _export_select(since: datetime | None, extra: str = "extra::text AS extra") -> tuple[str, tuple]:
+    columns = EXPORT_COLUMNS.format(extra=extra)
+    if since is None:
+        return f"SELECT {columns} FROM grants ORDER BY id", ()
+    return f"SELECT {columns} FROM grants WHERE fetched_at >= %s ORDER BY id", (since,)
+
+
+def export_ndjson(
+    conn,
+    out: TextIO,
+    since: datetime | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Write one JSON object per line; Postgres builds the JSON. Returns rows written."""
+    # extra stays jsonb so row_to_json embeds it as an object, not a string
+    select, params = _export_select(since, extra="extra")
+    count = 0
+    with conn.cursor(name="grants_export_ndjson") as cur:
+        cur.itersize = batch_size
+        cur.execute(f"SELECT row_to_json(t)::text FROM ({select}) AS t", params)
+        for (line,) in cur:
+            out.write(line)
+            out.write("\n")
+            count += 1
+    conn.rollback()
+    return count
+
+
+def export_csv(conn, out: TextIO, since: datetime | None = None) -> int:
+    """Write CSV with a header row via COPY ... TO STDOUT. Returns rows written."""
+    select, params = _export_select(since)
+    with conn.cursor() as cur:
+        query = cur.mogrify(select, params).decode("utf-8")
+        cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", out)
+        count = cur.rowcount
+    conn.rollback()
+    return count
+
+
+def _parquet_schema(pa: Any) -> Any:
+    text = pa.string()
+    timestamp = pa.timestamp("us", tz="UTC")
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("title", text),
+            ("description", text),
+            ("source_url", text),
+            ("source_name", text),
+            ("deadline", pa.date32()),
+            ("deadline_text", text),
+            ("amount", text),
+            ("currency", text),
+            ("eligibility", text),
+            ("content_hash", text),
+            ("fetched_at", timestamp),
+            ("extra", text),
+            ("created_at", timestamp),
+            ("updated_at", timestamp),
+        ]
+    )
+
+
+def export_parquet(
+    conn,
+    path: str | Path,
+    since: datetime | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Write a Parquet file, one row group per batch_size rows. Returns rows written."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)") from e
+
+    schema = _parquet_schema(pa)
+    select, params = _export_select(since)
+    count = 0
+    with pq.ParquetWriter(str(path), schema) as writer, conn.cursor(name="grants_export_parquet") as cur:
+        cur.itersize = batch_size
+        cur.execute(select, params)
+        while rows := cur.fetchmany(batch_size):
+            columns = list(zip(*rows))
+            writer.write_table(
+                pa.Table.from_arrays(
+                    [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                    schema=schema,
+                )
+            )
+            count += len(rows)
+    conn.rollback()
+    return count
+
+
+def export_grants(
+    conn,
+    fmt: str,
+    out: TextIO | str | Path,
+    since: datetime | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Export grants (fetched at or after since, if given) in fmt to out.
+
+    out is a text stream for ndjson/csv and a file path for parquet. Returns rows written.
+    """
+    if fmt == "ndjson":
+        return export_ndjson(conn, out, since, batch_size)
+    if fmt == "csv":
+        return export_csv(conn, out, since)
+    if fmt == "parquet":
+        return export_parquet(conn, out, since, batch_size)
+    raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(FORMATS)})")
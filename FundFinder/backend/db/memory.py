@@ -0,0 +1,312 @@
+"""In-memory grant repository for pipeline tests and benchmarks without PostgreSQL.
+
+Selected with a DATABASE_URL of the form memory://<name> (see connection.get_connection
+and connection.get_repository). Every connection to the same name shares one
+MemoryDatabase for the life of the process, so a script that opens several
+connections sees its own writes. commit() and rollback() are no-ops: writes apply
+immediately.
+
+MemoryGrantRepository has GrantRepository's methods and semantics (upsert by
+source_url, version history on content_hash change, facets, keyset-paginated
+upcoming); search() matches words the same way but orders by id instead of rank.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime
+from typing import Any
+
+from backend.db.repository import (
+    DELETE,
+    INSERT,
+    SEARCH_FILTERS,
+    UPDATE,
+    FacetValue,
+    GrantChange,
+    UpcomingGrant,
+    record_upsert,
+)
+from services.scraper.dedupe import SignatureRecord
+from services.scraper.models import Grant
+from services.scraper.runstats import ScrapeRun, SourceRun
+from services.scraper.utils import search_terms, strip_hebrew_prefix, utc_now
+
+MEMORY_SCHEME = "memory"
+
+
+@dataclass
+class StoredGrant:
+    id: int
+    grant: Grant
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass
+class MemoryDatabase:
+    """Tables of one in-memory database. Stands in for a psycopg2 connection."""
+
+    name: str
+    grants: dict[str, StoredGrant] = field(default_factory=dict)
+    signatures: dict[str, SignatureRecord] = field(default_factory=dict)
+    versions: list[GrantChange] = field(default_factory=list)
+    runs: list[ScrapeRun] = field(default_factory=list)
+    next_id: int = 1
+    lock: threading.RLock = field(default_factory=threading.RLock)
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+_databases: dict[str, MemoryDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def is_memory_url(url: str) -> bool:
+    return url.startswith(f"{MEMORY_SCHEME}://")
+
+
+def connect(url: str) -> MemoryDatabase:
+    """The process-wide MemoryDatabase for a memory://<name> URL."""
+    name = url[len(MEMORY_SCHEME) + 3 :]
+    with _databases_lock:
+        if name not in _databases:
+            _databases[name] = MemoryDatabase(name)
+        return _databases[name]
+
+
+def reset(url: str) -> None:
+    """Forget the database behind url (the next connect() starts empty)."""
+    with _databases_lock:
+        _databases.pop(url[len(MEMORY_SCHEME) + 3 :], None)
+
+
+def facet_values(grant: Grant) -> list[tuple[str, str]]:
+    """(facet, value) pairs of a grant; mirrors the grant_facet_values view."""
+    extra = grant.extra or {}
+    pairs = [("source_name", grant.source_name)]
+    if grant.currency is not None:
+        pairs.append(("currency", grant.currency))
+    if extra.get("academic_year_text") is not None:
+        pairs.append(("academic_year", str(extra["academic_year_text"])))
+    category = extra.get("category") or extra.get("scholarship_type")
+    if category is not None:
+        pairs.append(("category", str(category)))
+    return pairs
+
+
+def _document_terms(grant: Grant) -> set[str]:
+    terms = set()
+    for text in (grant.title, grant.description, grant.eligibility):
+        for word in search_terms(text):
+            terms.add(word)
+            terms.add(strip_hebrew_prefix(word))
+    return terms
+
+
+def _upcoming_row(stored: StoredGrant) -> UpcomingGrant:
+    g = stored.grant
+    return UpcomingGrant(
+        id=stored.id,
+        title=g.title,
+        source_name=g.source_name,
+        source_url=g.source_url,
+        deadline=g.deadline,
+        deadline_text=g.deadline_text,
+        amount=g.amount,
+        currency=g.currency,
+    )
+
+
+class MemoryGrantRepository:
+    """GrantRepository counterpart operating on a MemoryDatabase."""
+
+    def _record(self, db: MemoryDatabase, change: str, stored: StoredGrant) -> None:
+        db.versions.append(
+            GrantChange(
+                cursor=len(db.versions) + 1,
+                change=change,
+                grant_id=stored.id,
+                grant=stored.grant,
+                recorded_at=utc_now(),
+            )
+        )
+
+    def upsert_many(self, conn: MemoryDatabase, grants: list[Grant]) -> int:
+        """Upsert grants by source_url. Returns number of grants processed."""
+        if not grants:
+            return 0
+        start = time.perf_counter()
+        with conn.lock:
+            old_hashes = {
+                g.source_url: conn.grants[g.source_url].grant.content_hash
+                for g in grants
+                if g.source_url in conn.grants
+            }
+            now = utc_now()
+            for g in grants:
+                stored = conn.grants.get(g.source_url)
+                if stored is None:
+                    conn.grants[g.source_url] = StoredGrant(conn.next_id, g, now, now)
+                    conn.next_id += 1
+                else:
+                    # source_name is not updated on conflict, as in UPSERT_SQL
+                    stored.grant = g.model_copy(update={"source_name": stored.grant.source_name})
+                    stored.updated_at = now
+            # Same order as GrantRepository: inserts, then updates, each by grant id
+            touched = sorted(
+                {g.source_url: conn.grants[g.source_url] for g in grants}.values(),
+                key=lambda s: s.id,
+            )
+            for stored in touched:
+                if stored.grant.source_url not in old_hashes:
+                    self._record(conn, INSERT, stored)
+            for stored in touched:
+                url = stored.grant.source_url
+                if url in old_hashes and old_hashes[url] != stored.grant.content_hash:
+                    self._record(conn, UPDATE, stored)
+        record_upsert(len(grants), time.perf_counter() - start)
+        return len(grants)
+
+    def delete_many(self, conn: MemoryDatabase, source_urls: list[str]) -> int:
+        """Delete grants and their signatures by source_url. Returns grants deleted."""
+        deleted = 0
+        with conn.lock:
+            for url in dict.fromkeys(source_urls):
+                stored = conn.grants.pop(url, None)
+                conn.signatures.pop(url, None)
+                if stored is not None:
+                    self._record(conn, DELETE, stored)
+                    deleted += 1
+        return deleted
+
+    def get_all(self, conn: MemoryDatabase) -> list[Grant]:
+        with conn.lock:
+            return [s.grant for s in sorted(conn.grants.values(), key=lambda s: s.id)]
+
+    def get_by_source(self, conn: MemoryDatabase, source_name: str) -> list[Grant]:
+        return [g for g in self.get_all(conn) if g.source_name == source_name]
+
+    def search(
+        self,
+        conn: MemoryDatabase,
+        query: str,
+        filters: dict[str, Any] | None = None,
+        limit: int = 20,
+    ) -> list[Grant]:
+        """Grants containing every query word (as written or without its Hebrew prefix), by id."""
+        terms = [{t, strip_hebrew_prefix(t)} for t in search_terms(query)]
+        if not terms:
+            return []
+        for key in filters or {}:
+            if key not in SEARCH_FILTERS:
+                raise ValueError(f"Unknown search filter: {key}")
+        f = {k: v for k, v in (filters or {}).items() if v is not None}
+        results = []
+        for g in self.get_all(conn):
+            if "source_name" in f and g.source_name != f["source_name"]:
+                continue
+            if "currency" in f and g.currency != f["currency"]:
+                continue
+            if "deadline_from" in f and (g.deadline is None or g.deadline < f["deadline_from"]):
+                continue
+            if "deadline_to" in f and (g.deadline is None or g.deadline > f["deadline_to"]):
+                continue
+            document = _document_terms(g)
+            if all(variants & document for variants in terms):
+                results.append(g)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def upcoming(
+        self,
+        conn: MemoryDatabase,
+        from_date: date,
+        to_date: date | None = None,
+        source: str | None = None,
+        limit: int = 50,
+        after: tuple[date, int] | None = None,
+    ) -> list[UpcomingGrant]:
+        with conn.lock:
+            rows = [
+                _upcoming_row(s)
+                for s in conn.grants.values()
+                if s.grant.deadline is not None
+                and s.grant.deadline >= from_date
+                and (to_date is None or s.grant.deadline <= to_date)
+                and (source is None or s.grant.source_name == source)
+            ]
+        rows = sorted((r for r in rows if after is None or r.cursor > after), key=lambda r: r.cursor)
+        return rows[:limit]
+
+    def changes_since(self, conn: MemoryDatabase, cursor: int = 0, limit: int = 1000) -> list[GrantChange]:
+        with conn.lock:
+            return conn.versions[cursor : cursor + limit]
+
+    def get_facets(self, conn: MemoryDatabase) -> dict[str, list[FacetValue]]:
+        counts: dict[tuple[str, str], int] = defaultdict(int)
+        deadlines: dict[tuple[str, str], list[date]] = defaultdict(list)
+        for g in self.get_all(conn):
+            for key in facet_values(g):
+                counts[key] += 1
+                if g.deadline is not None:
+                    deadlines[key].append(g.deadline)
+        facets: dict[str, list[FacetValue]] = {}
+        for key in sorted(counts):
+            d = deadlines.get(key)
+            facets.setdefault(key[0], []).append(
+                FacetValue(key[1], counts[key], min(d) if d else None, max(d) if d else None)
+            )
+        return facets
+
+    def get_signatures(self, conn: MemoryDatabase) -> list[SignatureRecord]:
+        with conn.lock:
+            return list(conn.signatures.values())
+
+    def upsert_signatures(self, conn: MemoryDatabase, records: list[SignatureRecord]) -> int:
+        with conn.lock:
+            for r in records:
+                conn.signatures[r.source_url] = r
+        return len(records)
+
+    def count_changes(self, conn: MemoryDatabase, grants: list[Grant]) -> dict[str, int]:
+        changed: dict[str, int] = defaultdict(int)
+        with conn.lock:
+            for g in {g.source_url: g for g in grants}.values():
+                stored = conn.grants.get(g.source_url)
+                if stored is None or stored.grant.content_hash != g.content_hash:
+                    changed[g.source_name] += 1
+        return dict(changed)
+
+    def record_run(self, conn: MemoryDatabase, run: ScrapeRun) -> int:
+        with conn.lock:
+            run_id = len(conn.runs) + 1
+            sources = {}
+            for s in run.sources:
+                # First entry per source wins, as with ON CONFLICT DO NOTHING
+                sources.setdefault(s.source_name, replace(s, stats=dict(s.stats), run_id=run_id, mode=run.mode))
+            conn.runs.append(replace(run, id=run_id, sources=list(sources.values())))
+        return run_id
+
+    def source_history(self, conn: MemoryDatabase, mode: str, window: int) -> dict[str, list[SourceRun]]:
+        history: dict[str, list[SourceRun]] = {}
+        with conn.lock:
+            for run in reversed(conn.runs):
+                if run.mode != mode:
+                    continue
+                for s in run.sources:
+                    runs = history.setdefault(s.source_name, [])
+                    if len(runs) < window:
+                        runs.append(s)
+        return dict(sorted(history.items()))
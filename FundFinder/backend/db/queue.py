@@ -0,0 +1,196 @@
+"""Details work queue: listing steps enqueue item IDs, workers claim them in batches.
+
+Claims use ``FOR UPDATE SKIP LOCKED`` so any number of worker processes (or nodes)
+can pull from the same source without blocking each other. A claimed item carries
+a lease, which the worker renews with extend() while it works; if the worker dies,
+the lease expires and the item becomes claimable again.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DELAY_SECONDS = 60
+
+ENQUEUE_SQL = """
+INSERT INTO details_queue (source_name, item_id, status, attempts, enqueued_at, updated_at)
+VALUES (%s, %s, 'pending', 0, NOW(), NOW())
+ON CONFLICT (source_name, item_id) DO UPDATE SET
+    status = 'pending',
+    attempts = 0,
+    lease_owner = NULL,
+    lease_expires_at = NULL,
+    last_error = NULL,
+    enqueued_at = NOW(),
+    updated_at = NOW()
+WHERE details_queue.status <> 'pending'
+"""
+
+CLAIM_SQL = """
+WITH picked AS (
+    SELECT id FROM details_queue
+    WHERE source_name = %s
+      AND status = 'pending'
+      AND attempts < %s
+      AND (lease_expires_at IS NULL OR lease_expires_at < NOW())
+    ORDER BY id
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE details_queue q SET
+    attempts = q.attempts + 1,
+    lease_owner = %s,
+    lease_expires_at = NOW() + make_interval(secs => %s),
+    updated_at = NOW()
+FROM picked
+WHERE q.id = picked.id
+RETURNING q.id, q.item_id, q.attempts
+"""
+
+# Items whose worker died on the last allowed attempt never reach FAIL_SQL; park them
+# once their lease has expired so they stop counting as pending.
+REAP_SQL = """
+UPDATE details_queue SET
+    status = 'failed',
+    lease_owner = NULL,
+    last_error = COALESCE(last_error, 'lease expired'),
+    updated_at = NOW()
+WHERE source_name = %s
+  AND status = 'pending'
+  AND attempts >= %s
+  AND lease_expires_at < NOW()
+"""
+
+COMPLETE_SQL = """
+UPDATE details_queue SET
+    status = 'done',
+    lease_owner = NULL,
+    lease_expires_at = NULL,
+    last_error = NULL,
+    updated_at = NOW()
+WHERE id = %s AND lease_owner = %s
+"""
+
+# Heartbeat: push the lease of items this worker still holds further out
+EXTEND_SQL = """
+UPDATE details_queue SET
+    lease_expires_at = NOW() + make_interval(secs => %s),
+    updated_at = NOW()
+WHERE id = ANY(%s) AND lease_owner = %s AND status = 'pending'
+RETURNING id
+"""
+
+# Items that exhausted their attempts are parked as 'failed'; others stay pending
+# and become claimable again once the retry delay (stored as the lease) elapses.
+FAIL_SQL = """
+UPDATE details_queue SET
+    status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+    lease_owner = NULL,
+    lease_expires_at = NOW() + make_interval(secs => %s),
+    last_error = %s,
+    updated_at = NOW()
+WHERE id = %s AND lease_owner = %s
+"""
+
+
+@dataclass(frozen=True)
+class QueueItem:
+    """A claimed queue entry. attempts includes the current claim."""
+
+    id: int
+    item_id: str
+    attempts: int
+
+
+class DetailsQueue:
+    """Postgres-backed work queue for per-item details fetching."""
+
+    def __init__(
+        self,
+        source_name: str,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_delay_seconds: int = DEFAULT_RETRY_DELAY_SECONDS,
+    ) -> None:
+        self.source_name = source_name
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+
+    def enqueue(self, conn, item_ids: list) -> int:
+        """Enqueue item IDs. Finished or failed items are reset to pending. Returns IDs processed."""
+        if not item_ids:
+            return 0
+        cur = conn.cursor()
+        try:
+            for item_id in item_ids:
+                cur.execute(ENQUEUE_SQL, (self.source_name, str(item_id)))
+            conn.commit()
+            return len(item_ids)
+        finally:
+            cur.close()
+
+    def claim(self, conn, worker_id: str, batch_size: int) -> list[QueueItem]:
+        """Claim up to batch_size pending items under a lease. Commits so locks are released."""
+        cur = conn.cursor()
+        try:
+            cur.execute(REAP_SQL, (self.source_name, self.max_attempts))
+            cur.execute(
+                CLAIM_SQL,
+                (self.source_name, self.max_attempts, batch_size, worker_id, self.lease_seconds),
+            )
+            rows = cur.fetchall()
+            conn.commit()
+            items = [QueueItem(id=r[0], item_id=r[1], attempts=r[2]) for r in rows]
+            return sorted(items, key=lambda i: i.id)
+        finally:
+            cur.close()
+
+    def complete(self, conn, item: QueueItem, worker_id: str) -> bool:
+        """Mark an item done. Returns False if the lease was lost to another worker."""
+        cur = conn.cursor()
+        try:
+            cur.execute(COMPLETE_SQL, (item.id, worker_id))
+            return cur.rowcount == 1
+        finally:
+            cur.close()
+
+    def extend(self, conn, items: list[QueueItem], worker_id: str) -> list[QueueItem]:
+        """Renew the lease on items for another lease_seconds. Commits so other workers
+        see it. Returns the items still held; the rest were lost to another worker."""
+        if not items:
+            return []
+        cur = conn.cursor()
+        try:
+            cur.execute(EXTEND_SQL, (self.lease_seconds, [item.id for item in items], worker_id))
+            held = {row[0] for row in cur.fetchall()}
+            conn.commit()
+            return [item for item in items if item.id in held]
+        finally:
+            cur.close()
+
+    def fail(self, conn, item: QueueItem, worker_id: str, error: str) -> bool:
+        """Record a failed attempt; the item is retried later or parked as failed."""
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                FAIL_SQL,
+                (self.max_attempts, self.retry_delay_seconds, error[:1000], item.id, worker_id),
+            )
+            return cur.rowcount == 1
+        finally:
+            cur.close()
+
+    def counts(self, conn) -> dict[str, int]:
+        """Return item counts per status for this source."""
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "SELECT status, COUNT(*) FROM details_queue WHERE source_name = %s GROUP BY status",
+                (self.source_name,),
+            )
+            return {status: count for status, count in cur.fetchall()}
+        finally:
+            cur.close()
@@ -1,10 +1,32 @@
-"""Grant repository: upsert and query grants."""
+"""Grant repository: upsert, delete and query grants, their change history and scrape run history."""
 
 from __future__ import annotations
 
-import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
 
+from services.scraper import codec, metrics
+from services.scraper.dedupe import SignatureRecord
 from services.scraper.models import Grant
+from services.scraper.runstats import ScrapeRun, SourceRun
+from services.scraper.utils import search_terms, strip_hebrew_prefix
+
+SELECT_COLUMNS = (
+    "id, title, description, source_url, source_name, deadline, "
+    "deadline_text, amount, currency, eligibility, content_hash, fetched_at, "
+    "extra, created_at, updated_at"
+)
+
+# search() filters: key -> SQL condition with one placeholder
+SEARCH_FILTERS = {
+    "source_name": "source_name = %s",
+    "currency": "currency = %s",
+    "deadline_from": "deadline >= %s",
+    "deadline_to": "deadline <= %s",
+}
 
 
 def _row_to_grant(row: tuple) -> Grant:
@@ -31,7 +53,7 @@ def _row_to_grant(row: tuple) -> Grant:
         if isinstance(extra, dict):
             extra_dict = extra
         else:
-            extra_dict = json.loads(extra) if extra else None
+            extra_dict = codec.loads(extra) if extra else None
     return Grant(
         title=title,
         description=description,
@@ -48,6 +70,16 @@ def _row_to_grant(row: tuple) -> Grant:
     )
 
 
+UPSERT_SIGNATURE_SQL = """
+INSERT INTO grant_signatures (source_url, source_name, signature, canonical_url, updated_at)
+VALUES (%s, %s, %s, %s, NOW())
+ON CONFLICT (source_url) DO UPDATE SET
+    source_name = EXCLUDED.source_name,
+    signature = EXCLUDED.signature,
+    canonical_url = EXCLUDED.canonical_url,
+    updated_at = NOW()
+"""
+
 UPSERT_SQL = """
 INSERT INTO grants (title, description, source_url, source_name, deadline, deadline_text,
                     amount, currency, eligibility, content_hash, fetched_at, extra,
@@ -68,17 +100,226 @@ ON CONFLICT (source_url) DO UPDATE SET
 """
 
 
+VERSION_COLUMNS = (
+    "title, description, source_url, source_name, deadline, deadline_text, "
+    "amount, currency, eligibility, content_hash, fetched_at, extra"
+)
+
+# Copies the current rows of the given grants into grant_versions as one change kind
+RECORD_VERSIONS_SQL = f"""
+INSERT INTO grant_versions (grant_id, change, {VERSION_COLUMNS})
+SELECT id, %s, {VERSION_COLUMNS} FROM grants WHERE source_url = ANY(%s) ORDER BY id
+"""
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+
+@dataclass(frozen=True)
+class GrantChange:
+    """One grant_versions row. For deletes, grant is the last version before removal."""
+
+    cursor: int
+    change: str
+    grant_id: int
+    grant: Grant
+    recorded_at: datetime
+
+
+SELECT_FACET_VALUES_SQL = """
+SELECT source_url, facet, value, deadline FROM grant_facet_values WHERE source_url = ANY(%s)
+"""
+
+APPLY_FACET_DELTA_SQL = """
+INSERT INTO grant_facets (facet, value, grant_count, min_deadline, max_deadline, updated_at)
+VALUES (%s, %s, %s, %s, %s, NOW())
+ON CONFLICT (facet, value) DO UPDATE SET
+    grant_count = grant_facets.grant_count + EXCLUDED.grant_count,
+    min_deadline = LEAST(grant_facets.min_deadline, EXCLUDED.min_deadline),
+    max_deadline = GREATEST(grant_facets.max_deadline, EXCLUDED.max_deadline),
+    updated_at = NOW()
+"""
+
+# A removed deadline may have been the facet's min or max: recompute both from grants
+RECOMPUTE_FACET_DEADLINES_SQL = """
+UPDATE grant_facets f SET (min_deadline, max_deadline) = (
+    SELECT MIN(v.deadline), MAX(v.deadline) FROM grant_facet_values v
+    WHERE v.facet = %s AND v.value = %s
+)
+WHERE f.facet = %s AND f.value = %s
+"""
+
+FacetKey = tuple[str, str]
+FacetRows = dict[str, set[tuple[str, str, date | None]]]
+
+
+@dataclass(frozen=True)
+class FacetValue:
+    """One grant_facets row: a facet value, its grant count and deadline range."""
+
+    value: str
+    count: int
+    min_deadline: date | None
+    max_deadline: date | None
+
+
+def _facet_rows(cur, source_urls: list[str]) -> FacetRows:
+    """{source_url: {(facet, value, deadline)}} for the given grants as currently stored."""
+    cur.execute(SELECT_FACET_VALUES_SQL, (source_urls,))
+    rows: FacetRows = defaultdict(set)
+    for source_url, facet, value, deadline in cur.fetchall():
+        rows[source_url].add((facet, value, deadline))
+    return rows
+
+
+def _apply_facet_changes(cur, before: FacetRows, after: FacetRows) -> None:
+    """Apply the difference between two _facet_rows snapshots to grant_facets."""
+    counts: dict[FacetKey, int] = defaultdict(int)
+    added: dict[FacetKey, list[date]] = defaultdict(list)
+    recompute: set[FacetKey] = set()
+    for source_url in before.keys() | after.keys():
+        old, new = before.get(source_url, set()), after.get(source_url, set())
+        for facet, value, deadline in old - new:
+            counts[(facet, value)] -= 1
+            if deadline is not None:
+                recompute.add((facet, value))
+        for facet, value, deadline in new - old:
+            counts[(facet, value)] += 1
+            if deadline is not None:
+                added[(facet, value)].append(deadline)
+    for key in sorted(counts.keys() | added.keys()):
+        deadlines = added.get(key)
+        cur.execute(
+            APPLY_FACET_DELTA_SQL,
+            (*key, counts[key], min(deadlines) if deadlines else None, max(deadlines) if deadlines else None),
+        )
+    for key in sorted(recompute):
+        cur.execute(RECOMPUTE_FACET_DEADLINES_SQL, (*key, *key))
+    if counts:
+        cur.execute("DELETE FROM grant_facets WHERE grant_count <= 0")
+
+
+INSERT_RUN_SQL = """
+INSERT INTO scrape_runs (mode, started_at, finished_at, grants_total, grants_persisted)
+VALUES (%s, %s, %s, %s, %s)
+RETURNING id
+"""
+
+INSERT_RUN_SOURCE_SQL = """
+INSERT INTO scrape_run_sources
+    (run_id, source_name, started_at, wall_time, bytes_fetched, grants, changed, error_class, stats)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON CONFLICT (run_id, source_name) DO NOTHING
+"""
+
+# Latest runs per source within one mode, newest first
+SOURCE_HISTORY_SQL = """
+SELECT run_id, mode, source_name, started_at, wall_time, bytes_fetched, grants, changed, error_class, stats
+FROM (
+    SELECT s.*, r.mode,
+           ROW_NUMBER() OVER (PARTITION BY s.source_name ORDER BY s.run_id DESC) AS n
+    FROM scrape_run_sources s
+    JOIN scrape_runs r ON r.id = s.run_id
+    WHERE r.mode = %s
+) ranked
+WHERE n <= %s
+ORDER BY source_name, run_id DESC
+"""
+
+
+UPCOMING_COLUMNS = "id, title, source_name, source_url, deadline, deadline_text, amount, currency"
+
+
+@dataclass(frozen=True)
+class UpcomingGrant:
+    """Listing row returned by GrantRepository.upcoming (only indexed columns)."""
+
+    id: int
+    title: str
+    source_name: str
+    source_url: str
+    deadline: date
+    deadline_text: str | None
+    amount: str | None
+    currency: str | None
+
+    @property
+    def cursor(self) -> tuple[date, int]:
+        """Keyset cursor: pass as upcoming(after=...) to get the next page."""
+        return (self.deadline, self.id)
+
+
+def _upcoming_query(
+    from_date: date,
+    to_date: date | None,
+    source: str | None,
+    limit: int,
+    after: tuple[date, int] | None,
+) -> tuple[str, list[Any]]:
+    conditions = ["deadline IS NOT NULL", "deadline >= %s"]
+    params: list[Any] = [from_date]
+    if to_date is not None:
+        conditions.append("deadline <= %s")
+        params.append(to_date)
+    if source is not None:
+        conditions.append("source_name = %s")
+        params.append(source)
+    if after is not None:
+        conditions.append("(deadline, id) > (%s, %s)")
+        params.extend(after)
+    params.append(limit)
+    sql = (
+        f"SELECT {UPCOMING_COLUMNS} FROM grants WHERE {' AND '.join(conditions)} "
+        "ORDER BY deadline, id LIMIT %s"
+    )
+    return sql, params
+
+
+def build_tsquery(query: str) -> str | None:
+    """Build a to_tsquery('simple', ...) expression: every word must match, as written
+    or without its Hebrew prefix letter. Returns None if the query has no words."""
+    clauses = []
+    for term in search_terms(query):
+        variants = sorted({term, strip_hebrew_prefix(term)})
+        clauses.append("(" + " | ".join(f"'{v}'" for v in variants) + ")")
+    return " & ".join(clauses) if clauses else None
+
+
+def record_upsert(rows: int, elapsed: float) -> None:
+    """Add one upsert_many call to the upsert metrics."""
+    metrics.inc("upsert_rows_total", rows)
+    metrics.observe("upsert_duration_seconds", elapsed)
+    if elapsed > 0:
+        metrics.set_gauge("upsert_rows_per_second", rows / elapsed)
+
+
 class GrantRepository:
     """Repository for persisting and querying grants."""
 
     def upsert_many(self, conn, grants: list[Grant]) -> int:
-        """Upsert grants by source_url. Returns number of grants processed."""
+        """Upsert grants by source_url. Returns number of grants processed.
+
+        grant_facets is updated in the same transaction from the facet values of the
+        affected grants before and after the upsert (see the grant_facet_values view).
+        New grants and grants whose content_hash changed are recorded in grant_versions.
+        """
         if not grants:
             return 0
+        start = time.perf_counter()
         cur = conn.cursor()
         try:
+            # Serialise facet maintenance between writers; readers are not blocked
+            cur.execute("LOCK TABLE grant_facets IN SHARE ROW EXCLUSIVE MODE")
+            source_urls = list({g.source_url for g in grants})
+            before = _facet_rows(cur, source_urls)
+            cur.execute(
+                "SELECT source_url, content_hash FROM grants WHERE source_url = ANY(%s)",
+                (source_urls,),
+            )
+            old_hashes = dict(cur.fetchall())
             for g in grants:
-                extra_json = json.dumps(g.extra, ensure_ascii=False) if g.extra else None
+                extra_json = codec.dumps(g.extra) if g.extra else None
                 cur.execute(
                     UPSERT_SQL,
                     (
@@ -96,20 +337,44 @@ class GrantRepository:
                         extra_json,
                     ),
                 )
+            _apply_facet_changes(cur, before, _facet_rows(cur, source_urls))
+            new_hashes = {g.source_url: g.content_hash for g in grants}
+            inserted = [url for url in source_urls if url not in old_hashes]
+            updated = [url for url in source_urls if url in old_hashes and old_hashes[url] != new_hashes[url]]
+            for change, urls in ((INSERT, inserted), (UPDATE, updated)):
+                if urls:
+                    cur.execute(RECORD_VERSIONS_SQL, (change, urls))
             conn.commit()
+            record_upsert(len(grants), time.perf_counter() - start)
             return len(grants)
         finally:
             cur.close()
 
+    def delete_many(self, conn, source_urls: list[str]) -> int:
+        """Delete grants (and their near-duplicate signatures) by source_url, recording
+        a delete in grant_versions and updating grant_facets. Returns grants deleted."""
+        if not source_urls:
+            return 0
+        cur = conn.cursor()
+        try:
+            cur.execute("LOCK TABLE grant_facets IN SHARE ROW EXCLUSIVE MODE")
+            source_urls = list(set(source_urls))
+            before = _facet_rows(cur, source_urls)
+            cur.execute(RECORD_VERSIONS_SQL, (DELETE, source_urls))
+            cur.execute("DELETE FROM grants WHERE source_url = ANY(%s)", (source_urls,))
+            deleted = cur.rowcount
+            cur.execute("DELETE FROM grant_signatures WHERE source_url = ANY(%s)", (source_urls,))
+            _apply_facet_changes(cur, before, {})
+            conn.commit()
+            return deleted
+        finally:
+            cur.close()
+
     def get_all(self, conn) -> list[Grant]:
         """Fetch all grants as Grant models."""
         cur = conn.cursor()
         try:
-            cur.execute(
-                "SELECT id, title, description, source_url, source_name, deadline, "
-                "deadline_text, amount, currency, eligibility, content_hash, fetched_at, "
-                "extra, created_at, updated_at FROM grants ORDER BY id"
-            )
+            cur.execute(f"SELECT {SELECT_COLUMNS} FROM grants ORDER BY id")
             return [_row_to_grant(row) for row in cur.fetchall()]
         finally:
             cur.close()
@@ -119,11 +384,202 @@ class GrantRepository:
         cur = conn.cursor()
         try:
             cur.execute(
-                "SELECT id, title, description, source_url, source_name, deadline, "
-                "deadline_text, amount, currency, eligibility, content_hash, fetched_at, "
-                "extra, created_at, updated_at FROM grants WHERE source_name = %s ORDER BY id",
+                f"SELECT {SELECT_COLUMNS} FROM grants WHERE source_name = %s ORDER BY id",
                 (source_name,),
             )
             return [_row_to_grant(row) for row in cur.fetchall()]
         finally:
             cur.close()
+
+    def search(
+        self,
+        conn,
+        query: str,
+        filters: dict[str, Any] | None = None,
+        limit: int = 20,
+    ) -> list[Grant]:
+        """Full-text search over title/description/eligibility, best match first.
+
+        Uses the GIN-indexed search_vector column. filters may contain source_name,
+        currency, deadline_from and deadline_to.
+        """
+        tsquery = build_tsquery(query)
+        if tsquery is None:
+            return []
+        conditions = ["search_vector @@ q"]
+        params: list[Any] = [tsquery]
+        for key, value in (filters or {}).items():
+            if key not in SEARCH_FILTERS:
+                raise ValueError(f"Unknown search filter: {key}")
+            if value is not None:
+                conditions.append(SEARCH_FILTERS[key])
+                params.append(value)
+        params.append(limit)
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                f"SELECT {SELECT_COLUMNS} FROM grants, to_tsquery('simple', %s) AS q "
+                f"WHERE {' AND '.join(conditions)} "
+                "ORDER BY ts_rank_cd(search_vector, q) DESC, id LIMIT %s",
+                params,
+            )
+            return [_row_to_grant(row) for row in cur.fetchall()]
+        finally:
+            cur.close()
+
+    def upcoming(
+        self,
+        conn,
+        from_date: date,
+        to_date: date | None = None,
+        source: str | None = None,
+        limit: int = 50,
+        after: tuple[date, int] | None = None,
+    ) -> list[UpcomingGrant]:
+        """Grants with a deadline in [from_date, to_date], closing soonest first.
+
+        Keyset-paginated: pass the last row's cursor as after to fetch the next page.
+        Served from the partial covering indexes idx_grants_upcoming and
+        idx_grants_source_upcoming; grants without a deadline are never returned.
+        """
+        sql, params = _upcoming_query(from_date, to_date, source, limit, after)
+        cur = conn.cursor()
+        try:
+            cur.execute(sql, params)
+            return [UpcomingGrant(*row) for row in cur.fetchall()]
+        finally:
+            cur.close()
+
+    def changes_since(self, conn, cursor: int = 0, limit: int = 1000) -> list[GrantChange]:
+        """Grant inserts, content updates and deletes recorded after cursor, oldest first.
+
+        Start from cursor 0 and pass the last change's cursor to continue. Cursors
+        follow commit order because writers serialise on the grant_facets lock.
+        """
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                f"SELECT version_id, change, grant_id, recorded_at, {VERSION_COLUMNS} "
+                "FROM grant_versions WHERE version_id > %s ORDER BY version_id LIMIT %s",
+                (cursor, limit),
+            )
+            return [
+                GrantChange(
+                    cursor=version_id,
+                    change=change,
+                    grant_id=grant_id,
+                    grant=_row_to_grant((grant_id, *snapshot, None, None)),
+                    recorded_at=recorded_at,
+                )
+                for version_id, change, grant_id, recorded_at, *snapshot in cur.fetchall()
+            ]
+        finally:
+            cur.close()
+
+    def get_facets(self, conn) -> dict[str, list[FacetValue]]:
+        """Facet values from the grant_facets summary: {facet: [FacetValue, ...]} sorted by value."""
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "SELECT facet, value, grant_count, min_deadline, max_deadline "
+                "FROM grant_facets ORDER BY facet, value"
+            )
+            facets: dict[str, list[FacetValue]] = {}
+            for facet, *row in cur.fetchall():
+                facets.setdefault(facet, []).append(FacetValue(*row))
+            return facets
+        finally:
+            cur.close()
+
+    def get_signatures(self, conn) -> list[SignatureRecord]:
+        """Fetch persisted near-duplicate signatures (see services.scraper.dedupe)."""
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "SELECT source_url, source_name, signature, canonical_url FROM grant_signatures"
+            )
+            return [
+                SignatureRecord(source_url=r[0], source_name=r[1], signature=list(r[2]), canonical_url=r[3])
+                for r in cur.fetchall()
+            ]
+        finally:
+            cur.close()
+
+    def upsert_signatures(self, conn, records: list[SignatureRecord]) -> int:
+        """Upsert signatures and canonical assignments by source_url. Returns records processed."""
+        if not records:
+            return 0
+        cur = conn.cursor()
+        try:
+            for r in records:
+                cur.execute(
+                    UPSERT_SIGNATURE_SQL,
+                    (r.source_url, r.source_name, r.signature, r.canonical_url),
+                )
+            conn.commit()
+            return len(records)
+        finally:
+            cur.close()
+
+    def count_changes(self, conn, grants: list[Grant]) -> dict[str, int]:
+        """Grants per source_name that are new or whose content_hash differs from the
+        stored grant. Call before upsert_many."""
+        if not grants:
+            return {}
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "SELECT source_url, content_hash FROM grants WHERE source_url = ANY(%s)",
+                (list({g.source_url for g in grants}),),
+            )
+            old_hashes = dict(cur.fetchall())
+        finally:
+            cur.close()
+        changed: dict[str, int] = defaultdict(int)
+        for g in {g.source_url: g for g in grants}.values():
+            if old_hashes.get(g.source_url) != g.content_hash:
+                changed[g.source_name] += 1
+        return dict(changed)
+
+    def record_run(self, conn, run: ScrapeRun) -> int:
+        """Insert a finished run into scrape_runs and scrape_run_sources. Returns its id."""
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                INSERT_RUN_SQL,
+                (run.mode, run.started_at, run.finished_at, run.grants_total, run.grants_persisted),
+            )
+            run_id = cur.fetchone()[0]
+            for s in run.sources:
+                cur.execute(
+                    INSERT_RUN_SOURCE_SQL,
+                    (
+                        run_id,
+                        s.source_name,
+                        s.started_at,
+                        s.wall_time,
+                        s.bytes_fetched,
+                        s.grants,
+                        s.changed,
+                        s.error_class,
+                        codec.dumps(s.stats),
+                    ),
+                )
+            conn.commit()
+            return run_id
+        finally:
+            cur.close()
+
+    def source_history(self, conn, mode: str, window: int) -> dict[str, list[SourceRun]]:
+        """The last window runs of each source in mode: {source_name: [newest, ...]}."""
+        cur = conn.cursor()
+        try:
+            cur.execute(SOURCE_HISTORY_SQL, (mode, window))
+            history: dict[str, list[SourceRun]] = {}
+            for run_id, run_mode, name, started_at, *values, stats in cur.fetchall():
+                history.setdefault(name, []).append(
+                    SourceRun(name, started_at, *values, stats=stats or {}, run_id=run_id, mode=run_mode)
+                )
+            return history
+        finally:
+            cur.close()
@@ -1,4 +1,4 @@
-"""Database schema for FundFinder. Creates grants table and indexes."""
+"""Database schema for FundFinder: tables, indexes and the search functions."""
 
 from __future__ import annotations
 
@@ -13,8 +13,41 @@ if _root not in sys.path:
 from typing import Any
 
 from backend.db.connection import get_connection
+from backend.db.memory import MemoryDatabase
+
+DDL = r"""
+-- Search normalisation mirrors services.scraper.utils: clean_hebrew_text (strip RTL/LTR
+-- marks), lowercase, and strip_hebrew_prefix on every word. Whitespace needs no
+-- collapsing here since to_tsvector splits on it anyway.
+CREATE OR REPLACE FUNCTION fundfinder_search_text(t TEXT) RETURNS TEXT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT lower(translate(coalesce(t, ''), U&'\200E\200F\202A\202B\202C\202D\202E', ''))
+$$;
+
+-- Word starts are spelled out rather than \m, which ignores Hebrew letters under
+-- the C collation. Input is already lowercased.
+CREATE OR REPLACE FUNCTION fundfinder_strip_prefixes(t TEXT) RETURNS TEXT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT regexp_replace(t, '(^|[^א-ת0-9a-z_])[והבלמשכ](?=[א-ת]{3})', '\1', 'g')
+$$;
+
+-- Each word is indexed both as written and without its prefix letter.
+CREATE OR REPLACE FUNCTION fundfinder_search_vector(t TEXT, weight "char") RETURNS tsvector
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT setweight(to_tsvector('simple', n) || to_tsvector('simple', fundfinder_strip_prefixes(n)), weight)
+    FROM (SELECT fundfinder_search_text(t) AS n) AS normalized
+$$;
+
+-- Weights: title A, description B, eligibility C.
+CREATE OR REPLACE FUNCTION fundfinder_search_document(
+    title TEXT, description TEXT, eligibility TEXT
+) RETURNS tsvector
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT fundfinder_search_vector(title, 'A')
+        || fundfinder_search_vector(description, 'B')
+        || fundfinder_search_vector(eligibility, 'C')
+$$;
 
-DDL = """
 CREATE TABLE IF NOT EXISTS grants (
     id BIGSERIAL PRIMARY KEY,
     title TEXT NOT NULL,
@@ -35,21 +68,172 @@ CREATE TABLE IF NOT EXISTS grants (
 
 CREATE INDEX IF NOT EXISTS idx_grants_source_name ON grants(source_name);
 CREATE INDEX IF NOT EXISTS idx_grants_deadline ON grants(deadline);
+-- Partial covering indexes for GrantRepository.upcoming(): keyset order (deadline, id),
+-- listing columns in INCLUDE so the query is answered by an index-only scan.
+CREATE INDEX IF NOT EXISTS idx_grants_upcoming ON grants(deadline, id)
+    INCLUDE (title, source_name, source_url, deadline_text, amount, currency)
+    WHERE deadline IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_grants_source_upcoming ON grants(source_name, deadline, id)
+    INCLUDE (title, source_url, deadline_text, amount, currency)
+    WHERE deadline IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_grants_fetched_at ON grants(fetched_at);
 CREATE INDEX IF NOT EXISTS idx_grants_content_hash ON grants(content_hash);
+
+ALTER TABLE grants ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (fundfinder_search_document(title, description, eligibility)) STORED;
+CREATE INDEX IF NOT EXISTS idx_grants_search_vector ON grants USING GIN (search_vector);
+
+CREATE TABLE IF NOT EXISTS grant_signatures (
+    source_url TEXT PRIMARY KEY,
+    source_name VARCHAR(64) NOT NULL,
+    signature BIGINT[] NOT NULL,
+    canonical_url TEXT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_grant_signatures_canonical_url ON grant_signatures(canonical_url);
+
+-- Facet values per grant; the single definition used to maintain grant_facets.
+CREATE OR REPLACE VIEW grant_facet_values AS
+SELECT source_url, 'source_name'::text AS facet, source_name::text AS value, deadline FROM grants
+UNION ALL
+SELECT source_url, 'currency', currency::text, deadline FROM grants WHERE currency IS NOT NULL
+UNION ALL
+SELECT source_url, 'academic_year', extra->>'academic_year_text', deadline FROM grants
+    WHERE extra->>'academic_year_text' IS NOT NULL
+UNION ALL
+SELECT source_url, 'category', COALESCE(extra->>'category', extra->>'scholarship_type'), deadline FROM grants
+    WHERE COALESCE(extra->>'category', extra->>'scholarship_type') IS NOT NULL;
+
+-- Facet summary maintained incrementally by GrantRepository.upsert_many.
+CREATE TABLE IF NOT EXISTS grant_facets (
+    facet VARCHAR(32) NOT NULL,
+    value TEXT NOT NULL,
+    grant_count INTEGER NOT NULL,
+    min_deadline DATE,
+    max_deadline DATE,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (facet, value)
+);
+
+-- Backfill for databases created before grant_facets existed
+INSERT INTO grant_facets (facet, value, grant_count, min_deadline, max_deadline)
+SELECT facet, value, COUNT(*), MIN(deadline), MAX(deadline)
+FROM grant_facet_values
+WHERE NOT EXISTS (SELECT 1 FROM grant_facets)
+GROUP BY facet, value;
+
+-- Append-only history: one row per content change (insert, content_hash change, delete),
+-- holding the grant as it was after the change (before it, for deletes).
+CREATE TABLE IF NOT EXISTS grant_versions (
+    version_id BIGSERIAL PRIMARY KEY,
+    grant_id BIGINT NOT NULL,
+    change VARCHAR(8) NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    source_url TEXT NOT NULL,
+    source_name VARCHAR(64) NOT NULL,
+    deadline DATE,
+    deadline_text TEXT,
+    amount TEXT,
+    currency VARCHAR(8),
+    eligibility TEXT,
+    content_hash VARCHAR(64) NOT NULL,
+    fetched_at TIMESTAMPTZ NOT NULL,
+    extra JSONB,
+    recorded_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_grant_versions_source_url ON grant_versions(source_url, version_id);
+
+CREATE TABLE IF NOT EXISTS details_queue (
+    id BIGSERIAL PRIMARY KEY,
+    source_name VARCHAR(64) NOT NULL,
+    item_id TEXT NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    last_error TEXT,
+    enqueued_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    UNIQUE (source_name, item_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_details_queue_pending
+    ON details_queue(source_name, id) WHERE status = 'pending';
+
+-- One row per pipeline run, and one per source in it (services/scraper/runstats.py).
+-- mode is sequential, concurrent or staged; timings are only comparable within a mode.
+CREATE TABLE IF NOT EXISTS scrape_runs (
+    id BIGSERIAL PRIMARY KEY,
+    mode VARCHAR(16) NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL,
+    finished_at TIMESTAMPTZ NOT NULL,
+    grants_total INTEGER NOT NULL,
+    grants_persisted INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS scrape_run_sources (
+    run_id BIGINT NOT NULL REFERENCES scrape_runs(id) ON DELETE CASCADE,
+    source_name VARCHAR(64) NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL,
+    wall_time DOUBLE PRECISION NOT NULL,
+    bytes_fetched BIGINT NOT NULL,
+    grants INTEGER NOT NULL,
+    changed INTEGER NOT NULL,
+    error_class TEXT,
+    stats JSONB NOT NULL DEFAULT '{}',
+    PRIMARY KEY (run_id, source_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_scrape_run_sources_source
+    ON scrape_run_sources(source_name, run_id DESC);
+"""
+
+
+# Functions behind the stored grants.search_vector column, in the schema DDL creates them in
+SEARCH_FUNCTIONS_SQL = """
+SELECT proname, prosrc FROM pg_proc
+WHERE pronamespace = (SELECT oid FROM pg_namespace WHERE nspname = current_schema())
+AND proname IN (
+    'fundfinder_search_text', 'fundfinder_strip_prefixes',
+    'fundfinder_search_vector', 'fundfinder_search_document'
+)
+ORDER BY proname
 """
 
 
 def create_tables(conn: Any) -> None:
-    """Create grants table and indexes. Idempotent (IF NOT EXISTS)."""
+    """Create tables and indexes. Idempotent.
+
+    If the search functions changed since the last call, the stored search_vector
+    column (and its GIN index) is rebuilt so existing rows are indexed with the new
+    definition.
+    """
+    if isinstance(conn, MemoryDatabase):
+        return
     with conn.cursor() as cur:
+        cur.execute(SEARCH_FUNCTIONS_SQL)
+        before = cur.fetchall()
         cur.execute(DDL)
+        cur.execute(SEARCH_FUNCTIONS_SQL)
+        if before and cur.fetchall() != before:
+            cur.execute("ALTER TABLE grants DROP COLUMN IF EXISTS search_vector")
+            cur.execute(DDL)
     conn.commit()
 
 
 def drop_tables(conn: Any) -> None:
-    """Drop grants table. For tests or reset."""
+    """Drop all tables. For tests or reset."""
     with conn.cursor() as cur:
+        cur.execute("DROP VIEW IF EXISTS grant_facet_values")
+        cur.execute("DROP TABLE IF EXISTS grant_facets CASCADE")
+        cur.execute("DROP TABLE IF EXISTS grant_versions CASCADE")
+        cur.execute("DROP TABLE IF EXISTS details_queue CASCADE")
+        cur.execute("DROP TABLE IF EXISTS scrape_run_sources CASCADE")
+        cur.execute("DROP TABLE IF EXISTS scrape_runs CASCADE")
+        cur.execute("DROP TABLE IF EXISTS grant_signatures CASCADE")
         cur.execute("DROP TABLE IF EXISTS grants CASCADE")
     conn.commit()
 
@@ -0,0 +1,118 @@
+"""Benchmark JSON decoding of HUJI responses and JSONB encoding of Grant.extra per codec.
+
+Run from FundFinder project root with the project env activated, e.g.:
+  cd FundFinder
+  source .venv/bin/activate
+  python scripts/benchmark_codec.py --documents 2000 --repeat 5
+
+"baseline" is the path used before services/scraper/codec.py: response bytes decoded
+to str, stripped of whitespace and BOM, then json.loads; json.dumps(ensure_ascii=False)
+for encoding. Every installed codec (orjson, msgspec, json) is timed on the same
+synthetic HUJI-like details bodies (with a BOM, as the server sends them) and on the
+extra dicts that upsert_many writes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+_root = Path(__file__).resolve().parent.parent
+if _root not in sys.path:
+    sys.path.insert(0, str(_root))
+
+from services.scraper.codec import UTF8_BOM, available_codecs
+
+WORDS = [
+    "מלגה", "מלגות", "סטודנטים", "לימודים", "מצוינות", "מחקר", "תואר", "ראשון", "שני",
+    "מילואים", "לוחמים", "עולים", "חדשים", "פריפריה", "הנדסה", "רפואה", "משפטים", "סיוע",
+]
+
+
+def make_details(rng: random.Random, i: int) -> dict[str, Any]:
+    text = lambda k: " ".join(rng.choices(WORDS, k=k))  # noqa: E731
+    return {
+        "id": i,
+        "title": text(6),
+        "description": f"<p>{text(120)}</p>",
+        "conditions": f"<ul><li>{text(30)}</li><li>{text(30)}</li></ul>",
+        "amount": rng.choice([None, 5000, 10000, 25000]),
+        "deadline": f"{rng.randint(1, 28)}.{rng.randint(1, 12)}.2025",
+        "academicYear": "תשפ\"ה",
+        "scholarshipType": rng.choice(["מלגת הצטיינות", "מלגת סיוע", "מלגת מחקר"]),
+        "faculties": [{"id": f, "name": text(2)} for f in range(rng.randint(1, 5))],
+    }
+
+
+def make_extra(details: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "huji_id": details["id"],
+        "academic_year_text": details["academicYear"],
+        "scholarship_type": details["scholarshipType"],
+        "faculties": [f["name"] for f in details["faculties"]],
+    }
+
+
+def baseline_loads(body: bytes) -> Any:
+    text = body.decode("utf-8", errors="replace").strip().lstrip("\ufeff")
+    return json.loads(text)
+
+
+def baseline_dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def best_of(repeat: int, fn: Callable[[Any], Any], items: list[Any]) -> float:
+    """Best wall time in ms of running fn over items, out of repeat runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark JSON codecs on HUJI-like payloads")
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    details = [make_details(rng, i) for i in range(args.documents)]
+    bodies = [UTF8_BOM + json.dumps(d, ensure_ascii=False).encode("utf-8") + b"\n" for d in details]
+    extras = [make_extra(d) for d in details]
+    total_kb = sum(len(b) for b in bodies) / 1024
+
+    candidates: dict[str, tuple[Callable[[Any], Any], Callable[[Any], Any]]] = {
+        "baseline": (baseline_loads, baseline_dumps),
+    }
+    for name, c in available_codecs().items():
+        candidates[name] = (c.loads, c.dumps)
+
+    for name, (loads, _) in candidates.items():
+        if loads(bodies[0]) != details[0]:
+            raise SystemExit(f"{name}: decoded document differs from source")
+
+    print(f"{args.documents} details bodies, {total_kb:.0f} KiB; best of {args.repeat}")
+    print(f"{'codec':<10} {'decode ms':>10} {'MiB/s':>8} {'encode ms':>10} {'speedup':>8}")
+    base_total = None
+    for name, (loads, dumps) in candidates.items():
+        decode_ms = best_of(args.repeat, loads, bodies)
+        encode_ms = best_of(args.repeat, dumps, extras)
+        total = decode_ms + encode_ms
+        base_total = base_total or total
+        mib_s = (total_kb / 1024) / (decode_ms / 1000)
+        print(f"{name:<10} {decode_ms:>10.1f} {mib_s:>8.1f} {encode_ms:>10.1f} {base_total / total:>7.2f}x")
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding="utf-8")
+    main()
@@ -0,0 +1,150 @@
+"""Benchmark the pipeline end to end: run_sources -> upsert_signatures -> upsert_many.
+
+Run from FundFinder project root with the project env activated, e.g.:
+  cd FundFinder
+  source .venv/bin/activate
+  python scripts/benchmark_pipeline.py --sources 4 --grants-per-source 2000 --rounds 3
+
+Scrapers are synthetic: grants are generated up front and returned by scrape(), so
+timings cover pipeline work (hash dedupe, near-duplicate detection) and persistence
+only. Each round after the first changes --change-rate of the grants, like a real
+refresh. A share of grants is duplicated across sources to exercise near-duplicate
+grouping.
+
+By default persistence uses the in-memory repository (--database-url memory://benchmark),
+so results do not include database latency. Pass a postgresql:// URL to include it
+(synthetic grants are then written to that database).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+_root = Path(__file__).resolve().parent.parent
+if _root not in sys.path:
+    sys.path.insert(0, str(_root))
+
+from services.scraper.base import SourceScraper
+from services.scraper.dedupe import NearDuplicateIndex
+from services.scraper.models import Grant
+from services.scraper.pipeline import run_sources
+from services.scraper.utils import content_hash, utc_now
+
+WORDS = [
+    "מלגה", "מלגות", "סטודנטים", "לימודים", "מצוינות", "מחקר", "תואר", "ראשון", "שני",
+    "מילואים", "לוחמים", "עולים", "חדשים", "פריפריה", "הנדסה", "רפואה", "משפטים", "סיוע",
+    "כלכלי", "שכר", "לימוד", "הגשה", "מועד", "אחרון", "זכאות", "ממוצע", "ציונים", "שנה",
+]
+CROSS_SOURCE_SHARE = 0.05
+
+
+class SyntheticScraper(SourceScraper):
+    def __init__(self, source_name: str) -> None:
+        super().__init__(source_name, f"https://bench.example/{source_name}")
+        self.grants: list[Grant] = []
+
+    def scrape(self) -> list[Grant]:
+        return self.grants
+
+
+def make_grant(source_name: str, i: int, text: str, version: int) -> Grant:
+    title = f"{text[:40]} {i}"
+    description = f"{text} גרסה {version}"
+    source_url = f"https://bench.example/{source_name}/{i}"
+    return Grant(
+        title=title,
+        description=description,
+        source_url=source_url,
+        source_name=source_name,
+        currency="ILS",
+        content_hash=content_hash(title, description, None, None, None, source_url),
+        fetched_at=utc_now(),
+    )
+
+
+def build_round(
+    scrapers: list[SyntheticScraper],
+    texts: list[list[str]],
+    versions: list[list[int]],
+    change_rate: float,
+    rng: random.Random,
+    first: bool,
+) -> None:
+    for s, (scraper, source_texts) in enumerate(zip(scrapers, texts)):
+        for i in range(len(source_texts)):
+            if not first and rng.random() < change_rate:
+                versions[s][i] += 1
+        scraper.grants = [
+            make_grant(scraper.source_name, i, text, versions[s][i]) for i, text in enumerate(source_texts)
+        ]
+
+
+def drain_changes(repo, conn, cursor: int) -> tuple[int, int]:
+    """Read the change feed past cursor. Returns (new cursor, changes read)."""
+    count = 0
+    while batch := repo.changes_since(conn, cursor, limit=10_000):
+        count += len(batch)
+        cursor = batch[-1].cursor
+    return cursor, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark run_sources + persistence")
+    parser.add_argument("--sources", type=int, default=4)
+    parser.add_argument("--grants-per-source", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--change-rate", type=float, default=0.1)
+    parser.add_argument("--no-near-duplicates", action="store_true")
+    parser.add_argument("--database-url", default="memory://benchmark")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from backend.db import create_tables, get_connection, get_repository
+
+    rng = random.Random(42)
+    shared = [" ".join(rng.choices(WORDS, k=60)) for _ in range(int(args.grants_per_source * CROSS_SOURCE_SHARE))]
+    texts = []
+    for _ in range(args.sources):
+        own = [" ".join(rng.choices(WORDS, k=60)) for _ in range(args.grants_per_source - len(shared))]
+        texts.append(shared + own)
+    versions = [[0] * len(t) for t in texts]
+    scrapers = [SyntheticScraper(f"bench_{s}") for s in range(args.sources)]
+
+    repo = get_repository()
+    print(f"Backend: {type(repo).__name__} ({args.database_url})")
+    print(f"{'round':>5} {'grants':>7} {'kept':>7} {'pipeline ms':>12} {'persist ms':>11} {'changes':>8}")
+    with get_connection() as conn:
+        create_tables(conn)
+        cursor, _ = drain_changes(repo, conn, 0)
+        for round_no in range(args.rounds):
+            build_round(scrapers, texts, versions, args.change_rate, rng, first=round_no == 0)
+            near_duplicates = None
+            if not args.no_near_duplicates:
+                near_duplicates = NearDuplicateIndex()
+                near_duplicates.load(repo.get_signatures(conn))
+
+            start = time.perf_counter()
+            grants = run_sources(scrapers, near_duplicates=near_duplicates)
+            pipeline_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            if near_duplicates is not None:
+                repo.upsert_signatures(conn, near_duplicates.records())
+            repo.upsert_many(conn, grants)
+            conn.commit()
+            persist_ms = (time.perf_counter() - start) * 1000
+
+            cursor, changes = drain_changes(repo, conn, cursor)
+            total = sum(len(s.grants) for s in scrapers)
+            print(f"{round_no + 1:>5} {total:>7} {len(grants):>7} {pipeline_ms:>12.1f} {persist_ms:>11.1f} {changes:>8}")
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding="utf-8")
+    main()
@@ -0,0 +1,148 @@
+"""Benchmark GrantRepository.search (tsvector + GIN) against ILIKE scans.
+
+Run from FundFinder project root with the project env activated, e.g.:
+  cd FundFinder
+  source .venv/bin/activate
+  python scripts/benchmark_search.py --rows 100000
+
+Synthetic grants are loaded into a TEMP table named "grants" (same definition as the
+real one, including the generated search_vector and its GIN index). The temp table
+shadows the real table for this session only and is dropped on rollback, so the
+benchmark never touches persisted data.
+
+Environment:
+  - DATABASE_URL (optional): defaults to postgresql://localhost:5432/fundfinder
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+_root = Path(__file__).resolve().parent.parent
+if _root not in sys.path:
+    sys.path.insert(0, str(_root))
+
+from backend.db import GrantRepository, create_tables, get_connection
+
+HEBREW_LETTERS = "אבגדהוזחטיכלמנסעפצקרשת"
+COMMON_WORDS = [
+    "מלגה", "מלגות", "סטודנטים", "לימודים", "בלימודים", "מצוינות", "הצטיינות", "מחקר",
+    "תואר", "ראשון", "שני", "שלישי", "מילואים", "לוחמים", "עולים", "חדשים", "פריפריה",
+    "הנדסה", "רפואה", "משפטים", "מדעי", "המחשב", "סיוע", "כלכלי", "שכר", "לימוד",
+    "scholarship", "excellence", "research", "students", "grant", "tuition",
+]
+VOCABULARY_SIZE = 20_000
+
+
+def build_vocabulary(rng: random.Random) -> tuple[list[str], list[float]]:
+    """Common grant words followed by synthetic Hebrew words, with Zipf-like weights."""
+    words = list(COMMON_WORDS)
+    seen = set(words)
+    while len(words) < VOCABULARY_SIZE:
+        word = "".join(rng.choices(HEBREW_LETTERS, k=rng.randint(4, 8)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    return words, weights
+
+
+def build_queries(words: list[str]) -> list[str]:
+    """Frequent, mid-frequency and rare terms, single and multi-word."""
+    return [
+        words[0],
+        words[2],
+        f"{words[1]} {words[4]}",
+        words[200],
+        words[2_000],
+        words[15_000],
+        f"{words[300]} {words[900]}",
+    ]
+
+
+def _row(i: int, rng: random.Random, words: list[str], weights: list[float]) -> str:
+    title = " ".join(rng.choices(words, weights, k=4)) + f" {i}"
+    description = " ".join(rng.choices(words, weights, k=40))
+    eligibility = " ".join(rng.choices(words, weights, k=8))
+    source = rng.choice(["huji", "mod", "reichman", "government_miluim"])
+    fields = [
+        title,
+        description,
+        f"https://bench.example/grant/{i}",
+        source,
+        eligibility,
+        f"{i:064x}",
+        "2025-01-01T00:00:00+00:00",
+    ]
+    return "\t".join(fields) + "\n"
+
+
+def load_rows(conn, rows: int, words: list[str], weights: list[float]) -> None:
+    rng = random.Random(42)
+    buf = io.StringIO("".join(_row(i, rng, words, weights) for i in range(rows)))
+    with conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE grants (LIKE public.grants INCLUDING ALL)")
+        cur.copy_expert(
+            "COPY grants (title, description, source_url, source_name, eligibility, "
+            "content_hash, fetched_at) FROM STDIN",
+            buf,
+        )
+        cur.execute("ANALYZE grants")
+
+
+def time_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def ilike(conn, query: str, limit: int) -> list:
+    conditions = []
+    params: list = []
+    for word in query.split():
+        conditions.append("(title ILIKE %s OR description ILIKE %s OR eligibility ILIKE %s)")
+        params += [f"%{word}%"] * 3
+    with conn.cursor() as cur:
+        cur.execute(
+            f"SELECT id FROM grants WHERE {' AND '.join(conditions)} ORDER BY id LIMIT %s",
+            params + [limit],
+        )
+        return cur.fetchall()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark full-text search vs ILIKE")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    repo = GrantRepository()
+    words, weights = build_vocabulary(random.Random(7))
+    with get_connection() as conn:
+        create_tables(conn)
+        start = time.perf_counter()
+        load_rows(conn, args.rows, words, weights)
+        print(f"Loaded {args.rows} rows in {time.perf_counter() - start:.1f}s")
+        print(f"{'query':<24} {'search ms':>10} {'ilike ms':>10} {'hits':>6}")
+        for query in build_queries(words):
+            hits = len(repo.search(conn, query, limit=args.limit))
+            fts = time_ms(lambda: repo.search(conn, query, limit=args.limit), args.repeat)
+            scan = time_ms(lambda: ilike(conn, query, args.limit), args.repeat)
+            print(f"{query:<24} {fts:>10.1f} {scan:>10.1f} {hits:>6}")
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding="utf-8")
+    main()
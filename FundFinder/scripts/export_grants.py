@@ -0,0 +1,75 @@
+"""Export the grants table to NDJSON, CSV or Parquet for analytics.
+
+Run from FundFinder project root with the project env activated, e.g.:
+  cd FundFinder
+  source .venv/bin/activate
+  python scripts/export_grants.py --format ndjson --output grants.ndjson
+  python scripts/export_grants.py --format csv --since 2025-03-01 > grants.csv
+  python scripts/export_grants.py --format parquet --output grants.parquet
+
+Export streams from the database (see backend/db/export.py), so memory does not grow
+with the table size. Parquet requires pyarrow (pip install pyarrow).
+
+Environment:
+  - DATABASE_URL (optional): defaults to postgresql://localhost:5432/fundfinder
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+_root = Path(__file__).resolve().parent.parent
+if _root not in sys.path:
+    sys.path.insert(0, str(_root))
+
+from backend.db import get_connection
+from backend.db.export import DEFAULT_BATCH_SIZE, FORMATS, export_grants
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def parse_since(value: str) -> datetime:
+    """ISO date or datetime; naive values are taken as UTC."""
+    since = datetime.fromisoformat(value)
+    return since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export grants to NDJSON, CSV or Parquet")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="Output file; '-' (default) writes to stdout (ndjson/csv only)",
+    )
+    parser.add_argument(
+        "--since",
+        type=parse_since,
+        help="Only grants with fetched_at at or after this ISO date/datetime",
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with get_connection() as conn:
+        if args.format == "parquet":
+            if args.output == "-":
+                parser.error("--format parquet needs --output")
+            count = export_grants(conn, args.format, args.output, args.since, args.batch_size)
+        elif args.output == "-":
+            count = export_grants(conn, args.format, sys.stdout, args.since, args.batch_size)
+        else:
+            with open(args.output, "w", encoding="utf-8", newline="") as out:
+                count = export_grants(conn, args.format, out, args.since, args.batch_size)
+
+    logger.info("Exported %d grants (%s)", count, args.format)
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding="utf-8")
+    main()
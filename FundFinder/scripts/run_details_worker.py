@@ -0,0 +1,194 @@
+"""Distributed details fetching: enqueue listing IDs, then claim and process them in workers.
+
+Run from FundFinder project root with the project env activated, e.g.:
+  cd FundFinder
+  source .venv/bin/activate
+  python scripts/run_details_worker.py --source huji --enqueue   # listing -> details_queue
+  python scripts/run_details_worker.py --source huji             # worker (run several)
+
+Workers claim batches with FOR UPDATE SKIP LOCKED, so any number of them can run on
+one or more machines against the same DATABASE_URL. A worker renews the lease of
+the rest of its batch while fetching (every --lease-seconds / 3), and only persists
+grants of items it still holds. A worker exits when the queue is drained unless
+--forever is given.
+
+Environment:
+  - DATABASE_URL (optional): defaults to postgresql://localhost:5432/fundfinder
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import socket
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+_root = Path(__file__).resolve().parent.parent
+if _root not in sys.path:
+    sys.path.insert(0, str(_root))
+
+import httpx
+
+from backend.db import DetailsQueue, GrantRepository, QueueItem, create_tables, get_connection
+from services.scraper.http_client import make_client
+from services.scraper.models import Grant
+from services.scraper.policy import PolicyClient, policy_for
+from services.scraper.sources.huji.mapper import map_huji_json_to_grant
+from services.scraper.sources.huji.scraper import DETAILS_TIMEOUT, fetch_details, fetch_listing_ids
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+IDLE_SLEEP_SECONDS = 10.0
+
+# Leases of a claimed batch are renewed once this fraction of the lease has passed,
+# checked before each item; one item's fetch must therefore fit in that fraction.
+HEARTBEAT_FRACTION = 3
+
+
+@dataclass(frozen=True)
+class DetailsSource:
+    """A listing -> details source: how to list item IDs, fetch one item, and map it."""
+
+    list_ids: Callable[[], list]
+    fetch: Callable[[PolicyClient | httpx.Client, int], dict | None]
+    map: Callable[[dict], Grant]
+    item_timeout: float
+
+
+# Sources with the HUJI listing -> details shape. Register new ones here.
+DETAILS_SOURCES: dict[str, DetailsSource] = {
+    "huji": DetailsSource(
+        list_ids=fetch_listing_ids,
+        fetch=fetch_details,
+        map=map_huji_json_to_grant,
+        item_timeout=DETAILS_TIMEOUT,
+    ),
+}
+
+
+def enqueue(source_name: str, queue: DetailsQueue) -> None:
+    ids = DETAILS_SOURCES[source_name].list_ids()
+    if not ids:
+        logger.warning("%s: listing returned no IDs; nothing enqueued", source_name)
+        return
+    with get_connection() as conn:
+        create_tables(conn)
+        count = queue.enqueue(conn, ids)
+    logger.info("%s: enqueued %d IDs", source_name, count)
+
+
+def work(source_name: str, queue: DetailsQueue, batch_size: int, forever: bool) -> None:
+    source = DETAILS_SOURCES[source_name]
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    repo = GrantRepository()
+    processed = 0
+    failed = 0
+
+    with (
+        get_connection() as conn,
+        make_client() as http,
+        PolicyClient(http, policy_for(source_name)) as client,
+    ):
+        create_tables(conn)
+        while True:
+            items = queue.claim(conn, worker_id, batch_size)
+            if not items:
+                if not forever:
+                    break
+                time.sleep(IDLE_SLEEP_SECONDS)
+                continue
+
+            fetched: list[tuple[QueueItem, Grant]] = []
+            held = list(items)
+            renewed_at = time.monotonic()
+            for item in items:
+                # Heartbeat: keep the batch leased until its grants are persisted
+                if time.monotonic() - renewed_at >= queue.lease_seconds / HEARTBEAT_FRACTION:
+                    still_held = queue.extend(conn, held, worker_id)
+                    renewed_at = time.monotonic()
+                    if len(still_held) < len(held):
+                        logger.warning("%s: lease lost for %d claimed ids", source_name, len(held) - len(still_held))
+                    held = still_held
+                if item not in held:
+                    continue
+                try:
+                    details = source.fetch(client, int(item.item_id))
+                    if details is None or not isinstance(details, dict):
+                        raise ValueError("details fetch failed")
+                    fetched.append((item, source.map(details)))
+                except Exception as e:
+                    failed += 1
+                    logger.warning(
+                        "%s: id=%s attempt %s failed: %s", source_name, item.item_id, item.attempts, e
+                    )
+                    queue.fail(conn, item, worker_id, str(e))
+                    held.remove(item)
+
+            # Only grants whose item is still ours are persisted: after a lost lease
+            # another worker owns the item and will write it.
+            grants: list[Grant] = []
+            for item, grant in fetched:
+                if item not in held:
+                    continue  # lost at a heartbeat, already logged
+                if queue.complete(conn, item, worker_id):
+                    grants.append(grant)
+                else:
+                    logger.warning("%s: lease lost for id=%s", source_name, item.item_id)
+            # upsert_many commits, which also commits the fail() and complete() updates above
+            if grants:
+                repo.upsert_many(conn, grants)
+            else:
+                conn.commit()
+            processed += len(grants)
+            logger.info("%s: batch of %d done (%d ok so far)", source_name, len(items), processed)
+
+        logger.info(
+            "%s: worker %s finished, ok=%d, failed_attempts=%d, queue=%s",
+            source_name,
+            worker_id,
+            processed,
+            failed,
+            queue.counts(conn),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default="huji", choices=sorted(DETAILS_SOURCES))
+    parser.add_argument("--enqueue", action="store_true", help="Run the listing and enqueue IDs, then exit")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--lease-seconds", type=int, default=300)
+    parser.add_argument("--max-attempts", type=int, default=5)
+    parser.add_argument("--forever", action="store_true", help="Keep polling when the queue is empty")
+    args = parser.parse_args()
+
+    # Worst case for one item: every attempt times out after the longest backoff
+    policy = policy_for(args.source)
+    item_worst = policy.attempts * (DETAILS_SOURCES[args.source].item_timeout + policy.backoff_max)
+    if not args.enqueue and args.lease_seconds < HEARTBEAT_FRACTION * item_worst:
+        parser.error(
+            f"--lease-seconds must be at least {HEARTBEAT_FRACTION * item_worst:.0f} for {args.source} "
+            f"(one item can take {item_worst:.0f}s and leases are renewed every lease/{HEARTBEAT_FRACTION})"
+        )
+
+    queue = DetailsQueue(
+        args.source,
+        lease_seconds=args.lease_seconds,
+        max_attempts=args.max_attempts,
+    )
+    if args.enqueue:
+        enqueue(args.source, queue)
+    else:
+        work(args.source, queue, args.batch_size, args.forever)
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding="utf-8")
+    main()
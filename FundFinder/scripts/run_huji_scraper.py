@@ -1,7 +1,12 @@
-"""Run the HUJI scraper and print grants found. Fully dynamic—handles any number of grants."""
+"""Run the HUJI scraper and print grants found. Fully dynamic—handles any number of grants.
+
+With --resume, an interrupted run continues from its checkpoint (see
+services/scraper/sources/huji/checkpoint.py) instead of refetching every details document.
+"""
 
 from __future__ import annotations
 
+import argparse
 import logging
 import sys
 
@@ -15,7 +20,11 @@ logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
 
 def main() -> None:
-    scraper = HUJIScraper()
+    parser = argparse.ArgumentParser(description="Run the HUJI scraper and print grants found")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint")
+    args = parser.parse_args()
+
+    scraper = HUJIScraper(resume=args.resume)
     print("Running HUJI scraper...")
     print()
 
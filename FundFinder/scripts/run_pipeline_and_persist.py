@@ -1,52 +1,293 @@
-"""Run all scrapers and persist grants to PostgreSQL.
+"""Run all (or selected) scrapers and persist grants to PostgreSQL.
 
 Run from FundFinder project root with the project env activated, e.g.:
   cd FundFinder
   source .venv/bin/activate
   python scripts/run_pipeline_and_persist.py
+  python scripts/run_pipeline_and_persist.py --sources huji,mod
+  python scripts/run_pipeline_and_persist.py --exclude reichman,government_miluim
+  python scripts/run_pipeline_and_persist.py --list-sources
+  python scripts/run_pipeline_and_persist.py --concurrent --source-timeout 300
+  python scripts/run_pipeline_and_persist.py --parse-workers 4
+  python scripts/run_pipeline_and_persist.py --profile profiles/ --profile-sample-ms 5
+  python scripts/run_pipeline_and_persist.py --metrics-dir /var/lib/node_exporter/textfile
+  python scripts/run_pipeline_and_persist.py --trace traces/run.ndjson --trace-sample 0.1
+  python scripts/run_pipeline_and_persist.py --sources huji --resume
 
 Prerequisites:
   - PostgreSQL running locally (brew services start postgresql)
   - Database created: createdb fundfinder
   - Tables created (run once): python -m backend.db.schema
 
+Sources that keep failing are short-circuited for a cool-down (see
+services/scraper/circuit.py); while open, their last persisted grants are served
+as stale and are not written back.
+
+Grants that are near-duplicates of a grant from another source are grouped under
+that grant's URL and not persisted again (see services/scraper/dedupe.py). Their
+MinHash signatures are stored in grant_signatures so grouping is incremental.
+
+With --concurrent, sources run together on one event loop (run_sources_async):
+async sources share the loop, synchronous ones run in worker threads, and each
+source is cut off after --source-timeout seconds. With --parse-workers N, pages are
+downloaded by one thread per source and parsed in N worker processes
+(run_sources_staged).
+
+With --profile DIR, sources run sequentially and each is profiled separately
+(cProfile across its threads, tracemalloc peak and top allocation sites, optional
+sampling profiler); per-source .pstats, .collapsed and summary.json go to DIR.
+
+Every run is recorded in scrape_runs / scrape_run_sources: per source wall time,
+bytes fetched, grants, grants changed since the last run, error class and source
+counters (see services/scraper/runstats.py). Afterwards each source's run is
+compared with its recent runs in the same mode, and slowdowns, yield drops and
+failures are logged as warnings.
+
+With --metrics-dir DIR, request latency and status classes per host, Playwright
+render time, parse time and grants per source, upsert throughput and connection
+wait time are written to DIR/fundfinder.prom on exit, for node-exporter's textfile
+collector (see services/scraper/metrics.py).
+
+With --trace FILE, every HTTP request the scrapers make is traced (status, time to
+first byte, total time, size, retry attempt; see services/scraper/tracing.py); a
+--trace-sample share of them is appended to FILE as NDJSON, and a summary of the
+slowest endpoints and ids is logged at the end of the run.
+
+Sources that checkpoint their progress (HUJI; see services/scraper/sources/huji/
+checkpoint.py) can continue an interrupted run with --resume: details fetched within
+the checkpoint's freshness window are reused and only the remaining ones fetched.
+
+With --prune, persisted grants of a freshly scraped source that the source no longer
+lists are deleted (recorded as deletes in grant_versions). Grants the run left out
+as near-duplicates of another source's grant are still listed and kept. Off by
+default: a partial scrape would otherwise remove grants that come back on the next run.
+
 Environment:
-  - DATABASE_URL (optional): defaults to postgresql://localhost:5432/fundfinder
+  - DATABASE_URL (optional): defaults to postgresql://localhost:5432/fundfinder;
+    memory://<name> uses the in-memory repository (nothing is persisted)
+  - FUNDFINDER_STATE_DIR (optional): where circuit breaker state and checkpoints are stored
+  - FUNDFINDER_METRICS_DIR (optional): default for --metrics-dir
 """
 
 from __future__ import annotations
 
+import argparse
+import asyncio
+import atexit
 import logging
+import os
 import sys
+import time
 from pathlib import Path
 
 _root = Path(__file__).resolve().parent.parent
 if _root not in sys.path:
     sys.path.insert(0, str(_root))
 
-from backend.db import GrantRepository, create_tables, get_connection
-from services.scraper.pipeline import get_all_scrapers, run_sources
+from backend.db import GrantRepository, create_tables, get_connection, get_repository
+from services.scraper import metrics, tracing
+from services.scraper.base import ResumableScraper
+from services.scraper.circuit import CircuitBreakerStore, is_stale
+from services.scraper.dedupe import NearDuplicateIndex
+from services.scraper.models import Grant
+from services.scraper.pipeline import DEFAULT_SOURCE_TIMEOUT, run_sources, run_sources_async, run_sources_staged
+from services.scraper.profiling import SourceProfiler
+from services.scraper.runstats import (
+    BASELINE_WINDOW,
+    CONCURRENT,
+    PROFILED,
+    SEQUENTIAL,
+    STAGED,
+    RunRecorder,
+    find_anomalies,
+)
+from services.scraper.scrapers import get_scrapers, select_sources
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 
+def last_known_good(source_name: str) -> list[Grant]:
+    with get_connection() as conn:
+        return get_repository().get_by_source(conn, source_name)
+
+
+def prune_missing(conn, repo: GrantRepository, grants: list[Grant], listed: set[str] | None = None) -> int:
+    """Delete persisted grants of the sources in grants that are not in grants.
+
+    URLs in listed are kept too: the run saw them but left them out of grants
+    (near-duplicates of another source's grant).
+    """
+    listed = listed or set()
+    scraped: dict[str, set[str]] = {}
+    for g in grants:
+        scraped.setdefault(g.source_name, set()).add(g.source_url)
+    missing = [
+        g.source_url
+        for source_name, urls in scraped.items()
+        for g in repo.get_by_source(conn, source_name)
+        if g.source_url not in urls and g.source_url not in listed
+    ]
+    return repo.delete_many(conn, missing)
+
+
+def _names(value: str) -> list[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
 def main() -> None:
-    logger.info("Running pipeline (all scrapers)...")
-    grants = run_sources(get_all_scrapers())
-    logger.info("Pipeline returned %d grants", len(grants))
+    parser = argparse.ArgumentParser(description="Run scrapers and persist grants")
+    parser.add_argument(
+        "--sources",
+        type=_names,
+        help="Comma-separated sources to run (default: all), e.g. huji,mod",
+    )
+    parser.add_argument("--exclude", type=_names, help="Comma-separated sources to skip")
+    parser.add_argument(
+        "--list-sources",
+        action="store_true",
+        help="List registered sources and exit",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Delete persisted grants that freshly scraped sources no longer list",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--concurrent",
+        action="store_true",
+        help="Run sources concurrently on one event loop",
+    )
+    mode.add_argument(
+        "--parse-workers",
+        type=int,
+        help="Fetch sources in threads and parse pages in this many processes",
+    )
+    parser.add_argument(
+        "--source-timeout",
+        type=float,
+        default=DEFAULT_SOURCE_TIMEOUT,
+        help="Per-source timeout in seconds with --concurrent (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help="Profile each source and write .pstats/.collapsed/summary.json to DIR",
+    )
+    parser.add_argument(
+        "--profile-sample-ms",
+        type=float,
+        help="With --profile, also run a sampling profiler at this interval",
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        default=os.environ.get("FUNDFINDER_METRICS_DIR"),
+        help="Write Prometheus metrics to DIR/fundfinder.prom on exit (node-exporter textfile)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue sources that support it from their last checkpoint",
+    )
+    parser.add_argument("--trace", metavar="FILE", help="Trace HTTP requests to FILE (NDJSON)")
+    parser.add_argument(
+        "--trace-sample",
+        type=float,
+        default=1.0,
+        help="With --trace, share of requests written to FILE (default: %(default)s)",
+    )
+    args = parser.parse_args()
+    if args.profile and (args.concurrent or args.parse_workers):
+        parser.error("--profile runs sources sequentially; drop --concurrent/--parse-workers")
 
-    if not grants:
-        logger.info("No grants to persist")
+    try:
+        specs = select_sources(args.sources, args.exclude)
+    except KeyError as e:
+        parser.error(str(e.args[0]))
+    if args.list_sources:
+        for spec in specs:
+            print(
+                f"{spec.name:<20} browser={'yes' if spec.needs_browser else 'no':<4}"
+                f" expected={spec.expected_size or '?':<5} interval={spec.default_interval / 3600:g}h"
+            )
         return
 
+    if args.metrics_dir:
+        metrics.enable()
+        # Also on failure, so the exporter sees the run's errors
+        atexit.register(metrics.write_textfile, args.metrics_dir)
+
+    repo = get_repository()
+    near_duplicates = NearDuplicateIndex()
     with get_connection() as conn:
         create_tables(conn)
-        repo = GrantRepository()
-        count = repo.upsert_many(conn, grants)
-        conn.commit()
+        near_duplicates.load(repo.get_signatures(conn))
+
+    tracer = tracing.start_tracing(args.trace, args.trace_sample) if args.trace else None
+    logger.info("Running pipeline (%s)...", ", ".join(spec.name for spec in specs))
+    scrapers = get_scrapers([spec.name for spec in specs])
+    if args.resume:
+        for scraper in scrapers:
+            if isinstance(scraper, ResumableScraper):
+                scraper.resume = True
+    if args.concurrent:
+        recorder = RunRecorder(CONCURRENT)
+    elif args.parse_workers:
+        recorder = RunRecorder(STAGED)
+    else:
+        recorder = RunRecorder(PROFILED if args.profile else SEQUENTIAL)
+    options = dict(
+        breakers=CircuitBreakerStore(),
+        fallback=last_known_good,
+        near_duplicates=near_duplicates,
+        recorder=recorder,
+    )
+    if args.concurrent:
+        grants = asyncio.run(run_sources_async(scrapers, timeout=args.source_timeout, **options))
+    elif args.parse_workers:
+        grants = run_sources_staged(scrapers, parse_workers=args.parse_workers, **options)
+    else:
+        profiler = None
+        if args.profile:
+            sample_interval = args.profile_sample_ms / 1000 if args.profile_sample_ms else None
+            profiler = SourceProfiler(args.profile, sample_interval=sample_interval)
+        grants = run_sources(scrapers, profiler=profiler, **options)
+    if tracer is not None:
+        tracing.stop_tracing()
+        tracer.log_summary()
+    logger.info(
+        "Pipeline returned %d grants (%d near-duplicate groups)",
+        len(grants),
+        len(near_duplicates.groups()),
+    )
+
+    grants_total = len(grants)
+    # Stale grants are already persisted; writing them back would only touch fetched_at/extra
+    grants = [g for g in grants if not is_stale(g)]
+
+    count = 0
+    with get_connection() as conn:
+        repo.upsert_signatures(conn, near_duplicates.records())
+        if grants:
+            recorder.set_changed(repo.count_changes(conn, grants))
+            count = repo.upsert_many(conn, grants)
+            conn.commit()
+            logger.info("Persisted %d grants", count)
+            if args.prune:
+                pruned = prune_missing(conn, repo, grants, listed=near_duplicates.added_duplicates())
+                logger.info("Pruned %d grants no longer listed", pruned)
+        else:
+            logger.info("No grants to persist")
+
+        run = recorder.finish(grants_total, count)
+        run_id = repo.record_run(conn, run)
+        history = repo.source_history(conn, run.mode, BASELINE_WINDOW)
 
-    logger.info("Persisted %d grants", count)
+    metrics.set_gauge("last_run_timestamp_seconds", time.time())
+    logger.info("Recorded scrape run %d (%s)", run_id, run.mode)
+    for anomaly in find_anomalies(history, {spec.name: spec.expected_size for spec in specs}):
+        logger.warning("Source %s: %s", anomaly.source_name, anomaly.detail)
 
 
 if __name__ == "__main__":
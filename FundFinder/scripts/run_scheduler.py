@@ -0,0 +1,91 @@
+"""Long-running scheduler: refresh each source on its own adaptive interval and persist grants.
+
+Run from FundFinder project root with the project env activated, e.g.:
+  cd FundFinder
+  source .venv/bin/activate
+  python scripts/run_scheduler.py
+  python scripts/run_scheduler.py --metrics-port 9464
+
+Schedule state (intervals, next run times, last hash digest per source) is kept in
+$FUNDFINDER_STATE_DIR/scheduler_state.json (default: .state/ in the project root),
+so restarting the daemon does not reset what it has learned. Stop with Ctrl+C or SIGTERM.
+
+With --metrics-port, Prometheus metrics (see services/scraper/metrics.py) are served
+on http://127.0.0.1:PORT/metrics. With --metrics-dir, they are also written to
+DIR/fundfinder.prom after every source run, for node-exporter's textfile collector.
+
+Environment:
+  - DATABASE_URL (optional): defaults to postgresql://localhost:5432/fundfinder;
+    memory://<name> uses the in-memory repository (nothing is persisted)
+  - FUNDFINDER_STATE_DIR (optional): where scheduler state is stored
+  - FUNDFINDER_METRICS_DIR (optional): default for --metrics-dir
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+_root = Path(__file__).resolve().parent.parent
+if _root not in sys.path:
+    sys.path.insert(0, str(_root))
+
+from backend.db import create_tables, get_connection, get_repository
+from services.scraper import metrics
+from services.scraper.models import Grant
+from services.scraper.pipeline import get_all_scrapers
+from services.scraper.scheduler import RefreshScheduler
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def persist(source_name: str, grants: list[Grant], metrics_dir: str | None = None) -> None:
+    with get_connection() as conn:
+        count = get_repository().upsert_many(conn, grants)
+    logger.info("Persisted %d grants from %s", count, source_name)
+    metrics.set_gauge("last_run_timestamp_seconds", time.time())
+    if metrics_dir:
+        metrics.write_textfile(metrics_dir)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh sources on adaptive intervals and persist grants")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this local port")
+    parser.add_argument(
+        "--metrics-dir",
+        default=os.environ.get("FUNDFINDER_METRICS_DIR"),
+        help="Write Prometheus metrics to DIR/fundfinder.prom after each source run",
+    )
+    args = parser.parse_args()
+    if args.metrics_dir:
+        metrics.enable()
+    if args.metrics_port is not None:
+        metrics.serve(args.metrics_port)
+
+    with get_connection() as conn:
+        create_tables(conn)
+
+    scheduler = RefreshScheduler(
+        get_all_scrapers(),
+        on_grants=lambda source_name, grants: persist(source_name, grants, args.metrics_dir),
+    )
+
+    def _stop(signum, frame) -> None:
+        logger.info("Received signal %s, stopping after the current source", signum)
+        scheduler.stop()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    scheduler.run_forever()
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding="utf-8")
+    main()
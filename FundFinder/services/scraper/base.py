@@ -1,7 +1,11 @@
-"""Base class for all scrapers. Every website scraper subclasses this."""
+"""Base classes for all scrapers. Every website scraper subclasses one of these."""
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator
 
+from services.scraper import metrics
 from services.scraper.models import Grant
 
 
@@ -16,11 +20,110 @@ class SourceScraper(ABC):
 
     source_name: str
     base_url: str
+    # Source-specific counters from the last scrape (e.g. details_ok), stored with the run
+    run_stats: dict[str, int]
 
     def __init__(self, source_name: str, base_url: str) -> None:
         self.source_name = source_name
         self.base_url = base_url
+        self.run_stats = {}
 
     @abstractmethod
     def scrape(self) -> list[Grant]:
-        ...
\ No newline at end of file
+        ...
+
+
+class AsyncSourceScraper(SourceScraper):
+    """Interface for a grant source with a native asyncio implementation.
+
+    Subclasses implement ascrape(); pipeline.run_sources_async awaits it so all async
+    sources share one event loop. scrape() runs ascrape() in a fresh event loop, so an
+    async source also works with the synchronous pipeline. A source may override
+    scrape() with its own synchronous implementation.
+    """
+
+    @abstractmethod
+    async def ascrape(self) -> list[Grant]:
+        ...
+
+    def scrape(self) -> list[Grant]:
+        # Imported here: asyncio is slow to import and sync-only runs never need it
+        import asyncio
+
+        return asyncio.run(self.ascrape())
+
+
+class ThreadedScraper(AsyncSourceScraper):
+    """Adapter running a synchronous SourceScraper in a worker thread.
+
+    Cancelling ascrape() stops waiting for the thread, but the thread itself runs
+    until scrape() returns.
+    """
+
+    def __init__(self, scraper: SourceScraper) -> None:
+        super().__init__(scraper.source_name, scraper.base_url)
+        self.scraper = scraper
+
+    async def ascrape(self) -> list[Grant]:
+        import asyncio
+
+        try:
+            return await asyncio.to_thread(self.scraper.scrape)
+        finally:
+            self.run_stats = self.scraper.run_stats
+
+    def scrape(self) -> list[Grant]:
+        return self.scraper.scrape()
+
+
+def as_async(scraper: SourceScraper) -> AsyncSourceScraper:
+    """scraper itself if it is async, otherwise wrapped in a ThreadedScraper."""
+    if isinstance(scraper, AsyncSourceScraper):
+        return scraper
+    return ThreadedScraper(scraper)
+
+
+class ResumableScraper(SourceScraper):
+    """Interface for a source that checkpoints its progress to local state.
+
+    With resume=True, a run continues from the last checkpoint of an interrupted
+    run instead of starting over (run_pipeline_and_persist.py --resume).
+    """
+
+    resume: bool = False
+
+
+@dataclass(frozen=True)
+class FetchedPage:
+    """Raw output of a fetch stage: one downloaded document."""
+
+    url: str
+    body: str
+    fetched_at: datetime
+
+
+class StagedScraper(SourceScraper):
+    """Interface for a source split into an I/O fetch stage and a CPU-bound parse stage.
+
+    fetch() downloads pages; parse(page) turns one page into grants. parse is a
+    staticmethod and may depend only on the page, so the staged runner
+    (services/scraper/staged.py) can run it in a worker process while other
+    downloads continue. scrape() runs both stages in-process, through parse_page().
+    """
+
+    @abstractmethod
+    def fetch(self) -> Iterator[FetchedPage]:
+        ...
+
+    @staticmethod
+    @abstractmethod
+    def parse(page: FetchedPage) -> list[Grant]:
+        ...
+
+    def parse_page(self, page: FetchedPage) -> list[Grant]:
+        """parse(page), timed in the parse_duration_seconds metric."""
+        with metrics.timer("parse_duration_seconds", source=self.source_name):
+            return self.parse(page)
+
+    def scrape(self) -> list[Grant]:
+        return [grant for page in self.fetch() for grant in self.parse_page(page)]
@@ -0,0 +1,123 @@
+"""Per-source circuit breakers with persisted state.
+
+A source that fails (raises, or returns no grants) failure_threshold times in a row
+opens its circuit: for the cool-down period the pipeline skips it entirely and
+serves a last-known-good fallback instead. After the cool-down one half-open probe
+run is allowed; success closes the circuit, failure reopens it.
+
+State is stored in a JSON file so breakers survive across scheduled (cron) runs.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from services.scraper.models import Grant
+from services.scraper.utils import state_dir, utc_now
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = timedelta(minutes=30)
+STATE_FILENAME = "circuit_breakers.json"
+
+STALE_KEY = "stale"
+
+
+@dataclass
+class BreakerState:
+    state: str = CLOSED
+    failures: int = 0
+    opened_at: str | None = None
+
+
+class CircuitBreakerStore:
+    """Circuit breakers for all sources, persisted to one JSON file."""
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: timedelta = DEFAULT_COOLDOWN,
+    ) -> None:
+        self.path = path or state_dir() / STATE_FILENAME
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._states = self._load()
+
+    def _load(self) -> dict[str, BreakerState]:
+        if not self.path.exists():
+            return {}
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+            return {name: BreakerState(**data) for name, data in raw.items()}
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Circuit breakers: ignoring unreadable state file %s: %s", self.path, e)
+            return {}
+
+    def _save(self) -> None:
+        data = {name: asdict(s) for name, s in self._states.items()}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def state(self, source_name: str) -> str:
+        with self._lock:
+            return self._states.get(source_name, BreakerState()).state
+
+    def allow(self, source_name: str) -> bool:
+        """Return True if the source may run now. Moves open -> half-open after the cool-down."""
+        with self._lock:
+            s = self._states.get(source_name)
+            if s is None or s.state != OPEN:
+                return True
+            opened_at = datetime.fromisoformat(s.opened_at) if s.opened_at else utc_now()
+            if utc_now() - opened_at < self.cooldown:
+                return False
+            s.state = HALF_OPEN
+            self._save()
+            logger.info("Circuit %s: half-open, probing", source_name)
+            return True
+
+    def record_success(self, source_name: str) -> None:
+        with self._lock:
+            s = self._states.get(source_name)
+            if s is not None and (s.state != CLOSED or s.failures):
+                logger.info("Circuit %s: closed", source_name)
+            self._states[source_name] = BreakerState()
+            self._save()
+
+    def record_failure(self, source_name: str) -> None:
+        with self._lock:
+            s = self._states.setdefault(source_name, BreakerState())
+            s.failures += 1
+            if s.state == HALF_OPEN or s.failures >= self.failure_threshold:
+                s.state = OPEN
+                s.opened_at = utc_now().isoformat()
+                logger.warning(
+                    "Circuit %s: open after %d failure(s); skipping for %s",
+                    source_name,
+                    s.failures,
+                    self.cooldown,
+                )
+            self._save()
+
+
+def mark_stale(grant: Grant) -> Grant:
+    """Copy of grant flagged as served from the last persisted state, not a fresh scrape."""
+    return grant.model_copy(update={"extra": {**(grant.extra or {}), STALE_KEY: True}})
+
+
+def is_stale(grant: Grant) -> bool:
+    return bool(grant.extra and grant.extra.get(STALE_KEY))
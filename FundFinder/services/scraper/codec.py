@@ -0,0 +1,139 @@
+"""JSON codec: orjson or msgspec when installed, stdlib json otherwise.
+
+loads() decodes straight from response bytes: leading whitespace and a UTF-8 BOM
+are skipped through a memoryview instead of decoding to str and copying. dumps()
+returns compact UTF-8 JSON text (non-ASCII kept), ready for a JSONB parameter;
+dates and datetimes are written as ISO strings with every backend.
+
+The backend is picked once at import, preferring orjson, then msgspec, then json.
+Set FUNDFINDER_JSON_CODEC=orjson|msgspec|json to force one (e.g. for benchmarks).
+All backends raise ValueError on invalid input.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable
+
+UTF8_BOM = b"\xef\xbb\xbf"
+_WHITESPACE = b" \t\r\n"
+
+Payload = bytes | bytearray | memoryview | str
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+    name: str
+    loads: Callable[[Payload], Any]
+    dumps: Callable[[Any], str]
+
+
+def json_payload(data: Payload) -> Payload:
+    """data without leading whitespace and UTF-8 BOM; bytes are sliced, not copied."""
+    if isinstance(data, str):
+        return data.lstrip().lstrip("\ufeff").lstrip()
+    view = memoryview(data)
+    start = _skip_whitespace(view, 0)
+    if view[start : start + 3] == UTF8_BOM:
+        start = _skip_whitespace(view, start + 3)
+    return view[start:] if start else view
+
+
+def _skip_whitespace(view: memoryview, start: int) -> int:
+    while start < len(view) and view[start] in _WHITESPACE:
+        start += 1
+    return start
+
+
+def is_blank(data: Payload) -> bool:
+    """True if data holds nothing but whitespace and a BOM."""
+    return len(json_payload(data)) == 0
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_codec() -> JsonCodec:
+    def loads(data: Payload) -> Any:
+        payload = json_payload(data)
+        return json.loads(payload if isinstance(payload, str) else bytes(payload))
+
+    def dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default)
+
+    return JsonCodec("json", loads, dumps)
+
+
+def _orjson_codec() -> JsonCodec:
+    import orjson
+
+    def loads(data: Payload) -> Any:
+        return orjson.loads(json_payload(data))
+
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj, default=_default).decode("utf-8")
+
+    return JsonCodec("orjson", loads, dumps)
+
+
+def _msgspec_codec() -> JsonCodec:
+    import msgspec
+
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder(enc_hook=_default)
+
+    def loads(data: Payload) -> Any:
+        try:
+            return decoder.decode(json_payload(data))
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def dumps(obj: Any) -> str:
+        return encoder.encode(obj).decode("utf-8")
+
+    return JsonCodec("msgspec", loads, dumps)
+
+
+_FACTORIES: dict[str, Callable[[], JsonCodec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _stdlib_codec,
+}
+
+
+def available_codecs() -> dict[str, JsonCodec]:
+    """Every codec whose library is installed, in order of preference."""
+    codecs = {}
+    for name, factory in _FACTORIES.items():
+        try:
+            codecs[name] = factory()
+        except ImportError:
+            continue
+    return codecs
+
+
+def get_codec(name: str | None = None) -> JsonCodec:
+    """The named codec, or the preferred installed one. Raises ValueError if unavailable."""
+    if name is None:
+        for factory in _FACTORIES.values():
+            try:
+                return factory()
+            except ImportError:
+                continue
+    if name not in _FACTORIES:
+        raise ValueError(f"Unknown JSON codec: {name} (expected one of {', '.join(_FACTORIES)})")
+    try:
+        return _FACTORIES[name]()
+    except ImportError as e:
+        raise ValueError(f"JSON codec {name} is not installed") from e
+
+
+CODEC = get_codec(os.environ.get("FUNDFINDER_JSON_CODEC") or None)
+loads = CODEC.loads
+dumps = CODEC.dumps
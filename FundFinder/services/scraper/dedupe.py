@@ -0,0 +1,193 @@
+"""Near-duplicate detection across sources with MinHash signatures and LSH buckets.
+
+Each grant's normalised title + description is split into character shingles and
+summarised by a MinHash signature. Signatures use one-permutation hashing: each
+shingle is hashed once and routed to one of NUM_PERM bins, which keep their
+minimum; empty bins borrow from another bin along a fixed probe order
+(densification). That costs one hash per shingle instead of NUM_PERM. Signatures are cut into bands; grants sharing
+any band bucket become candidate pairs, so candidates are found in roughly linear
+time instead of comparing all pairs. Candidates are confirmed by their estimated
+Jaccard similarity.
+
+Only grants from different sources are grouped (within one source, near-identical
+pages such as the two Miluim tiers are distinct grants). The first grant seen in a
+group is its canonical grant; signatures and canonical URLs can be persisted and
+loaded back so later runs keep the same grouping.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+
+from services.scraper.models import Grant
+from services.scraper.utils import clean_hebrew_text
+
+NUM_PERM = 128  # power of two: the low bits of a shingle hash pick its bin
+BANDS = 16  # 16 bands x 8 rows: pairs above ~0.7 Jaccard almost always collide
+SHINGLE_SIZE = 5
+SIMILARITY_THRESHOLD = 0.85
+
+_BIN_BITS = NUM_PERM.bit_length() - 1
+_BIN_MASK = NUM_PERM - 1
+_EMPTY = (1 << 63) - 1
+_rng = random.Random(1_000_003)  # fixed seed: signatures must be stable across runs
+# Densification probe order per bin; each bin first tries bins other than itself
+_PROBES = [_rng.sample([j for j in range(NUM_PERM) if j != i], NUM_PERM - 1) for i in range(NUM_PERM)]
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+@dataclass(frozen=True)
+class SignatureRecord:
+    """A persisted signature: one per grant source_url."""
+
+    source_url: str
+    source_name: str
+    signature: list[int]
+    canonical_url: str
+
+
+def grant_text(grant: Grant) -> str:
+    """Normalised text compared for near-duplicates: title + description."""
+    text = clean_hebrew_text(f"{grant.title} {grant.description or ''}").lower()
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+def minhash_signature(text: str) -> list[int]:
+    """MinHash signature of text's shingle set (NUM_PERM values, each < 2**63)."""
+    bins = [_EMPTY] * NUM_PERM
+    for shingle in shingles(text):
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        i = h & _BIN_MASK
+        value = h >> (_BIN_BITS + 1)
+        if value < bins[i]:
+            bins[i] = value
+    filled = [v != _EMPTY for v in bins]
+    if not any(filled):
+        return bins
+    signature = list(bins)
+    for i in range(NUM_PERM):
+        if not filled[i]:
+            j = next(j for j in _PROBES[i] if filled[j])
+            signature[i] = bins[j]
+    return signature
+
+
+def estimated_similarity(sig_a: list[int], sig_b: list[int]) -> float:
+    """Estimated Jaccard similarity: fraction of equal signature positions."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def _band_keys(signature: list[int], bands: int) -> list[tuple]:
+    rows = len(signature) // bands
+    return [(band, tuple(signature[band * rows : (band + 1) * rows])) for band in range(bands)]
+
+
+class NearDuplicateIndex:
+    """LSH index that assigns every added grant a canonical source_url."""
+
+    def __init__(self, bands: int = BANDS, threshold: float = SIMILARITY_THRESHOLD) -> None:
+        self.bands = bands
+        self.threshold = threshold
+        self._buckets: dict[tuple, set[str]] = defaultdict(set)
+        self._signatures: dict[str, list[int]] = {}
+        self._sources: dict[str, str] = {}
+        self._canonical: dict[str, str] = {}
+        self._added: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def load(self, records: list[SignatureRecord]) -> None:
+        """Restore signatures and canonical assignments from a previous run."""
+        for r in records:
+            self._insert(r.source_url, r.source_name, list(r.signature), r.canonical_url)
+
+    def _insert(self, key: str, source_name: str, signature: list[int], canonical: str) -> None:
+        self._remove(key)
+        self._signatures[key] = signature
+        self._sources[key] = source_name
+        self._canonical[key] = canonical
+        for band_key in _band_keys(signature, self.bands):
+            self._buckets[band_key].add(key)
+
+    def _remove(self, key: str) -> None:
+        old = self._signatures.pop(key, None)
+        if old is None:
+            return
+        for band_key in _band_keys(old, self.bands):
+            self._buckets[band_key].discard(key)
+
+    def _best_match(self, key: str, source_name: str, signature: list[int]) -> str | None:
+        candidates: set[str] = set()
+        for band_key in _band_keys(signature, self.bands):
+            candidates |= self._buckets.get(band_key, set())
+        best, best_score = None, self.threshold
+        for other in candidates:
+            if other == key or self._sources[other] == source_name:
+                continue
+            # Joining other's group would group grant with one from its own source
+            if self._sources.get(self.canonical(other)) == source_name:
+                continue
+            score = estimated_similarity(signature, self._signatures[other])
+            if score >= best_score:
+                best, best_score = other, score
+        return best
+
+    def add(self, grant: Grant) -> str:
+        """Index grant and return its canonical source_url (its own URL if it is canonical)."""
+        key = grant.source_url
+        signature = minhash_signature(grant_text(grant))
+        match = self._best_match(key, grant.source_name, signature)
+        canonical = key
+        if match is not None:
+            match_canonical = self.canonical(match)
+            # Matching one of our own duplicates (e.g. re-adding a canonical in a later run)
+            if match_canonical != key:
+                canonical = match_canonical
+        self._insert(key, grant.source_name, signature, canonical)
+        self._added.add(key)
+        return canonical
+
+    def canonical(self, source_url: str) -> str:
+        """Canonical URL for source_url, following chains left by regrouping."""
+        seen = {source_url}
+        current = self._canonical.get(source_url, source_url)
+        while current not in seen and self._canonical.get(current, current) != current:
+            seen.add(current)
+            current = self._canonical[current]
+        return current
+
+    def added_duplicates(self) -> set[str]:
+        """source_urls passed to add() (not just loaded) that have another canonical grant."""
+        return {key for key in self._added if self.canonical(key) != key}
+
+    def groups(self) -> dict[str, list[str]]:
+        """{canonical_url: [duplicate urls]} for groups with at least one duplicate."""
+        groups: dict[str, list[str]] = defaultdict(list)
+        for key in self._canonical:
+            canonical = self.canonical(key)
+            if key != canonical:
+                groups[canonical].append(key)
+        return {c: sorted(members) for c, members in groups.items()}
+
+    def records(self) -> list[SignatureRecord]:
+        """All signatures with their canonical assignment, for persistence."""
+        return [
+            SignatureRecord(
+                source_url=key,
+                source_name=self._sources[key],
+                signature=sig,
+                canonical_url=self.canonical(key),
+            )
+            for key, sig in self._signatures.items()
+        ]
@@ -0,0 +1,201 @@
+"""Shared httpx client factories. Every scraper request goes through the per-host limiter,
+holding its slot until the response body is closed, and its response bytes are
+counted per host in TRANSFER. While tracing is on (see
+tracing.py), new clients also get the tracer's event hooks."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from typing import Any, AsyncIterator, Iterator
+
+import httpx
+
+from services.scraper import metrics, tracing
+from services.scraper.ratelimit import HostLimiter, get_limiter
+
+
+class TransferCounter:
+    """Bytes received per host, as read off the wire (before content decoding). Thread-safe."""
+
+    def __init__(self) -> None:
+        self._bytes: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, host: str, size: int) -> None:
+        with self._lock:
+            self._bytes[host] += size
+
+    def get(self, host: str) -> int:
+        with self._lock:
+            return self._bytes[host]
+
+
+TRANSFER = TransferCounter()
+
+
+class _Outcome:
+    """A response's limiter slot: given back once, with the latency up to that point."""
+
+    def __init__(self, limiter: HostLimiter, response: httpx.Response, start: float, host: str) -> None:
+        self._limiter = limiter
+        self._status_code = response.status_code
+        self._retry_after = response.headers.get("Retry-After")
+        self._start = start
+        self._host = host
+        self._released = False
+
+    def release(self, timed_out: bool = False) -> None:
+        if self._released:
+            return
+        self._released = True
+        if timed_out:
+            self._limiter.release(timed_out=True)
+            metrics.inc("http_responses_total", host=self._host, status_class="timeout")
+            return
+        latency = time.monotonic() - self._start
+        self._limiter.release(status_code=self._status_code, latency=latency, retry_after=self._retry_after)
+        metrics.observe("http_request_duration_seconds", latency, host=self._host)
+        metrics.inc("http_responses_total", host=self._host, status_class=metrics.status_class(self._status_code))
+
+
+class _CountingStream(httpx.SyncByteStream):
+    """Response body that counts its bytes per host and holds the host's limiter slot
+    until it is closed, so body download counts against the concurrency limit and in
+    the latency sample."""
+
+    def __init__(self, stream: httpx.SyncByteStream, host: str, outcome: _Outcome) -> None:
+        self._stream = stream
+        self._host = host
+        self._outcome = outcome
+        self._timed_out = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            for chunk in self._stream:
+                TRANSFER.add(self._host, len(chunk))
+                yield chunk
+        except httpx.TimeoutException:
+            self._timed_out = True
+            raise
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._outcome.release(timed_out=self._timed_out)
+
+
+class _AsyncCountingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, host: str, outcome: _Outcome) -> None:
+        self._stream = stream
+        self._host = host
+        self._outcome = outcome
+        self._timed_out = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._stream:
+                TRANSFER.add(self._host, len(chunk))
+                yield chunk
+        except httpx.TimeoutException:
+            self._timed_out = True
+            raise
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._outcome.release(timed_out=self._timed_out)
+
+
+class LimitedTransport(httpx.BaseTransport):
+    """Transport that waits on the host's HostLimiter and reports each outcome back to it.
+
+    The slot is held until the response body is closed (see _CountingStream).
+    """
+
+    def __init__(self, transport: httpx.BaseTransport | None = None) -> None:
+        self._transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        limiter = get_limiter(host)
+        limiter.acquire()
+        start = time.monotonic()
+        request.extensions[tracing.SENT_AT] = start
+        try:
+            response = self._transport.handle_request(request)
+        except httpx.TimeoutException:
+            limiter.release(timed_out=True)
+            metrics.inc("http_responses_total", host=host, status_class="timeout")
+            raise
+        except Exception:
+            limiter.release()
+            metrics.inc("http_responses_total", host=host, status_class="error")
+            raise
+        except BaseException:
+            # Interrupted, not failed: free the slot without a congestion signal
+            limiter.cancel()
+            metrics.inc("http_responses_total", host=host, status_class="cancelled")
+            raise
+        response.stream = _CountingStream(response.stream, host, _Outcome(limiter, response, start, host))
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncLimitedTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of LimitedTransport, sharing the same per-host limiters."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        limiter = get_limiter(host)
+        await limiter.aacquire()
+        start = time.monotonic()
+        request.extensions[tracing.SENT_AT] = start
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TimeoutException:
+            limiter.release(timed_out=True)
+            metrics.inc("http_responses_total", host=host, status_class="timeout")
+            raise
+        except Exception:
+            limiter.release()
+            metrics.inc("http_responses_total", host=host, status_class="error")
+            raise
+        except BaseException:
+            # Cancellation (a losing hedge, --source-timeout): the slot is freed without
+            # a congestion signal and counted apart from errors
+            limiter.cancel()
+            metrics.inc("http_responses_total", host=host, status_class="cancelled")
+            raise
+        response.stream = _AsyncCountingStream(response.stream, host, _Outcome(limiter, response, start, host))
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _with_trace_hooks(kwargs: dict[str, Any], asynchronous: bool) -> dict[str, Any]:
+    hooks = tracing.event_hooks(asynchronous)
+    if not hooks:
+        return kwargs
+    own = kwargs.get("event_hooks") or {}
+    merged = {name: [*hooks.get(name, []), *own.get(name, [])] for name in ("request", "response")}
+    return {**kwargs, "event_hooks": merged}
+
+
+def make_client(**kwargs: Any) -> httpx.Client:
+    """Create an httpx.Client whose requests are rate limited per host."""
+    return httpx.Client(transport=LimitedTransport(), **_with_trace_hooks(kwargs, asynchronous=False))
+
+
+def make_async_client(**kwargs: Any) -> httpx.AsyncClient:
+    """Create an httpx.AsyncClient whose requests are rate limited per host."""
+    return httpx.AsyncClient(transport=AsyncLimitedTransport(), **_with_trace_hooks(kwargs, asynchronous=True))
@@ -0,0 +1,271 @@
+"""Prometheus metrics for scrapers and persistence. Off unless enable() is called.
+
+Instrumented code calls inc(), observe(), set_gauge() or timer() unconditionally;
+while disabled each call is a single check of a module global, so scrapers pay
+nothing measurable for the hooks. Once enabled, values accumulate in one
+thread-safe Registry and are exported in the Prometheus text format either as a
+node-exporter textfile (write_textfile, for cron runs) or over HTTP (serve, for
+the long-running scheduler).
+
+Metrics (names get the "fundfinder_" prefix):
+
+- http_request_duration_seconds{host}: per request, through the shared transports
+- http_responses_total{host,status_class}: 2xx..5xx, or timeout / error / cancelled
+- playwright_render_seconds{host}: load_page_html / aload_page_html
+- parse_duration_seconds{source}: HTML/JSON to grants, per page (or per HUJI run)
+- grants_emitted_total{source}: grants returned by each source's scrape
+- upsert_rows_total, upsert_duration_seconds, upsert_rows_per_second (last upsert)
+- db_connect_wait_seconds: time to open a PostgreSQL connection
+- last_run_timestamp_seconds: set by the scripts when a run finishes
+
+Parse jobs of run_sources_staged run in worker processes, so staged.py times them
+there and observes the result in the parent.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import ContextManager, Iterator
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "fundfinder_"
+TEXTFILE_NAME = "fundfinder.prom"
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+# Seconds; wide enough for a single request up to a whole browser render
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+@dataclass(frozen=True)
+class MetricSpec:
+    kind: str
+    help: str
+    labels: tuple[str, ...] = ()
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+
+
+METRICS: dict[str, MetricSpec] = {
+    "http_request_duration_seconds": MetricSpec(HISTOGRAM, "HTTP request latency per host.", ("host",)),
+    "http_responses_total": MetricSpec(
+        COUNTER, "HTTP responses per host and status class (timeout/error/cancelled: no response).", ("host", "status_class")
+    ),
+    "playwright_render_seconds": MetricSpec(HISTOGRAM, "Playwright page load and render time per host.", ("host",)),
+    "parse_duration_seconds": MetricSpec(HISTOGRAM, "Time to parse fetched content into grants.", ("source",)),
+    "grants_emitted_total": MetricSpec(COUNTER, "Grants returned by each source.", ("source",)),
+    "upsert_rows_total": MetricSpec(COUNTER, "Grant rows upserted."),
+    "upsert_duration_seconds": MetricSpec(HISTOGRAM, "Duration of each upsert_many call."),
+    "upsert_rows_per_second": MetricSpec(GAUGE, "Throughput of the last upsert_many call."),
+    "db_connect_wait_seconds": MetricSpec(HISTOGRAM, "Time to open a database connection."),
+    "last_run_timestamp_seconds": MetricSpec(GAUGE, "Unix time the last pipeline run finished."),
+}
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Registry:
+    """Values of the metrics in METRICS, keyed by label values. Thread-safe."""
+
+    def __init__(self) -> None:
+        self._values: dict[str, dict[tuple[str, ...], float]] = {name: {} for name in METRICS}
+        self._histograms: dict[str, dict[tuple[str, ...], _Histogram]] = {name: {} for name in METRICS}
+        self._lock = threading.Lock()
+
+    def _key(self, name: str, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(label, "")) for label in METRICS[name].labels)
+
+    def inc(self, name: str, value: float, labels: dict[str, str]) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            values = self._values[name]
+            values[key] = values.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, labels: dict[str, str]) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._values[name][key] = value
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        buckets = METRICS[name].buckets
+        key = self._key(name, labels)
+        index = bisect.bisect_left(buckets, value)
+        with self._lock:
+            hist = self._histograms[name].get(key)
+            if hist is None:
+                hist = self._histograms[name][key] = _Histogram(len(buckets))
+            if index < len(buckets):
+                hist.counts[index] += 1
+            hist.sum += value
+            hist.count += 1
+
+    def render(self) -> str:
+        """All metrics with at least one value, in the Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            for name, spec in METRICS.items():
+                full = PREFIX + name
+                if spec.kind == HISTOGRAM:
+                    series = self._histograms[name]
+                    if not series:
+                        continue
+                    lines += [f"# HELP {full} {spec.help}", f"# TYPE {full} histogram"]
+                    for key, hist in sorted(series.items()):
+                        cumulative = 0
+                        for bound, count in zip(spec.buckets, hist.counts):
+                            cumulative += count
+                            le = _format_labels(spec.labels, key, f'le="{_format_value(bound)}"')
+                            lines.append(f"{full}_bucket{le} {cumulative}")
+                        le = _format_labels(spec.labels, key, 'le="+Inf"')
+                        lines.append(f"{full}_bucket{le} {hist.count}")
+                        labels = _format_labels(spec.labels, key)
+                        lines.append(f"{full}_sum{labels} {_format_value(hist.sum)}")
+                        lines.append(f"{full}_count{labels} {hist.count}")
+                else:
+                    series = self._values[name]
+                    if not series:
+                        continue
+                    lines += [f"# HELP {full} {spec.help}", f"# TYPE {full} {spec.kind}"]
+                    for key, value in sorted(series.items()):
+                        lines.append(f"{full}{_format_labels(spec.labels, key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+_registry: Registry | None = None
+_NULL_TIMER = nullcontext()
+
+
+def enable() -> Registry:
+    """Start collecting metrics (idempotent). Returns the registry."""
+    global _registry
+    if _registry is None:
+        _registry = Registry()
+    return _registry
+
+
+def disable() -> None:
+    """Stop collecting and drop collected values."""
+    global _registry
+    _registry = None
+
+
+def enabled() -> bool:
+    return _registry is not None
+
+
+def inc(name: str, value: float = 1.0, **labels: str) -> None:
+    registry = _registry
+    if registry is not None:
+        registry.inc(name, value, labels)
+
+
+def set_gauge(name: str, value: float, **labels: str) -> None:
+    registry = _registry
+    if registry is not None:
+        registry.set(name, value, labels)
+
+
+def observe(name: str, value: float, **labels: str) -> None:
+    registry = _registry
+    if registry is not None:
+        registry.observe(name, value, labels)
+
+
+@contextmanager
+def _timer(registry: Registry, name: str, labels: dict[str, str]) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start, labels)
+
+
+def timer(name: str, **labels: str) -> ContextManager[None]:
+    """Observe the duration of the enclosed block in histogram name (if enabled)."""
+    registry = _registry
+    if registry is None:
+        return _NULL_TIMER
+    return _timer(registry, name, labels)
+
+
+def status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+def write_textfile(directory: str | Path) -> Path | None:
+    """Write the metrics to <directory>/fundfinder.prom for node-exporter's textfile
+    collector. The file is replaced atomically, so a scrape never sees half a file.
+    Returns the path, or None while disabled."""
+    registry = _registry
+    if registry is None:
+        return None
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / TEXTFILE_NAME
+    tmp = directory / f".{TEXTFILE_NAME}.{os.getpid()}.tmp"
+    tmp.write_text(registry.render(), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def serve(port: int, host: str = "127.0.0.1"):
+    """Serve the metrics on http://host:port/metrics from a daemon thread.
+
+    Enables collection. Returns the server; call shutdown() on it to stop.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registry = enable()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            logger.debug("metrics: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("Serving metrics on http://%s:%d/metrics", host, server.server_address[1])
+    return server
@@ -1,30 +1,258 @@
+"""Run sources and merge their grants: run_sources (sequential), run_sources_async
+(one event loop) and run_sources_staged (fetch threads + parse processes)."""
+
+from __future__ import annotations
+
 import logging
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Callable
 
-from services.scraper.base import SourceScraper
+from services.scraper import metrics
+from services.scraper.base import AsyncSourceScraper, SourceScraper, as_async
+from services.scraper.circuit import CircuitBreakerStore, mark_stale
+from services.scraper.dedupe import NearDuplicateIndex
 from services.scraper.models import Grant
 
+if TYPE_CHECKING:
+    from services.scraper.profiling import SourceProfiler
+    from services.scraper.runstats import RunRecorder
+
 logger = logging.getLogger(__name__)
 
+# Per-source limit for run_sources_async, in seconds
+DEFAULT_SOURCE_TIMEOUT = 600.0
+
+
+def _fallback_grants(
+    fallback: Callable[[str], list[Grant]] | None,
+    source_name: str,
+) -> list[Grant]:
+    if fallback is None:
+        return []
+    try:
+        grants = fallback(source_name)
+    except Exception as e:
+        logger.exception("Source %s: fallback failed: %s", source_name, e)
+        return []
+    logger.info("Source %s: serving %d stale grants", source_name, len(grants))
+    return [mark_stale(g) for g in grants]
+
+
+def _merge(
+    name: str,
+    grants: list[Grant],
+    results: list[Grant],
+    seen_hashes: set[str],
+    dedupe_by_hash: bool,
+    near_duplicates: NearDuplicateIndex | None,
+) -> None:
+    """Append one source's grants to results, skipping hash and near duplicates."""
+    for g in grants:
+        if dedupe_by_hash and g.content_hash in seen_hashes:
+            continue
+        seen_hashes.add(g.content_hash)
+        if near_duplicates is not None:
+            canonical = near_duplicates.add(g)
+            if canonical != g.source_url:
+                logger.info("Source %s: %s is a near-duplicate of %s", name, g.source_url, canonical)
+                continue
+        results.append(g)
+
+
+def _record_outcome(breakers: CircuitBreakerStore | None, name: str, grants: list[Grant]) -> None:
+    metrics.inc("grants_emitted_total", len(grants), source=name)
+    if breakers is None:
+        return
+    if grants:
+        breakers.record_success(name)
+    else:
+        breakers.record_failure(name)
+
 
 def run_sources(
     scrapers: list[SourceScraper],
     dedupe_by_hash: bool = True,
+    breakers: CircuitBreakerStore | None = None,
+    fallback: Callable[[str], list[Grant]] | None = None,
+    near_duplicates: NearDuplicateIndex | None = None,
+    profiler: SourceProfiler | None = None,
+    recorder: RunRecorder | None = None,
 ) -> list[Grant]:
+    """Run scrapers and merge their grants.
+
+    With breakers, a source whose circuit is open is not run; fallback(source_name)
+    (e.g. the last persisted grants) is served instead, marked stale. A source that
+    raises or returns no grants counts as a failure.
+
+    With near_duplicates, a grant that is a near-duplicate of one from another source
+    is recorded under that grant's canonical URL in the index and left out of the results
+    (NearDuplicateIndex.added_duplicates() lists them, e.g. to keep them when pruning).
+
+    With profiler, each scraper's scrape() is profiled separately (see profiling.py).
+
+    With recorder, each source's wall time, bytes, grant count and error are recorded
+    (see runstats.py); a skipped source is recorded with error_class CircuitOpen.
+    """
     seen_hashes: set[str] = set()
     results: list[Grant] = []
 
     for scraper in scrapers:
-        try:
-            grants = scraper.scrape()
-        except Exception as e:
-            logger.exception("Source %s failed: %s", scraper.source_name, e)
+        name = scraper.source_name
+        if breakers is not None and not breakers.allow(name):
+            logger.warning("Source %s: circuit open, skipping", name)
+            if recorder is not None:
+                recorder.skip(name)
+            grants = _fallback_grants(fallback, name)
+        else:
+            error: Exception | None = None
+            if recorder is not None:
+                recorder.begin(scraper)
+            try:
+                with profiler.profile(name) if profiler is not None else nullcontext():
+                    grants = scraper.scrape()
+            except Exception as e:
+                logger.exception("Source %s failed: %s", name, e)
+                grants = []
+                error = e
+            if recorder is not None:
+                recorder.end(scraper, grants, error)
+            _record_outcome(breakers, name, grants)
+        _merge(name, grants, results, seen_hashes, dedupe_by_hash, near_duplicates)
+
+    return results
+
+
+async def _ascrape(
+    scraper: AsyncSourceScraper,
+    timeout: float | None,
+    recorder: RunRecorder | None = None,
+) -> list[Grant]:
+    import asyncio
+
+    name = scraper.source_name
+    grants: list[Grant] = []
+    error: Exception | None = None
+    if recorder is not None:
+        recorder.begin(scraper)
+    try:
+        grants = await asyncio.wait_for(scraper.ascrape(), timeout)
+    except asyncio.TimeoutError as e:
+        logger.error("Source %s timed out after %s seconds", name, timeout)
+        error = e
+    except Exception as e:
+        logger.exception("Source %s failed: %s", name, e)
+        error = e
+    if recorder is not None:
+        recorder.end(scraper, grants, error)
+    return grants
+
+
+async def run_sources_async(
+    scrapers: list[SourceScraper],
+    dedupe_by_hash: bool = True,
+    breakers: CircuitBreakerStore | None = None,
+    fallback: Callable[[str], list[Grant]] | None = None,
+    near_duplicates: NearDuplicateIndex | None = None,
+    timeout: float | None = DEFAULT_SOURCE_TIMEOUT,
+    recorder: RunRecorder | None = None,
+) -> list[Grant]:
+    """Run scrapers concurrently on the running event loop and merge their grants.
+
+    AsyncSourceScraper sources are awaited directly; other scrapers run in worker
+    threads (base.ThreadedScraper). Each source gets timeout seconds (None: no limit);
+    a source that times out, raises, or returns no grants counts as a failure and does
+    not affect the others. If run_sources_async itself is cancelled, every source task
+    is cancelled and awaited before the cancellation propagates.
+
+    Breakers, fallback, near_duplicates, and recorder behave as in run_sources;
+    grants are merged in scraper order, so results match a sequential run.
+    """
+    # Imported here (as in _ascrape): sync-only runs never pay for asyncio
+    import asyncio
+
+    # One task per scraper, None where the circuit is open
+    tasks: list[asyncio.Task[list[Grant]] | None] = []
+    for scraper in scrapers:
+        name = scraper.source_name
+        if breakers is not None and not breakers.allow(name):
+            logger.warning("Source %s: circuit open, skipping", name)
+            if recorder is not None:
+                recorder.skip(name)
+            tasks.append(None)
             continue
+        tasks.append(asyncio.ensure_future(_ascrape(as_async(scraper), timeout, recorder)))
 
-        for g in grants:
-            if dedupe_by_hash and g.content_hash in seen_hashes:
-                continue
-            seen_hashes.add(g.content_hash)
-            results.append(g)
+    running = [task for task in tasks if task is not None]
+    try:
+        await asyncio.gather(*running)
+    except BaseException:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        raise
+
+    seen_hashes: set[str] = set()
+    results: list[Grant] = []
+    for scraper, task in zip(scrapers, tasks):
+        name = scraper.source_name
+        if task is None:
+            grants = _fallback_grants(fallback, name)
+        else:
+            grants = task.result()
+            _record_outcome(breakers, name, grants)
+        _merge(name, grants, results, seen_hashes, dedupe_by_hash, near_duplicates)
+
+    return results
+
+
+def run_sources_staged(
+    scrapers: list[SourceScraper],
+    dedupe_by_hash: bool = True,
+    breakers: CircuitBreakerStore | None = None,
+    fallback: Callable[[str], list[Grant]] | None = None,
+    near_duplicates: NearDuplicateIndex | None = None,
+    parse_workers: int | None = None,
+    recorder: RunRecorder | None = None,
+) -> list[Grant]:
+    """Run scrapers with fetching and parsing in separate stages (see staged.py).
+
+    Pages of StagedScraper sources are parsed in parse_workers processes while other
+    sources are still downloading. Breakers, fallback, near_duplicates, and recorder
+    behave as in run_sources, and grants are merged in scraper order. The stages
+    interleave all sources, so each recorded wall time covers the whole staged run.
+    """
+    from services.scraper.staged import run_staged
+
+    allowed = []
+    for scraper in scrapers:
+        if breakers is not None and not breakers.allow(scraper.source_name):
+            logger.warning("Source %s: circuit open, skipping", scraper.source_name)
+            if recorder is not None:
+                recorder.skip(scraper.source_name)
+            continue
+        allowed.append(scraper)
+        if recorder is not None:
+            recorder.begin(scraper)
+    outcomes = dict(zip(map(id, allowed), run_staged(allowed, parse_workers=parse_workers)))
+
+    seen_hashes: set[str] = set()
+    results: list[Grant] = []
+    for scraper in scrapers:
+        name = scraper.source_name
+        outcome = outcomes.get(id(scraper))
+        if outcome is None:
+            grants = _fallback_grants(fallback, name)
+        else:
+            error = outcome if isinstance(outcome, BaseException) else None
+            if error is not None:
+                logger.error("Source %s failed: %s", name, error, exc_info=error)
+                grants = []
+            else:
+                grants = outcome
+            if recorder is not None:
+                recorder.end(scraper, grants, error)
+            _record_outcome(breakers, name, grants)
+        _merge(name, grants, results, seen_hashes, dedupe_by_hash, near_duplicates)
 
     return results
 
@@ -0,0 +1,352 @@
+"""Request policy: hedged requests, per-run retry budgets, and jittered backoff.
+
+PolicyClient wraps an httpx.Client (normally from http_client.make_client, so every
+attempt still goes through the per-host limiter):
+
+- Hedging: once a host has enough latency samples, a GET that is still running
+  after the host's p<hedge_percentile> latency gets a duplicate request; the first
+  response wins.
+- Retry budget: retries and hedges together are capped at
+  retry_budget_min + retry_budget_ratio * requests for the lifetime of the client
+  (one scrape run), so a struggling host cannot multiply the load.
+- Backoff: retries sleep a "full jitter" delay, uniform in [0, base * 2^attempt].
+
+AsyncPolicyClient applies the same policy to an httpx.AsyncClient (from
+http_client.make_async_client), hedging with a second task instead of a thread.
+
+Latency samples are kept per host for the whole process; latency_report() returns
+p50/p95/p99 per host. Each request carries its attempt number (and a hedge flag) as
+request extensions, which the request tracer records (see tracing.py).
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from services.scraper.tracing import ATTEMPT, HEDGE
+
+LATENCY_WINDOW = 500
+
+
+@dataclass(frozen=True)
+class RequestPolicy:
+    """Per-source request policy. hedge_percentile=None disables hedging."""
+
+    attempts: int = 2
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    retry_statuses: tuple[int, ...] = (429, 502, 503, 504)
+    retry_budget_ratio: float = 0.1
+    retry_budget_min: int = 5
+    hedge_percentile: float | None = None
+    hedge_min_samples: int = 20
+    hedge_min_delay: float = 0.2
+    hedge_workers: int = 16
+
+
+DEFAULT_POLICY = RequestPolicy()
+
+SOURCE_POLICIES: dict[str, RequestPolicy] = {
+    "huji": RequestPolicy(attempts=3, hedge_percentile=95.0),
+}
+
+
+def policy_for(source_name: str) -> RequestPolicy:
+    return SOURCE_POLICIES.get(source_name, DEFAULT_POLICY)
+
+
+# --- Latency stats -----------------------------------------------------------
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+class LatencyStats:
+    """Rolling window of successful-request latencies per host. Thread-safe."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, host: str, latency: float) -> None:
+        with self._lock:
+            self._samples.setdefault(host, deque(maxlen=self._window)).append(latency)
+
+    def count(self, host: str) -> int:
+        with self._lock:
+            return len(self._samples.get(host, ()))
+
+    def percentile(self, host: str, pct: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples.get(host, ()))
+        return _percentile(samples, pct) if samples else None
+
+    def report(self) -> dict[str, dict[str, float]]:
+        """{host: {count, p50, p95, p99}} with latencies in seconds."""
+        with self._lock:
+            snapshot = {host: sorted(s) for host, s in self._samples.items() if s}
+        return {
+            host: {
+                "count": len(s),
+                "p50": round(_percentile(s, 50), 3),
+                "p95": round(_percentile(s, 95), 3),
+                "p99": round(_percentile(s, 99), 3),
+            }
+            for host, s in snapshot.items()
+        }
+
+
+LATENCY = LatencyStats()
+
+
+def latency_report() -> dict[str, dict[str, float]]:
+    return LATENCY.report()
+
+
+# --- Retry budget ------------------------------------------------------------
+
+
+class RetryBudget:
+    """Caps extra requests (retries + hedges) at min_extra + ratio * requests."""
+
+    def __init__(self, ratio: float, min_extra: int) -> None:
+        self.ratio = ratio
+        self.min_extra = min_extra
+        self.requests = 0
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.spent >= self.min_extra + self.ratio * self.requests:
+                return False
+            self.spent += 1
+            return True
+
+
+# --- Client ------------------------------------------------------------------
+
+
+def _attempt_kwargs(kwargs: dict, attempt: int) -> dict:
+    return {**kwargs, "extensions": {**kwargs.get("extensions", {}), ATTEMPT: attempt}}
+
+
+def _hedge_kwargs(kwargs: dict) -> dict:
+    return {**kwargs, "extensions": {**kwargs.get("extensions", {}), HEDGE: True}}
+
+
+class _PolicyState:
+    """Policy, budget and counters shared by PolicyClient and AsyncPolicyClient."""
+
+    def __init__(self, policy: RequestPolicy, stats: LatencyStats) -> None:
+        self.policy = policy
+        self.stats = stats
+        self.budget = RetryBudget(policy.retry_budget_ratio, policy.retry_budget_min)
+        self.retries = 0
+        self.hedges = 0
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.policy.backoff_max, self.policy.backoff_base * 2**attempt))
+
+    def _hedge_delay(self, host: str) -> float | None:
+        pct = self.policy.hedge_percentile
+        if pct is None or self.stats.count(host) < self.policy.hedge_min_samples:
+            return None
+        value = self.stats.percentile(host, pct)
+        return max(self.policy.hedge_min_delay, value) if value is not None else None
+
+
+class PolicyClient(_PolicyState):
+    """httpx.Client wrapper applying a RequestPolicy to GET requests. Thread-safe."""
+
+    def __init__(
+        self,
+        client: httpx.Client,
+        policy: RequestPolicy = DEFAULT_POLICY,
+        stats: LatencyStats = LATENCY,
+    ) -> None:
+        super().__init__(policy, stats)
+        self.client = client
+        self._pool: ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def __enter__(self) -> PolicyClient:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the hedging pool. The wrapped client is left open for its owner."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """GET with hedging and budgeted, jittered retries. Raises like httpx.Client.get."""
+        attempts = max(1, self.policy.attempts)
+        for attempt in range(attempts):
+            last = attempt + 1 >= attempts
+            self.budget.record_request()
+            try:
+                resp = self._get_hedged(url, _attempt_kwargs(kwargs, attempt))
+            except httpx.TransportError:
+                if last or not self.budget.try_spend():
+                    raise
+            else:
+                if resp.status_code not in self.policy.retry_statuses or last or not self.budget.try_spend():
+                    return resp
+                resp.close()
+            self.retries += 1
+            time.sleep(self._backoff(attempt))
+        raise AssertionError("unreachable")
+
+    def _timed_get(self, url: str, kwargs: dict) -> httpx.Response:
+        start = time.monotonic()
+        resp = self.client.get(url, **kwargs)
+        if resp.status_code < 400:
+            self.stats.record(resp.url.host, time.monotonic() - start)
+        return resp
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.policy.hedge_workers,
+                    thread_name_prefix="hedge",
+                )
+            return self._pool
+
+    def _get_hedged(self, url: str, kwargs: dict) -> httpx.Response:
+        delay = self._hedge_delay(httpx.URL(url).host)
+        if delay is None:
+            return self._timed_get(url, kwargs)
+
+        pool = self._get_pool()
+        primary = pool.submit(self._timed_get, url, kwargs)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.budget.try_spend():
+            return primary.result()
+
+        self.hedges += 1
+        pending: set[Future] = {primary, pool.submit(self._timed_get, url, _hedge_kwargs(kwargs))}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winners = [fut for fut in done if fut.exception() is None]
+            if winners:
+                # Unused responses are closed now if done, else once they finish
+                for other in winners[1:]:
+                    _close_response(other)
+                for other in pending:
+                    other.add_done_callback(_close_response)
+                return winners[0].result()
+            error = next(iter(done)).exception()
+        assert error is not None
+        raise error
+
+
+def _close_response(fut: Future) -> None:
+    """Release the losing hedge's connection once it finishes."""
+    if not fut.cancelled() and fut.exception() is None:
+        fut.result().close()
+
+
+class AsyncPolicyClient(_PolicyState):
+    """httpx.AsyncClient wrapper applying a RequestPolicy to GET requests."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        policy: RequestPolicy = DEFAULT_POLICY,
+        stats: LatencyStats = LATENCY,
+    ) -> None:
+        super().__init__(policy, stats)
+        self.client = client
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """GET with hedging and budgeted, jittered retries. Raises like httpx.AsyncClient.get."""
+        # Imported here (as in pipeline._ascrape): sync-only runs never pay for asyncio
+        import asyncio
+
+        attempts = max(1, self.policy.attempts)
+        for attempt in range(attempts):
+            last = attempt + 1 >= attempts
+            self.budget.record_request()
+            try:
+                resp = await self._get_hedged(url, _attempt_kwargs(kwargs, attempt))
+            except httpx.TransportError:
+                if last or not self.budget.try_spend():
+                    raise
+            else:
+                if resp.status_code not in self.policy.retry_statuses or last or not self.budget.try_spend():
+                    return resp
+                await resp.aclose()
+            self.retries += 1
+            await asyncio.sleep(self._backoff(attempt))
+        raise AssertionError("unreachable")
+
+    async def _timed_get(self, url: str, kwargs: dict) -> httpx.Response:
+        start = time.monotonic()
+        resp = await self.client.get(url, **kwargs)
+        if resp.status_code < 400:
+            self.stats.record(resp.url.host, time.monotonic() - start)
+        return resp
+
+    async def _get_hedged(self, url: str, kwargs: dict) -> httpx.Response:
+        import asyncio
+
+        delay = self._hedge_delay(httpx.URL(url).host)
+        if delay is None:
+            return await self._timed_get(url, kwargs)
+
+        primary = asyncio.ensure_future(self._timed_get(url, kwargs))
+        try:
+            done, _ = await asyncio.wait([primary], timeout=delay)
+            if done or not self.budget.try_spend():
+                return await primary
+        except BaseException:
+            primary.cancel()
+            raise
+
+        self.hedges += 1
+        pending: set[asyncio.Future] = {primary, asyncio.ensure_future(self._timed_get(url, _hedge_kwargs(kwargs)))}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner: httpx.Response | None = None
+                for fut in done:
+                    if fut.exception() is not None:
+                        error = fut.exception()
+                    elif winner is None:
+                        winner = fut.result()
+                    else:
+                        # Both finished in the same wait: release the unused response
+                        await fut.result().aclose()
+                if winner is not None:
+                    return winner
+        finally:
+            # The losing request is cancelled; its connection goes back to the pool
+            for fut in pending:
+                fut.cancel()
+        assert error is not None
+        raise error
@@ -0,0 +1,250 @@
+"""Per-source profiling for pipeline runs: run_sources(profiler=...) and --profile.
+
+For each source, SourceProfiler writes to its output directory:
+
+- <source>.pstats: cProfile stats of the thread running scrape() merged with every
+  thread it starts (HUJI details workers, hedges). From Python 3.12 cProfile is
+  process-wide, so these also include any other thread running at the time. Open with pstats or snakeviz.
+- <source>.collapsed: collapsed stacks ("frame;frame;... weight" per line) for
+  flamegraph.pl or speedscope. With sample_interval set, they come from a wall-clock
+  sampling profiler over all threads (weight = samples). Otherwise they are derived
+  from the cProfile call graph: each function's own time in microseconds under its
+  heaviest call path, which is an approximation.
+- summary.json: wall time, tracemalloc peak and top allocation sites per source.
+
+Profiling is heavy (tracemalloc alone slows allocation-bound code several times);
+compare profiled runs with profiled runs.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import FrameType
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+TOP_ALLOCATIONS = 10
+SUMMARY_FILE = "summary.json"
+
+# From 3.12 cProfile is built on sys.monitoring: one enabled profiler sees every
+# thread, and a second one cannot be enabled while it is active.
+_PROCESS_WIDE_PROFILER = sys.version_info >= (3, 12)
+
+
+@dataclass(frozen=True)
+class AllocationSite:
+    site: str
+    size_bytes: int
+    count: int
+
+
+@dataclass(frozen=True)
+class SourceProfile:
+    source_name: str
+    wall_time: float
+    peak_bytes: int
+    top_allocations: list[AllocationSite] = field(default_factory=list)
+
+
+class _Snapshot:
+    """pstats.Stats input for a profiler that may still be enabled in its own thread."""
+
+    def __init__(self, profile: cProfile.Profile) -> None:
+        self.profile = profile
+
+    def create_stats(self) -> None:
+        # Profile.create_stats() would disable the profiler from the wrong thread
+        self.profile.snapshot_stats()
+        self.stats = self.profile.stats
+
+
+class _ThreadProfiles:
+    """cProfile for the calling thread and for every thread started while active.
+
+    Up to 3.11 each new thread gets its own profiler, merged on stop(); from 3.12 the
+    main profiler already covers all threads.
+    """
+
+    def __init__(self) -> None:
+        self.main = cProfile.Profile()
+        self.threads: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def _start_thread(self, frame: FrameType, event: str, arg: Any) -> None:
+        # Runs as the new thread's first profile event; enable() replaces this hook
+        profile = cProfile.Profile()
+        with self._lock:
+            self.threads.append(profile)
+        profile.enable()
+
+    def start(self) -> None:
+        if not _PROCESS_WIDE_PROFILER:
+            threading.setprofile(self._start_thread)
+        self.main.enable()
+
+    def stop(self) -> pstats.Stats:
+        self.main.disable()
+        if not _PROCESS_WIDE_PROFILER:
+            threading.setprofile(None)
+        stats = pstats.Stats(self.main)
+        with self._lock:
+            for profile in self.threads:
+                stats.add(_Snapshot(profile))
+        return stats
+
+
+class _Sampler(threading.Thread):
+    """Samples the stacks of all other threads every interval seconds."""
+
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self.stacks[_frame_stack(frame)] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+def _label(filename: str, lineno: int, name: str) -> str:
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def _frame_stack(frame: FrameType | None) -> str:
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        labels.append(_label(code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def collapsed_from_stats(stats: pstats.Stats) -> Counter[str]:
+    """Approximate collapsed stacks from a cProfile call graph (weights in microseconds)."""
+    table = stats.stats  # type: ignore[attr-defined]
+    stacks: Counter[str] = Counter()
+    for func, (_, _, own_time, _, _) in table.items():
+        weight = int(own_time * 1_000_000)
+        if weight <= 0:
+            continue
+        path = [func]
+        seen = {func}
+        current = func
+        while current in table:
+            callers = [(timing[3], caller) for caller, timing in table[current][4].items() if caller not in seen]
+            if not callers:
+                break
+            current = max(callers)[1]
+            path.append(current)
+            seen.add(current)
+        stacks[";".join(_label(*f) for f in reversed(path))] += weight
+    return stacks
+
+
+def _write_collapsed(path: Path, stacks: Counter[str]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, weight in sorted(stacks.items()):
+            f.write(f"{stack} {weight}\n")
+
+
+def _top_allocations(limit: int) -> list[AllocationSite]:
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+    )
+    sites = []
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        sites.append(AllocationSite(f"{frame.filename}:{frame.lineno}", stat.size, stat.count))
+    return sites
+
+
+class SourceProfiler:
+    """Profiles sources one at a time and writes the results under output_dir.
+
+    sample_interval (seconds) turns on the sampling profiler; None leaves collapsed
+    stacks to the cProfile approximation.
+    """
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        sample_interval: float | None = None,
+        top_allocations: int = TOP_ALLOCATIONS,
+    ) -> None:
+        self.output_dir = Path(output_dir)
+        self.sample_interval = sample_interval
+        self.top_allocations = top_allocations
+        self.profiles: list[SourceProfile] = []
+
+    @contextmanager
+    def profile(self, source_name: str) -> Iterator[None]:
+        """Profile the enclosed block (one source's scrape) as source_name."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.clear_traces()
+        tracemalloc.reset_peak()
+        sampler = _Sampler(self.sample_interval) if self.sample_interval else None
+        profiles = _ThreadProfiles()
+
+        start = time.perf_counter()
+        if sampler is not None:
+            sampler.start()
+        profiles.start()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start
+            # Memory first, so the profilers' own bookkeeping is not reported
+            _, peak = tracemalloc.get_traced_memory()
+            top = _top_allocations(self.top_allocations)
+            if started_tracing:
+                tracemalloc.stop()
+            stats = profiles.stop()
+            if sampler is not None:
+                sampler.stop()
+
+            stats.dump_stats(self.output_dir / f"{source_name}.pstats")
+            stacks = sampler.stacks if sampler is not None else collapsed_from_stats(stats)
+            _write_collapsed(self.output_dir / f"{source_name}.collapsed", stacks)
+            self.profiles.append(SourceProfile(source_name, round(wall_time, 3), peak, top))
+            self._write_summary()
+            logger.info(
+                "Profile %s: wall=%.2fs peak=%.1f MiB top allocation %s",
+                source_name,
+                wall_time,
+                peak / 2**20,
+                top[0].site if top else "-",
+            )
+
+    def _write_summary(self) -> None:
+        with open(self.output_dir / SUMMARY_FILE, "w", encoding="utf-8") as f:
+            json.dump({"sources": [asdict(p) for p in self.profiles]}, f, indent=2)
@@ -0,0 +1,217 @@
+"""Per-host rate limiting: token bucket plus AIMD (additive-increase/multiplicative-decrease) concurrency.
+
+Every outbound request to a host takes one token (steady rate + burst) and one
+concurrency slot. The concurrency limit grows by roughly one slot per round of
+healthy responses and halves on congestion signals: 429/5xx, timeouts, or latency
+well above the host's observed baseline. Retry-After (seconds or HTTP date) and
+repeated failures block the host until the indicated time.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+
+from services.scraper.utils import utc_now
+
+# Smoothing for the latency baseline (EWMA)
+LATENCY_ALPHA = 0.2
+# A response slower than LATENCY_FACTOR x baseline counts as congestion
+LATENCY_FACTOR = 3.0
+# Samples needed before latency is used as a congestion signal
+LATENCY_WARMUP = 5
+DECREASE_FACTOR = 0.5
+# Host cooldown after a failure without Retry-After: BASE * 2^(consecutive-1), capped
+FAILURE_COOLDOWN_BASE = 0.5
+FAILURE_COOLDOWN_MAX = 30.0
+RETRY_AFTER_MAX = 300.0
+# Async waiters poll at this interval while all concurrency slots are taken
+POLL_INTERVAL = 0.05
+
+
+@dataclass(frozen=True)
+class HostLimitConfig:
+    """Limits for one host. rate is tokens/second; concurrency adapts within [1, max_concurrency]."""
+
+    rate: float = 2.0
+    burst: int = 2
+    initial_concurrency: float = 2.0
+    max_concurrency: int = 4
+
+
+DEFAULT_HOST_CONFIG = HostLimitConfig()
+
+HOST_CONFIGS: dict[str, HostLimitConfig] = {
+    "new.huji.ac.il": HostLimitConfig(rate=5.0, burst=5, initial_concurrency=2.0, max_concurrency=8),
+    "www.hachvana.mod.gov.il": HostLimitConfig(rate=1.0, burst=1, initial_concurrency=1.0, max_concurrency=2),
+    "www.miluim.idf.il": HostLimitConfig(rate=1.0, burst=1, initial_concurrency=1.0, max_concurrency=2),
+}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds from now."""
+    if not value or not value.strip():
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), RETRY_AFTER_MAX)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        return None
+    return min(max(0.0, (when - utc_now()).total_seconds()), RETRY_AFTER_MAX)
+
+
+class HostLimiter:
+    """Token bucket + AIMD concurrency limit for a single host. Thread-safe; usable from asyncio."""
+
+    def __init__(self, host: str, config: HostLimitConfig = DEFAULT_HOST_CONFIG) -> None:
+        self.host = host
+        self.config = config
+        self.limit = float(config.initial_concurrency)
+        self.in_flight = 0
+        self.latency_ewma: float | None = None
+        self.samples = 0
+        self._tokens = float(config.burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._consecutive_failures = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    # --- Acquire -------------------------------------------------------------
+
+    def _try_acquire(self) -> float | None:
+        """Take a token and a slot if possible. Returns None on success, else seconds to wait.
+
+        Caller must hold self._cond.
+        """
+        now = time.monotonic()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        elapsed = now - self._last_refill
+        self._tokens = min(float(self.config.burst), self._tokens + elapsed * self.config.rate)
+        self._last_refill = now
+        if self.in_flight >= max(1, int(self.limit)):
+            return POLL_INTERVAL
+        if self._tokens < 1.0:
+            return (1.0 - self._tokens) / self.config.rate
+        self._tokens -= 1.0
+        self.in_flight += 1
+        return None
+
+    def acquire(self) -> None:
+        """Block until a request to this host may start."""
+        with self._cond:
+            while (delay := self._try_acquire()) is not None:
+                self._cond.wait(delay)
+
+    async def aacquire(self) -> None:
+        """Async variant of acquire()."""
+        # Imported here: sync-only runs never pay for asyncio
+        import asyncio
+
+        while True:
+            with self._cond:
+                delay = self._try_acquire()
+            if delay is None:
+                return
+            await asyncio.sleep(delay)
+
+    # --- Release / feedback --------------------------------------------------
+
+    def release(
+        self,
+        status_code: int | None = None,
+        latency: float | None = None,
+        retry_after: str | None = None,
+        timed_out: bool = False,
+    ) -> None:
+        """Free the slot and adapt limits from the outcome.
+
+        status_code is None for transport errors (timeouts set timed_out=True).
+        """
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            now = time.monotonic()
+
+            congested = timed_out or status_code is None or status_code == 429 or status_code >= 500
+            if not congested and latency is not None:
+                if (
+                    self.latency_ewma is not None
+                    and self.samples >= LATENCY_WARMUP
+                    and latency > LATENCY_FACTOR * self.latency_ewma
+                ):
+                    congested = True
+                # Only healthy responses feed the baseline, so slowness can't normalise itself
+                if not congested:
+                    self.samples += 1
+                    self.latency_ewma = (
+                        latency
+                        if self.latency_ewma is None
+                        else (1 - LATENCY_ALPHA) * self.latency_ewma + LATENCY_ALPHA * latency
+                    )
+
+            if congested:
+                self._on_congestion(now, status_code, retry_after)
+            else:
+                self._consecutive_failures = 0
+                # Additive increase: about +1 slot per full window of successes
+                self.limit = min(float(self.config.max_concurrency), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def cancel(self) -> None:
+        """Free the slot of a request abandoned before it completed (e.g. a losing hedge).
+        Cancellation says nothing about the host, so limits are left as they are."""
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._cond.notify_all()
+
+    def _on_congestion(self, now: float, status_code: int | None, retry_after: str | None) -> None:
+        # Multiplicative decrease at most once per latency window, so one burst of
+        # failures from the same window does not collapse the limit repeatedly.
+        window = self.latency_ewma or 1.0
+        if now - self._last_decrease >= window:
+            self.limit = max(1.0, self.limit * DECREASE_FACTOR)
+            self._last_decrease = now
+
+        is_failure = status_code is None or status_code == 429 or status_code >= 500
+        if not is_failure:
+            return
+        self._consecutive_failures += 1
+        wait = parse_retry_after(retry_after) if status_code in (429, 503) else None
+        if wait is None:
+            wait = min(
+                FAILURE_COOLDOWN_BASE * 2 ** (self._consecutive_failures - 1),
+                FAILURE_COOLDOWN_MAX,
+            )
+        self._blocked_until = max(self._blocked_until, now + wait)
+
+    def snapshot(self) -> dict:
+        """Current limiter state for logging."""
+        with self._cond:
+            return {
+                "host": self.host,
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+                "blocked_for": round(max(0.0, self._blocked_until - time.monotonic()), 2),
+            }
+
+
+_limiters: dict[str, HostLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(host: str) -> HostLimiter:
+    """Return the process-wide limiter for host, creating it on first use."""
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = HostLimiter(host, HOST_CONFIGS.get(host, DEFAULT_HOST_CONFIG))
+            _limiters[host] = limiter
+        return limiter
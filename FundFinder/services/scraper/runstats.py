@@ -0,0 +1,197 @@
+"""Per-run scrape statistics and regression detection against each source's history.
+
+RunRecorder collects, per source: wall time, bytes fetched (from the shared HTTP
+transports, see http_client.TRANSFER), grants produced, grants whose content changed
+(set at persist time), the class of the exception that failed the source, and
+source-specific counters from SourceScraper.run_stats (HUJI details_ok/details_fail).
+The repository stores a finished ScrapeRun in scrape_runs / scrape_run_sources.
+
+find_anomalies compares each source's latest run with the median of its previous
+runs in the same mode and flags errors, slowdowns and yield changes. Until a source
+has MIN_BASELINE_RUNS healthy runs, its registry expected_size stands in for the
+yield baseline.
+"""
+
+from __future__ import annotations
+
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+from urllib.parse import urlsplit
+
+from services.scraper.base import SourceScraper
+from services.scraper.utils import utc_now
+
+SEQUENTIAL = "sequential"
+CONCURRENT = "concurrent"
+STAGED = "staged"
+# Profiled runs are much slower; their own mode keeps them out of the other baselines
+PROFILED = "profiled"
+
+# Recorded as error_class for a source skipped because its circuit is open
+CIRCUIT_OPEN = "CircuitOpen"
+
+BASELINE_WINDOW = 10
+MIN_BASELINE_RUNS = 3
+# Latest wall time above DURATION_FACTOR x median is a slowdown
+DURATION_FACTOR = 2.0
+# Latest grant count outside [median / YIELD_FACTOR, median * YIELD_FACTOR] is a yield change
+YIELD_FACTOR = 2.0
+
+
+@dataclass
+class SourceRun:
+    """Outcome of one source in one run. wall_time is in seconds."""
+
+    source_name: str
+    started_at: datetime
+    wall_time: float = 0.0
+    bytes_fetched: int = 0
+    grants: int = 0
+    changed: int = 0
+    error_class: str | None = None
+    stats: dict[str, Any] = field(default_factory=dict)
+    run_id: int | None = None
+    mode: str | None = None
+
+
+@dataclass
+class ScrapeRun:
+    mode: str
+    started_at: datetime
+    finished_at: datetime | None = None
+    grants_total: int = 0
+    grants_persisted: int = 0
+    sources: list[SourceRun] = field(default_factory=list)
+    id: int | None = None
+
+
+def _bytes_fetched(scraper: SourceScraper) -> int:
+    """Bytes received so far from the scraper's host."""
+    # Imported here: the repository reads runs without needing httpx
+    from services.scraper.http_client import TRANSFER
+
+    return TRANSFER.get(urlsplit(scraper.base_url).hostname or "")
+
+
+class RunRecorder:
+    """Collects SourceRuns while the pipeline runs. Thread-safe.
+
+    Bytes are attributed by host (the scraper's base_url), so two sources sharing a
+    host while running concurrently would each count the other's traffic.
+    """
+
+    def __init__(self, mode: str = SEQUENTIAL) -> None:
+        self.run = ScrapeRun(mode=mode, started_at=utc_now())
+        self._open: dict[str, tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, scraper: SourceScraper) -> None:
+        with self._lock:
+            self._open[scraper.source_name] = (time.monotonic(), _bytes_fetched(scraper))
+            self.run.sources.append(SourceRun(scraper.source_name, utc_now()))
+
+    def end(self, scraper: SourceScraper, grants: list, error: BaseException | None = None) -> None:
+        name = scraper.source_name
+        with self._lock:
+            start, bytes_before = self._open.pop(name)
+            entry = self._entry(name)
+            entry.wall_time = round(time.monotonic() - start, 3)
+            entry.bytes_fetched = _bytes_fetched(scraper) - bytes_before
+            entry.grants = len(grants)
+            entry.error_class = type(error).__name__ if error is not None else None
+            entry.stats = dict(getattr(scraper, "run_stats", None) or {})
+
+    def skip(self, source_name: str, error_class: str = CIRCUIT_OPEN) -> None:
+        with self._lock:
+            self.run.sources.append(SourceRun(source_name, utc_now(), error_class=error_class))
+
+    def set_changed(self, changed: dict[str, int]) -> None:
+        """Grants per source whose content is new or changed (from the repository)."""
+        with self._lock:
+            for entry in self.run.sources:
+                entry.changed = changed.get(entry.source_name, 0)
+
+    def finish(self, grants_total: int, grants_persisted: int) -> ScrapeRun:
+        with self._lock:
+            self.run.finished_at = utc_now()
+            self.run.grants_total = grants_total
+            self.run.grants_persisted = grants_persisted
+            return self.run
+
+    def _entry(self, source_name: str) -> SourceRun:
+        for entry in reversed(self.run.sources):
+            if entry.source_name == source_name:
+                return entry
+        raise KeyError(source_name)
+
+
+@dataclass(frozen=True)
+class SourceAnomaly:
+    """A source whose latest run deviates from its baseline. kind: error, slow, yield."""
+
+    source_name: str
+    run_id: int | None
+    kind: str
+    detail: str
+    value: float
+    baseline: float | None
+
+
+def find_anomalies(
+    history: dict[str, list[SourceRun]],
+    expected_sizes: dict[str, int | None] | None = None,
+    duration_factor: float = DURATION_FACTOR,
+    yield_factor: float = YIELD_FACTOR,
+    min_runs: int = MIN_BASELINE_RUNS,
+) -> list[SourceAnomaly]:
+    """Flag sources whose latest run deviates from their history.
+
+    history maps source_name to its runs in one mode, newest first. The baseline is
+    the median over the older runs without an error.
+    """
+    anomalies: list[SourceAnomaly] = []
+    for name, runs in sorted(history.items()):
+        if not runs:
+            continue
+        latest, older = runs[0], [r for r in runs[1:] if r.error_class is None]
+        if latest.error_class is not None:
+            anomalies.append(
+                SourceAnomaly(name, latest.run_id, "error", f"failed with {latest.error_class}", 0, None)
+            )
+            continue
+
+        if len(older) >= min_runs:
+            median_time = statistics.median(r.wall_time for r in older)
+            if median_time > 0 and latest.wall_time > duration_factor * median_time:
+                anomalies.append(
+                    SourceAnomaly(
+                        name,
+                        latest.run_id,
+                        "slow",
+                        f"took {latest.wall_time:.1f}s vs median {median_time:.1f}s",
+                        latest.wall_time,
+                        median_time,
+                    )
+                )
+            expected: float | None = statistics.median(r.grants for r in older)
+        else:
+            expected = (expected_sizes or {}).get(name)
+
+        if expected:
+            low, high = expected / yield_factor, expected * yield_factor
+            if not low <= latest.grants <= high:
+                anomalies.append(
+                    SourceAnomaly(
+                        name,
+                        latest.run_id,
+                        "yield",
+                        f"produced {latest.grants} grants vs baseline {expected:g}",
+                        latest.grants,
+                        expected,
+                    )
+                )
+    return anomalies
@@ -0,0 +1,215 @@
+"""Adaptive per-source refresh scheduler.
+
+Each source runs on its own interval (with jitter). Intervals grow while a source's
+set of content hashes stays unchanged and shrink when it has grants whose deadline
+is close. Schedule state is persisted to a JSON file so restarts keep the learned
+intervals and next-run times.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from services.scraper.base import SourceScraper
+from services.scraper.models import Grant
+from services.scraper.pipeline import run_sources
+from services.scraper.scrapers import DEFAULT_INTERVAL, registry
+from services.scraper.utils import state_dir, utc_now
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+# Starting intervals come from each source's SourceSpec.default_interval
+# (services/scraper/scrapers); unregistered sources use DEFAULT_INTERVAL.
+MIN_INTERVAL = 1 * HOUR
+MAX_INTERVAL = 7 * DAY
+# Unchanged hash set -> interval *= BACKOFF_FACTOR (capped at MAX_INTERVAL)
+BACKOFF_FACTOR = 1.5
+# Grants closing within DEADLINE_WINDOW_DAYS cap the interval at URGENT_INTERVAL
+DEADLINE_WINDOW_DAYS = 7
+URGENT_INTERVAL = 2 * HOUR
+JITTER = 0.1
+# Upper bound on a single sleep so stop requests are noticed promptly
+MAX_SLEEP = 60.0
+
+STATE_FILENAME = "scheduler_state.json"
+
+
+@dataclass
+class SourceSchedule:
+    """Persisted schedule for one source."""
+
+    source_name: str
+    interval: float
+    next_run_at: str
+    last_run_at: str | None = None
+    hashes_digest: str | None = None
+    unchanged_runs: int = 0
+
+
+def _hashes_digest(grants: list[Grant]) -> str:
+    """Order-independent digest of a source's content_hash set."""
+    joined = "\n".join(sorted({g.content_hash for g in grants}))
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+def _has_upcoming_deadline(grants: list[Grant], today: date, window_days: int) -> bool:
+    horizon = today + timedelta(days=window_days)
+    return any(g.deadline is not None and today <= g.deadline <= horizon for g in grants)
+
+
+class RefreshScheduler:
+    """Runs registered scrapers on adaptive, jittered, per-source intervals.
+
+    on_grants(source_name, grants) is called after every successful source run
+    (e.g. to persist via GrantRepository).
+    """
+
+    def __init__(
+        self,
+        scrapers: list[SourceScraper],
+        on_grants: Callable[[str, list[Grant]], None],
+        state_path: Path | None = None,
+        intervals: dict[str, float] | None = None,
+        jitter: float = JITTER,
+    ) -> None:
+        self.scrapers = {s.source_name: s for s in scrapers}
+        self.on_grants = on_grants
+        self.state_path = state_path or state_dir() / STATE_FILENAME
+        specs = registry()
+        defaults = {name: specs[name].default_interval for name in self.scrapers if name in specs}
+        self.intervals = {**defaults, **(intervals or {})}
+        self.jitter = jitter
+        self._stopped = False
+        self.schedules = self._load_state()
+
+    # --- State ---------------------------------------------------------------
+
+    def _load_state(self) -> dict[str, SourceSchedule]:
+        saved: dict[str, dict] = {}
+        if self.state_path.exists():
+            try:
+                saved = json.loads(self.state_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning("Scheduler: ignoring unreadable state file %s: %s", self.state_path, e)
+
+        now = utc_now()
+        schedules: dict[str, SourceSchedule] = {}
+        for name in self.scrapers:
+            if name in saved:
+                try:
+                    schedules[name] = SourceSchedule(**saved[name])
+                    continue
+                except TypeError:
+                    logger.warning("Scheduler: resetting malformed state for %s", name)
+            # New sources run right away
+            schedules[name] = SourceSchedule(
+                source_name=name,
+                interval=self.intervals.get(name, DEFAULT_INTERVAL),
+                next_run_at=now.isoformat(),
+            )
+        return schedules
+
+    def _save_state(self) -> None:
+        data = {name: asdict(s) for name, s in self.schedules.items()}
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    # --- Scheduling ----------------------------------------------------------
+
+    def _next_interval(self, schedule: SourceSchedule, grants: list[Grant]) -> float:
+        base = self.intervals.get(schedule.source_name, DEFAULT_INTERVAL)
+        digest = _hashes_digest(grants)
+        if digest == schedule.hashes_digest:
+            schedule.unchanged_runs += 1
+            interval = min(schedule.interval * BACKOFF_FACTOR, MAX_INTERVAL)
+        else:
+            schedule.unchanged_runs = 0
+            interval = base
+        schedule.hashes_digest = digest
+
+        if _has_upcoming_deadline(grants, utc_now().date(), DEADLINE_WINDOW_DAYS):
+            interval = min(interval, URGENT_INTERVAL)
+        return max(interval, MIN_INTERVAL)
+
+    def _jittered(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def due_sources(self, now: datetime | None = None) -> list[str]:
+        """Return source names whose next run time has passed, most overdue first."""
+        now = now or utc_now()
+        due = [s for s in self.schedules.values() if datetime.fromisoformat(s.next_run_at) <= now]
+        return [s.source_name for s in sorted(due, key=lambda s: s.next_run_at)]
+
+    def run_source(self, source_name: str) -> list[Grant]:
+        """Run one source now, hand its grants to on_grants, and reschedule it."""
+        schedule = self.schedules[source_name]
+        started = time.monotonic()
+        grants = run_sources([self.scrapers[source_name]])
+        now = utc_now()
+        schedule.last_run_at = now.isoformat()
+
+        if grants:
+            try:
+                self.on_grants(source_name, grants)
+            except Exception as e:
+                logger.exception("Scheduler: handling grants for %s failed: %s", source_name, e)
+            schedule.interval = self._next_interval(schedule, grants)
+        else:
+            # Failure or empty result: keep the learned interval and hash digest
+            logger.warning("Scheduler: %s returned no grants; keeping interval", source_name)
+
+        delay = self._jittered(schedule.interval)
+        schedule.next_run_at = (now + timedelta(seconds=delay)).isoformat()
+        self._save_state()
+        logger.info(
+            "Scheduler: %s ran in %.1fs, grants=%d, unchanged_runs=%d, next run in %.1fh",
+            source_name,
+            time.monotonic() - started,
+            len(grants),
+            schedule.unchanged_runs,
+            delay / HOUR,
+        )
+        return grants
+
+    def run_pending(self) -> list[str]:
+        """Run every due source once. Returns the names that ran."""
+        ran: list[str] = []
+        for name in self.due_sources():
+            if self._stopped:
+                break
+            self.run_source(name)
+            ran.append(name)
+        return ran
+
+    def seconds_until_next(self) -> float:
+        if not self.schedules:
+            return MAX_SLEEP
+        nxt = min(datetime.fromisoformat(s.next_run_at) for s in self.schedules.values())
+        return max(0.0, (nxt - utc_now()).total_seconds())
+
+    def run_forever(self) -> None:
+        """Loop until stop() is called."""
+        logger.info("Scheduler: started with sources %s", sorted(self.schedules))
+        self._save_state()
+        while not self._stopped:
+            self.run_pending()
+            if self._stopped:
+                break
+            time.sleep(min(self.seconds_until_next(), MAX_SLEEP))
+        logger.info("Scheduler: stopped")
+
+    def stop(self) -> None:
+        self._stopped = True
@@ -1,14 +1,144 @@
+"""Registry of grant sources, keyed by source_name.
+
+Each source is described by a SourceSpec: where its scraper class lives ("module:Class")
+plus metadata used by the pipeline CLI and the scheduler. A source module (and its
+dependencies, e.g. BeautifulSoup or Playwright) is imported only when that scraper
+is built, so selecting a subset of sources never pays for the rest.
+
+Built-in sources are listed in BUILTIN_SOURCES. Other packages can add sources through
+the "fundfinder.sources" entry point group; an entry point may name a SourceSpec or
+a SourceScraper subclass (which gets default metadata).
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib import import_module
+from importlib.metadata import entry_points
+
 from services.scraper.base import SourceScraper
-from services.scraper.sources.government import MiluimStudentGrantSource
-from services.scraper.sources.huji.scraper import HUJIScraper
-from services.scraper.sources.mod.scraper import MODScraper
-from services.scraper.sources.reichman.scraper import ReichmanScholarshipSource
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "fundfinder.sources"
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+DEFAULT_INTERVAL = 12 * HOUR
+
+
+@dataclass(frozen=True)
+class SourceSpec:
+    """A registered source. expected_size is the rough grant count of a healthy run."""
+
+    name: str
+    target: str
+    needs_browser: bool = False
+    expected_size: int | None = None
+    default_interval: float = DEFAULT_INTERVAL
+
+    def load(self) -> type[SourceScraper]:
+        """Import and return the scraper class."""
+        module_name, _, class_name = self.target.partition(":")
+        return getattr(import_module(module_name), class_name)
+
+    def create(self) -> SourceScraper:
+        return self.load()()
+
+
+BUILTIN_SOURCES: list[SourceSpec] = [
+    SourceSpec(
+        "huji",
+        "services.scraper.sources.huji.scraper:HUJIScraper",
+        expected_size=150,
+        default_interval=6 * HOUR,
+    ),
+    SourceSpec(
+        "mod",
+        "services.scraper.sources.mod.scraper:MODScraper",
+        expected_size=1,
+        default_interval=DAY,
+    ),
+    SourceSpec(
+        "government_miluim",
+        "services.scraper.sources.government.miluim_student_grant:MiluimStudentGrantSource",
+        needs_browser=True,
+        expected_size=2,
+        default_interval=DAY,
+    ),
+    SourceSpec(
+        "reichman",
+        "services.scraper.sources.reichman.scraper:ReichmanScholarshipSource",
+        needs_browser=True,
+        expected_size=40,
+        default_interval=DAY,
+    ),
+]
+
+
+def _entry_point_sources() -> list[SourceSpec]:
+    specs = []
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            obj = ep.load()
+        except Exception as e:
+            logger.warning("Source entry point %s failed to load: %s", ep.name, e)
+            continue
+        if isinstance(obj, SourceSpec):
+            specs.append(obj)
+        elif isinstance(obj, type) and issubclass(obj, SourceScraper):
+            specs.append(SourceSpec(ep.name, ep.value))
+        else:
+            logger.warning("Source entry point %s is neither a SourceSpec nor a SourceScraper", ep.name)
+    return specs
+
+
+@lru_cache(maxsize=1)
+def registry() -> dict[str, SourceSpec]:
+    """All sources by name: built-ins first, then entry points (which cannot replace built-ins)."""
+    specs = {spec.name: spec for spec in BUILTIN_SOURCES}
+    for spec in _entry_point_sources():
+        if spec.name in specs:
+            logger.warning("Source entry point %s ignored: name already registered", spec.name)
+            continue
+        specs[spec.name] = spec
+    return specs
+
+
+def get_spec(name: str) -> SourceSpec:
+    specs = registry()
+    if name not in specs:
+        raise KeyError(f"Unknown source: {name} (known: {', '.join(specs)})")
+    return specs[name]
+
+
+def select_sources(
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+) -> list[SourceSpec]:
+    """Specs for include (default: all sources, in registry order) minus exclude.
+
+    Raises KeyError for unknown names.
+    """
+    for name in (include or []) + (exclude or []):
+        get_spec(name)
+    names = include or list(registry())
+    skipped = set(exclude or [])
+    return [get_spec(name) for name in dict.fromkeys(names) if name not in skipped]
+
+
+def get_scraper(name: str) -> SourceScraper:
+    return get_spec(name).create()
+
+
+def get_scrapers(
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+) -> list[SourceScraper]:
+    return [spec.create() for spec in select_sources(include, exclude)]
 
 
 def get_all_scrapers() -> list[SourceScraper]:
-    return [
-        HUJIScraper(),
-        MODScraper(),
-        MiluimStudentGrantSource(),
-        ReichmanScholarshipSource(),
-    ]
\ No newline at end of file
+    return get_scrapers()
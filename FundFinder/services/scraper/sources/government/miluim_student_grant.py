@@ -15,13 +15,14 @@ import re
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
 from datetime import datetime
+from typing import Iterator
 from urllib.parse import quote
 
 from bs4 import BeautifulSoup
 
-from services.scraper.base import SourceScraper
+from services.scraper.base import AsyncSourceScraper, FetchedPage, StagedScraper
 from services.scraper.models import Grant
-from services.scraper.utils import content_hash, load_page_html, utc_now
+from services.scraper.utils import aload_page_html, content_hash, load_page_html, utc_now
 
 logger = logging.getLogger(__name__)
 
@@ -274,24 +275,35 @@ def _build_grants_from_parsed(
 # --- Scraper (Playwright + orchestration) ------------------------------------
 
 
-class MiluimStudentGrantSource(SourceScraper):
+class MiluimStudentGrantSource(StagedScraper, AsyncSourceScraper):
     """Scrapes the Miluim article page for student grant amounts (fighter / rear) using Playwright."""
 
     def __init__(self) -> None:
         super().__init__(source_name=SOURCE_NAME, base_url=BASE_URL)
 
-    def scrape(self) -> list[Grant]:
-        source_url = self.base_url + quote(ARTICLE_PATH, safe="/")
-        grants: list[Grant] = []
+    @property
+    def source_url(self) -> str:
+        return self.base_url + quote(ARTICLE_PATH, safe="/")
 
+    def fetch(self) -> Iterator[FetchedPage]:
         # 1. Load page with Playwright
-        html = load_page_html(source_url, timeout_ms=TIMEOUT_MS, source_name="MiluimStudentGrant")
+        html = load_page_html(self.source_url, timeout_ms=TIMEOUT_MS, source_name="MiluimStudentGrant")
+        if not html:
+            logger.warning("MiluimStudentGrant: failed to load page HTML")
+            return
+        yield FetchedPage(url=self.source_url, body=html, fetched_at=utc_now())
+
+    async def ascrape(self) -> list[Grant]:
+        html = await aload_page_html(self.source_url, timeout_ms=TIMEOUT_MS, source_name="MiluimStudentGrant")
         if not html:
             logger.warning("MiluimStudentGrant: failed to load page HTML")
             return []
+        return self.parse_page(FetchedPage(url=self.source_url, body=html, fetched_at=utc_now()))
 
+    @staticmethod
+    def parse(page: FetchedPage) -> list[Grant]:
         # 2. Extraction: get text from DOM (keyword-based or fallback)
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(page.body, "html.parser")
         article_text, used_fallback = _extract_article_text(soup)
         if not article_text:
             logger.warning("MiluimStudentGrant: no article text extracted")
@@ -304,8 +316,7 @@ class MiluimStudentGrantSource(SourceScraper):
         parsed = _parse_grant_data(article_text)
 
         # 4. Grant building
-        fetched_at = utc_now()
-        grants = _build_grants_from_parsed(parsed, source_url, fetched_at)
+        grants = _build_grants_from_parsed(parsed, page.url, page.fetched_at)
 
         if grants:
             logger.info(
@@ -0,0 +1,179 @@
+"""On-disk checkpoint of a HUJI run, so an interrupted run can be resumed.
+
+The checkpoint is two files in $FUNDFINDER_STATE_DIR. The header
+(huji_checkpoint.json) holds the listing's IDs as they stream in and whether the
+listing was read to the end; it is small and rewritten atomically. The journal
+(huji_checkpoint.ndjson) gets one line per details document fetched, with its fetch
+time, appended every SAVE_EVERY new documents (or SAVE_INTERVAL seconds), so a save
+costs only what is new. Raw documents rather than grants are kept so a resumed run
+maps them with the current mapper. Both files are deleted when a run finishes.
+
+HujiCheckpoint.load() drops everything older than the freshness window: details
+fetched within it are reused, and the saved ID list is reused only if the listing
+completed within it; otherwise the listing is fetched again.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from services.scraper import codec
+from services.scraper.utils import state_dir, utc_now
+
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = "huji_checkpoint.json"
+JOURNAL_SUFFIX = ".ndjson"
+FORMAT_VERSION = 2
+
+SAVE_EVERY = 25
+SAVE_INTERVAL = 30.0
+DEFAULT_FRESHNESS = timedelta(hours=6)
+
+
+class HujiCheckpoint:
+    """Listing IDs and fetched details of one HUJI run. Thread-safe.
+
+    add_details() only records a document and says whether a save is due; the
+    caller runs save(), which does its file I/O outside the lock that guards the
+    in-memory state (ascrape runs it in a worker thread).
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or state_dir() / STATE_FILENAME
+        self.journal_path = self.path.with_suffix(JOURNAL_SUFFIX)
+        self.started_at = utc_now()
+        self.ids: list[int] = []
+        self.listing_complete = False
+        # scholarship id -> (fetched_at ISO string, raw details document)
+        self.details: dict[int, tuple[str, dict]] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._unsaved: list[int] = []
+        self._header_dirty = True
+        # The journal on disk does not match self.details (new run, stale entries
+        # dropped, failed append): the next save rewrites it instead of appending
+        self._rewrite_journal = True
+        self._saved_at = time.monotonic()
+
+    @classmethod
+    def load(cls, path: Path | None = None, freshness: timedelta = DEFAULT_FRESHNESS) -> HujiCheckpoint:
+        """The saved checkpoint without entries older than freshness. Empty if there is
+        no checkpoint or it cannot be read."""
+        checkpoint = cls(path)
+        if not checkpoint.path.exists():
+            return checkpoint
+        cutoff = utc_now() - freshness
+        try:
+            raw = codec.loads(checkpoint.path.read_bytes())
+            if raw.get("version") != FORMAT_VERSION:
+                raise ValueError(f"unsupported version {raw.get('version')!r}")
+            started_at = datetime.fromisoformat(raw["started_at"])
+            details, complete = _read_journal(checkpoint.journal_path, cutoff)
+            if raw["listing_complete"] and started_at >= cutoff:
+                checkpoint.started_at = started_at
+                checkpoint.ids = [int(sid) for sid in raw["ids"]]
+                checkpoint.listing_complete = True
+                checkpoint._header_dirty = False
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning("HUJI: ignoring unreadable checkpoint %s: %s", checkpoint.path, e)
+            return checkpoint
+        checkpoint.details = details
+        checkpoint._rewrite_journal = not complete
+        return checkpoint
+
+    def add_id(self, scholarship_id: int) -> None:
+        with self._lock:
+            self.ids.append(scholarship_id)
+            self._header_dirty = True
+
+    def complete_listing(self) -> None:
+        """Mark the listing as read to the end. Call save() afterwards."""
+        with self._lock:
+            self.listing_complete = True
+            self._header_dirty = True
+
+    def cached(self, scholarship_id: int) -> dict | None:
+        """Details document saved for scholarship_id, if any."""
+        with self._lock:
+            entry = self.details.get(scholarship_id)
+        return entry[1] if entry is not None else None
+
+    def add_details(self, scholarship_id: int, doc: dict) -> bool:
+        """Record a fetched document. True when a save() is due."""
+        with self._lock:
+            self.details[scholarship_id] = (utc_now().isoformat(), doc)
+            self._unsaved.append(scholarship_id)
+            return len(self._unsaved) >= SAVE_EVERY or time.monotonic() - self._saved_at >= SAVE_INTERVAL
+
+    def save(self) -> None:
+        """Append unsaved documents to the journal and rewrite the header if it changed."""
+        with self._write_lock:
+            with self._lock:
+                header = None
+                if self._header_dirty:
+                    header = {
+                        "version": FORMAT_VERSION,
+                        "started_at": self.started_at.isoformat(),
+                        "listing_complete": self.listing_complete,
+                        "ids": list(self.ids),
+                    }
+                rewrite = self._rewrite_journal
+                sids = list(self.details) if rewrite else self._unsaved
+                entries = [(sid, *self.details[sid]) for sid in dict.fromkeys(sids)]
+                self._unsaved = []
+                self._header_dirty = self._rewrite_journal = False
+                self._saved_at = time.monotonic()
+            try:
+                lines = "".join(codec.dumps(list(entry)) + "\n" for entry in entries)
+                if rewrite:
+                    _replace(self.journal_path, lines)
+                elif lines:
+                    with self.journal_path.open("a", encoding="utf-8") as f:
+                        f.write(lines)
+                if header is not None:
+                    _replace(self.path, codec.dumps(header))
+            except BaseException:
+                with self._lock:
+                    self._rewrite_journal = self._header_dirty = True
+                raise
+
+    def clear(self) -> None:
+        """Delete the checkpoint files (the run finished)."""
+        with self._write_lock, self._lock:
+            self.path.unlink(missing_ok=True)
+            self.journal_path.unlink(missing_ok=True)
+            self._unsaved = []
+
+
+def _read_journal(path: Path, cutoff: datetime) -> tuple[dict[int, tuple[str, dict]], bool]:
+    """Journal entries fetched at or after cutoff, and whether that was all of them.
+
+    A last line without its newline is what an interrupted append leaves; it is skipped.
+    """
+    details: dict[int, tuple[str, dict]] = {}
+    complete = True
+    if not path.exists():
+        return details, True
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                complete = False
+                break
+            sid, fetched_at, doc = codec.loads(line)
+            if datetime.fromisoformat(fetched_at) >= cutoff:
+                details[int(sid)] = (fetched_at, doc)
+            else:
+                complete = False
+    return details, complete
+
+
+def _replace(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
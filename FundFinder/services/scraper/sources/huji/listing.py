@@ -0,0 +1,163 @@
+"""Incremental parser for the HUJI listing document.
+
+The listing is one JSON object whose "results" array holds an entry per scholarship.
+ListingParser is fed the response body chunk by chunk (httpx iter_bytes) and returns
+each "results" entry as soon as the entry is complete. Only the entry being read is
+buffered, so memory does not grow with the listing, and other top-level values are
+skipped without being decoded.
+
+The scanner only tracks structure (strings, nesting, the "results" key); each entry
+is decoded with the codec, which rejects malformed entries.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from services.scraper import codec
+
+# Bytes that change scanner state outside strings, and inside strings
+_TOKEN_RE = re.compile(rb'["{}\[\],:]')
+_STRING_RE = re.compile(rb'["\\]')
+
+RESULTS_KEY = b"results"
+
+
+class ListingError(ValueError):
+    """The listing could not be fetched or is not a JSON object with a "results" array."""
+
+
+class ListingParser:
+    """Push parser yielding the entries of the listing's "results" array."""
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._string_start = 0
+        self._last_string: bytes | None = None
+        self._expect_results = False
+        self._in_results = False
+        self._item_start = 0
+        # None: no "results" key yet; True/False: its value is / is not an array
+        self._results_is_list: bool | None = None
+
+    def feed(self, data: bytes) -> list[Any]:
+        """Consume the next chunk of the body. Returns the entries it completed, in order."""
+        self._buf += data
+        if not self._started and not self._start():
+            return []
+        items: list[Any] = []
+        buf = self._buf
+        pos = self._pos
+        while pos < len(buf) and self._depth > 0:
+            if self._in_string:
+                m = _STRING_RE.search(buf, pos)
+                if m is None:
+                    pos = len(buf)
+                    break
+                if m.group() == b"\\":
+                    if m.end() == len(buf):
+                        # Escaped character is in the next chunk; rescan from the backslash
+                        pos = m.start()
+                        break
+                    pos = m.end() + 1
+                    continue
+                self._in_string = False
+                pos = m.end()
+                if self._depth == 1:
+                    self._last_string = bytes(buf[self._string_start + 1 : m.start()])
+                continue
+
+            m = _TOKEN_RE.search(buf, pos)
+            if m is None:
+                pos = len(buf)
+                break
+            token = m.group()
+            pos = m.end()
+            if self._expect_results:
+                self._expect_results = False
+                self._results_is_list = token == b"["
+                if token == b"[":
+                    self._depth += 1
+                    self._in_results = True
+                    self._item_start = pos
+                    continue
+            if token == b'"':
+                self._in_string = True
+                self._string_start = m.start()
+            elif token in (b"{", b"["):
+                self._depth += 1
+            elif token in (b"}", b"]"):
+                self._depth -= 1
+                if self._in_results and self._depth == 1:
+                    self._emit(self._item_start, m.start(), items)
+                    self._in_results = False
+            elif token == b",":
+                if self._in_results and self._depth == 2:
+                    self._emit(self._item_start, m.start(), items)
+                    self._item_start = pos
+            elif token == b":" and self._depth == 1:
+                self._expect_results = self._last_string == RESULTS_KEY
+                if self._expect_results and self._results_is_list is not None:
+                    raise ListingError("listing has more than one 'results' key")
+        self._pos = pos
+        self._compact()
+        return items
+
+    def close(self) -> None:
+        """Check that the body was a complete listing. Raises ListingError otherwise."""
+        if not self._started:
+            if codec.is_blank(self._buf):
+                raise ListingError("returned empty body")
+            raise ListingError("root is not a dict")
+        if self._depth > 0:
+            raise ListingError("listing body is truncated")
+        if self._results_is_list is None:
+            raise ListingError("missing 'results' key")
+        if not self._results_is_list:
+            raise ListingError("'results' is not a list")
+
+    def _start(self) -> bool:
+        """Find the root object past whitespace and BOM. False if more data is needed."""
+        payload = codec.json_payload(self._buf)
+        if len(payload) < len(codec.UTF8_BOM) and codec.UTF8_BOM.startswith(bytes(payload)):
+            return False
+        first = bytes(payload[:1])
+        if first == b"<":
+            # Listing sometimes returns HTML error page instead of JSON (e.g. "Something went wrong")
+            raise ListingError(
+                "listing endpoint returned HTML (not JSON). "
+                "Server may be blocking the request or the listing URL has changed."
+            )
+        if first != b"{":
+            raise ListingError("root is not a dict")
+        self._started = True
+        self._depth = 1
+        self._pos = len(self._buf) - len(payload) + 1
+        return True
+
+    def _emit(self, start: int, end: int, items: list[Any]) -> None:
+        raw = bytes(self._buf[start:end]).strip()
+        if not raw:
+            return
+        try:
+            items.append(codec.loads(raw))
+        except ValueError as e:
+            raise ListingError(f"invalid JSON in 'results': {e}") from e
+
+    def _compact(self) -> None:
+        """Drop scanned bytes that no open entry or key string still needs."""
+        keep = self._pos
+        if self._in_results:
+            keep = min(keep, self._item_start)
+        elif self._in_string and self._depth == 1:
+            keep = min(keep, self._string_start)
+        if keep:
+            del self._buf[:keep]
+            self._pos -= keep
+            self._item_start -= keep
+            self._string_start -= keep
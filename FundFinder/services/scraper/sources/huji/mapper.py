@@ -1,9 +1,23 @@
 from __future__ import annotations
 
 import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Callable, Sequence
 
 from ...models import Grant
-from ...utils import content_hash, utc_now, parse_deadline, clean_hebrew_text
+from ...utils import (
+    clean_hebrew_text,
+    content_hash,
+    content_hashes,
+    parse_deadline,
+    parse_deadlines,
+    process_pool,
+    utc_now,
+)
+
+# map_huji_batch only uses a process pool from this many records on
+POOL_MIN_RECORDS = 2000
 
 
 def _get(data: dict, key: str, default: str | None = None) -> str | None:
@@ -82,10 +96,14 @@ def _safe_numeric(data: dict, key: str) -> int | float | None:
         return None
 
 
-def map_huji_json_to_grant(data: dict) -> Grant:
-    if not isinstance(data, dict):
-        data = {}
+def _eligibility(parts: tuple[str | None, ...]) -> str | None:
+    combined = " | ".join(p for p in parts if p)
+    eligibility_raw = clean_hebrew_text(combined).strip() if combined else ""
+    return eligibility_raw or None
+
 
+def _grant_fields(data: dict, eligibility_of: Callable[[tuple[str | None, ...]], str | None]) -> dict:
+    """Grant fields of one details document, except deadline, content_hash and fetched_at."""
     # Title from details only: hebrewName (preferred) else englishName. Never append amount to title.
     hebrew_name = _get(data, "hebrewName")
     english_name = _get(data, "englishName")
@@ -105,14 +123,12 @@ def map_huji_json_to_grant(data: dict) -> Grant:
         else "https://new.huji.ac.il/scholarships-details?Id=0"
     )
 
-    submission_date_to = _get(data, "submissionDateTo")
-    deadline_text = submission_date_to
-    deadline = parse_deadline(submission_date_to) if submission_date_to else None
+    deadline_text = _get(data, "submissionDateTo")
+    raw_amount_desc = _get(data, "descriptionScholarshipAmount")
 
     # Amount: from sumYearFrom and/or sumYearTo; if both equal -> single value, else range; else fallback to description text
     sum_year_from = _safe_numeric(data, "sumYearFrom")
     sum_year_to = _safe_numeric(data, "sumYearTo")
-    sum_currency = _get(data, "sumCurrency")
     from_ok = sum_year_from is not None and sum_year_from > 0
     to_ok = sum_year_to is not None and sum_year_to > 0
     if from_ok or to_ok:
@@ -125,33 +141,20 @@ def map_huji_json_to_grant(data: dict) -> Grant:
             amount = str(int(sum_year_from)) if sum_year_from == int(sum_year_from) else str(sum_year_from)
         else:
             amount = str(int(sum_year_to)) if sum_year_to == int(sum_year_to) else str(sum_year_to)
-        currency = sum_currency  # as-is, only when we have numeric amount
+        currency = _get(data, "sumCurrency")  # as-is, only when we have numeric amount
     else:
-        raw_amount_desc = _get(data, "descriptionScholarshipAmount")
         amount = extract_amount(raw_amount_desc)
         if amount is None and description:
             amount = extract_amount(description)
         currency = None  # fallback branch: no numeric amount
 
-    raw_amount_desc = _get(data, "descriptionScholarshipAmount")
-
-    parts = [
-        _get(data, "degree"),
-        _get(data, "nation"),
-        _get(data, "specialPopulation"),
-        _get(data, "studyYear"),
-    ]
-    combined = " | ".join(p for p in parts if p)
-    eligibility_raw = clean_hebrew_text(combined).strip() if combined else ""
-    eligibility = eligibility_raw or None
-
-    hash_str = content_hash(
-        title=title,
-        description=description,
-        deadline_text=deadline_text,
-        amount=amount,
-        eligibility=eligibility,
-        source_url=source_url,
+    eligibility = eligibility_of(
+        (
+            _get(data, "degree"),
+            _get(data, "nation"),
+            _get(data, "specialPopulation"),
+            _get(data, "studyYear"),
+        )
     )
 
     extra = {
@@ -167,17 +170,109 @@ def map_huji_json_to_grant(data: dict) -> Grant:
     }
     extra = {k: v for k, v in extra.items() if v is not None}
 
+    return {
+        "title": title,
+        "description": description,
+        "source_url": source_url,
+        "deadline_text": deadline_text,
+        "amount": amount,
+        "currency": currency,
+        "eligibility": eligibility,
+        "extra": extra,
+    }
+
+
+def _to_grant(fields: dict, deadline: date | None, hash_str: str, fetched_at: datetime) -> Grant:
     return Grant(
-        title=title,
-        description=description or None,
-        source_url=source_url,
+        title=fields["title"],
+        description=fields["description"] or None,
+        source_url=fields["source_url"],
         source_name="huji",
         deadline=deadline,
-        deadline_text=deadline_text,
-        amount=amount,
-        currency=currency,
-        eligibility=eligibility,
+        deadline_text=fields["deadline_text"],
+        amount=fields["amount"],
+        currency=fields["currency"],
+        eligibility=fields["eligibility"],
         content_hash=hash_str,
-        fetched_at=utc_now(),
-        extra=extra if extra else None,
+        fetched_at=fetched_at,
+        extra=fields["extra"] or None,
+    )
+
+
+def _hash_row(fields: dict) -> tuple[str, str | None, str | None, str | None, str | None, str]:
+    return (
+        fields["title"],
+        fields["description"],
+        fields["deadline_text"],
+        fields["amount"],
+        fields["eligibility"],
+        fields["source_url"],
     )
+
+
+def map_huji_json_to_grant(data: dict) -> Grant:
+    if not isinstance(data, dict):
+        data = {}
+    fields = _grant_fields(data, _eligibility)
+    deadline_text = fields["deadline_text"]
+    return _to_grant(
+        fields,
+        parse_deadline(deadline_text) if deadline_text else None,
+        content_hash(*_hash_row(fields)),
+        utc_now(),
+    )
+
+
+def map_huji_batch(
+    records: Sequence[dict],
+    fetched_at: datetime | None = None,
+    processes: int = 0,
+) -> list[Grant | Exception]:
+    """map_huji_json_to_grant over many details documents, in order.
+
+    Work repeated across records is done once: all grants share one fetched_at,
+    eligibility is built once per distinct (degree, nation, specialPopulation,
+    studyYear), each distinct deadline is parsed once and hashing cleans each
+    distinct field value once. A record that fails to map yields its exception in
+    its place, so one bad document does not drop the batch.
+
+    With processes > 1 and at least POOL_MIN_RECORDS records, chunks of the batch
+    are mapped in that many worker processes; the result is the same.
+    """
+    fetched_at = fetched_at or utc_now()
+    if processes > 1 and len(records) >= POOL_MIN_RECORDS:
+        size = -(-len(records) // processes)
+        chunks = [records[i : i + size] for i in range(0, len(records), size)]
+        with process_pool(processes) as pool:
+            chunk_results = pool.map(_map_chunk, chunks, [fetched_at] * len(chunks))
+            return [result for chunk in chunk_results for result in chunk]
+
+    eligibility_of = lru_cache(maxsize=None)(_eligibility)
+    all_fields: list[dict | Exception] = []
+    for data in records:
+        try:
+            all_fields.append(_grant_fields(data if isinstance(data, dict) else {}, eligibility_of))
+        except Exception as e:
+            all_fields.append(e)
+
+    mapped = [fields for fields in all_fields if isinstance(fields, dict)]
+    deadlines = iter(parse_deadlines(fields["deadline_text"] for fields in mapped))
+    hashes = iter(content_hashes(_hash_row(fields) for fields in mapped))
+    results: list[Grant | Exception] = []
+    for fields in all_fields:
+        if isinstance(fields, Exception):
+            results.append(fields)
+            continue
+        try:
+            results.append(_to_grant(fields, next(deadlines), next(hashes), fetched_at))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def _map_chunk(records: Sequence[dict], fetched_at: datetime) -> list[Grant | Exception]:
+    """Run in a worker process. Exceptions are returned as ValueError, which always pickles."""
+    return [
+        r if isinstance(r, Grant) else ValueError(f"{type(r).__name__}: {r}")
+        for r in map_huji_batch(records, fetched_at)
+    ]
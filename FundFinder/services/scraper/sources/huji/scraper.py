@@ -1,17 +1,30 @@
-"""HUJI scholarship scraper - listing for IDs, details endpoint for full data."""
+"""HUJI scholarship scraper - listing for IDs, details endpoint for full data.
+
+The listing is streamed (see listing.py): details requests for the first IDs go out
+while the rest of the listing is still downloading. scrape() fetches details on a
+thread pool; ascrape() does the same with asyncio tasks on an httpx.AsyncClient.
+Both checkpoint their progress so an interrupted run can be resumed (checkpoint.py).
+"""
 
 from __future__ import annotations
 
-import json
 import logging
-import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable, Iterator
 
 import httpx
 
-from services.scraper.base import SourceScraper
+from services.scraper import codec, metrics
+from services.scraper.base import AsyncSourceScraper, ResumableScraper
+from services.scraper.http_client import make_async_client, make_client
 from services.scraper.models import Grant
+from services.scraper.policy import AsyncPolicyClient, PolicyClient, latency_report, policy_for
 
-from .mapper import map_huji_json_to_grant
+from .checkpoint import DEFAULT_FRESHNESS, HujiCheckpoint
+from .listing import ListingError, ListingParser
+from .mapper import map_huji_batch
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +32,8 @@ HUJI_LISTING_URL = "https://new.huji.ac.il/scholarshipsservices/scholarshipsdata
 HUJI_DETAILS_URL = "https://new.huji.ac.il/scholarshipsservices/scholarshipdetails/{id}"
 DEFAULT_TIMEOUT = 30.0
 DETAILS_TIMEOUT = 15.0
-DETAILS_RETRY_DELAY = 2.0
+# Upper bound on worker threads (or tasks); the per-host limiter decides how many actually run at once
+DETAILS_WORKERS = 8
 # Browser-like headers so the listing endpoint returns JSON (it returns HTML for bare requests)
 HEADERS = {
     "Accept": "application/json",
@@ -30,137 +44,314 @@ HEADERS = {
 }
 
 
-def _fetch_details(client: httpx.Client, scholarship_id: int) -> dict | None:
+def fetch_details(client: PolicyClient | httpx.Client, scholarship_id: int) -> dict | None:
+    """Fetch one details document. Retries and hedging come from the client's RequestPolicy."""
     url = HUJI_DETAILS_URL.format(id=scholarship_id)
-    for attempt in range(2):
-        try:
-            resp = client.get(url, headers=HEADERS, timeout=DETAILS_TIMEOUT)
-            if resp.status_code != 200:
-                logger.warning(
-                    "HUJI: details non-200 for id=%s, status=%s",
-                    scholarship_id,
-                    resp.status_code,
-                )
-                return None
-            text = resp.text or resp.content.decode("utf-8", errors="replace")
-            text = text.strip().lstrip("\ufeff")
-            if not text:
-                return None
-            return json.loads(text)
-        except httpx.TimeoutException:
-            logger.warning("HUJI: details timeout for id=%s (attempt %s)", scholarship_id, attempt + 1)
-            if attempt == 0:
-                time.sleep(DETAILS_RETRY_DELAY)
-        except (httpx.RequestError, json.JSONDecodeError) as e:
-            logger.warning("HUJI: details failed for id=%s: %s", scholarship_id, e)
-            return None
-    return None
-
-
-class HUJIScraper(SourceScraper):
-    """Scrapes HUJI scholarships: listing for IDs, then details per ID for full data."""
-
-    def __init__(self) -> None:
+    try:
+        resp = client.get(url, headers=HEADERS, timeout=DETAILS_TIMEOUT)
+    except httpx.TimeoutException:
+        logger.warning("HUJI: details timeout for id=%s", scholarship_id)
+        return None
+    except httpx.RequestError as e:
+        logger.warning("HUJI: details failed for id=%s: %s", scholarship_id, e)
+        return None
+    return _decode_details(resp, scholarship_id)
+
+
+async def afetch_details(client: AsyncPolicyClient | httpx.AsyncClient, scholarship_id: int) -> dict | None:
+    """Async variant of fetch_details."""
+    url = HUJI_DETAILS_URL.format(id=scholarship_id)
+    try:
+        resp = await client.get(url, headers=HEADERS, timeout=DETAILS_TIMEOUT)
+    except httpx.TimeoutException:
+        logger.warning("HUJI: details timeout for id=%s", scholarship_id)
+        return None
+    except httpx.RequestError as e:
+        logger.warning("HUJI: details failed for id=%s: %s", scholarship_id, e)
+        return None
+    return _decode_details(resp, scholarship_id)
+
+
+def _decode_details(resp: httpx.Response, scholarship_id: int) -> dict | None:
+    if resp.status_code != 200:
+        logger.warning(
+            "HUJI: details non-200 for id=%s, status=%s",
+            scholarship_id,
+            resp.status_code,
+        )
+        return None
+    body = codec.json_payload(resp.content)
+    if not body:
+        return None
+    try:
+        return codec.loads(body)
+    except ValueError as e:
+        logger.warning("HUJI: details failed for id=%s: %s", scholarship_id, e)
+        return None
+
+
+def _scholarship_id(item: Any) -> int | None:
+    # Listing uses "scholarshipId", details use "scholarshipsId"
+    if not isinstance(item, dict):
+        logger.debug("HUJI: skipping non-dict item %r", type(item))
+        return None
+    sid = item.get("scholarshipsId") or item.get("scholarshipId")
+    if sid is None:
+        return None
+    try:
+        return int(sid)
+    except (TypeError, ValueError):
+        return None
+
+
+def _new_ids(items: list[Any], seen_ids: set[int]) -> list[int]:
+    ids = []
+    for item in items:
+        sid = _scholarship_id(item)
+        if sid is None or sid in seen_ids:
+            continue
+        seen_ids.add(sid)
+        ids.append(sid)
+    return ids
+
+
+def iter_listing_ids(client: httpx.Client) -> Iterator[int]:
+    """Stream the listing and yield unique scholarship IDs in listing order as they arrive.
+
+    Raises ListingError if the request fails or the body is not a valid listing; IDs
+    already yielded then belong to an incomplete listing.
+    """
+    parser = ListingParser()
+    seen_ids: set[int] = set()
+    try:
+        with client.stream("GET", HUJI_LISTING_URL, headers=HEADERS, timeout=DEFAULT_TIMEOUT) as resp:
+            _check_listing_status(resp)
+            for chunk in resp.iter_bytes():
+                yield from _new_ids(parser.feed(chunk), seen_ids)
+            parser.close()
+    except httpx.TimeoutException as e:
+        raise ListingError(f"timed out after {DEFAULT_TIMEOUT} seconds: {e}") from e
+    except httpx.RequestError as e:
+        raise ListingError(f"request failed: {e}") from e
+
+
+async def aiter_listing_ids(client: httpx.AsyncClient) -> AsyncIterator[int]:
+    """Async variant of iter_listing_ids."""
+    parser = ListingParser()
+    seen_ids: set[int] = set()
+    try:
+        async with client.stream("GET", HUJI_LISTING_URL, headers=HEADERS, timeout=DEFAULT_TIMEOUT) as resp:
+            _check_listing_status(resp)
+            async for chunk in resp.aiter_bytes():
+                for sid in _new_ids(parser.feed(chunk), seen_ids):
+                    yield sid
+            parser.close()
+    except httpx.TimeoutException as e:
+        raise ListingError(f"timed out after {DEFAULT_TIMEOUT} seconds: {e}") from e
+    except httpx.RequestError as e:
+        raise ListingError(f"request failed: {e}") from e
+
+
+def _check_listing_status(resp: httpx.Response) -> None:
+    if resp.status_code != 200:
+        raise ListingError(f"got non-200 response: status={resp.status_code}, url={HUJI_LISTING_URL}")
+
+
+def fetch_listing_ids() -> list[int]:
+    """Fetch the listing and return unique scholarship IDs in listing order ([] on failure)."""
+    try:
+        with make_client() as client:
+            return list(iter_listing_ids(client))
+    except ListingError as e:
+        logger.error("HUJI scrape: %s", e)
+        return []
+
+
+class HUJIScraper(AsyncSourceScraper, ResumableScraper):
+    """Scrapes HUJI scholarships: listing for IDs, then details per ID for full data.
+
+    Progress is checkpointed to local state (see checkpoint.py). With resume=True a
+    run starts from the last checkpoint: listing IDs and details younger than
+    freshness are reused and only the remaining details are fetched.
+    """
+
+    def __init__(
+        self,
+        resume: bool = False,
+        checkpoint_path: Path | None = None,
+        freshness: timedelta = DEFAULT_FRESHNESS,
+    ) -> None:
         super().__init__(source_name="huji", base_url="https://new.huji.ac.il")
+        self.resume = resume
+        self.checkpoint_path = checkpoint_path
+        self.freshness = freshness
 
-    def scrape(self) -> list[Grant]:
-        grants: list[Grant] = []
-        try:
-            resp = httpx.get(
-                HUJI_LISTING_URL,
-                headers=HEADERS,
-                timeout=DEFAULT_TIMEOUT,
-            )
-        except httpx.TimeoutException as e:
-            logger.error("HUJI scrape timed out after %s seconds: %s", DEFAULT_TIMEOUT, e)
-            return grants
-        except httpx.RequestError as e:
-            logger.error("HUJI scrape request failed: %s", e)
-            return grants
+    def _checkpoint(self) -> HujiCheckpoint:
+        if not self.resume:
+            return HujiCheckpoint(self.checkpoint_path)
+        checkpoint = HujiCheckpoint.load(self.checkpoint_path, self.freshness)
+        logger.info(
+            "HUJI: resuming with %s listing IDs and %d details from checkpoint",
+            len(checkpoint.ids) if checkpoint.listing_complete else "no",
+            len(checkpoint.details),
+        )
+        return checkpoint
 
-        if resp.status_code != 200:
-            logger.error(
-                "HUJI scrape got non-200 response: status=%s, url=%s",
-                resp.status_code,
-                HUJI_LISTING_URL,
-            )
-            return grants
+    def _listing_ids(self, http: httpx.Client, checkpoint: HujiCheckpoint) -> Iterator[int]:
+        if checkpoint.listing_complete:
+            yield from list(checkpoint.ids)
+            return
+        for sid in iter_listing_ids(http):
+            checkpoint.add_id(sid)
+            yield sid
+        checkpoint.complete_listing()
+        checkpoint.save()
 
-        text = resp.text or resp.content.decode("utf-8", errors="replace")
-        text = text.strip().lstrip("\ufeff")
-        if not text:
-            logger.warning("HUJI scrape returned empty body")
-            return grants
+    async def _alisting_ids(self, http: httpx.AsyncClient, checkpoint: HujiCheckpoint) -> AsyncIterator[int]:
+        import asyncio
 
-        # Listing sometimes returns HTML error page instead of JSON (e.g. "Something went wrong")
-        if text.lstrip().startswith("<!") or text.lstrip().lower().startswith("<html"):
-            logger.error(
-                "HUJI scrape: listing endpoint returned HTML (not JSON). "
-                "Server may be blocking the request or the listing URL has changed."
-            )
-            return grants
+        if checkpoint.listing_complete:
+            for sid in list(checkpoint.ids):
+                yield sid
+            return
+        async for sid in aiter_listing_ids(http):
+            checkpoint.add_id(sid)
+            yield sid
+        checkpoint.complete_listing()
+        await asyncio.to_thread(checkpoint.save)
+
+    def scrape(self) -> list[Grant]:
+        self.run_stats = {}
+        checkpoint = self._checkpoint()
+        reused = len(checkpoint.details)
+        pending: list[tuple[int, Future[dict | None]]] = []
+
+        def details(sid: int) -> dict | None:
+            doc = checkpoint.cached(sid)
+            if doc is None:
+                doc = fetch_details(client, sid)
+                if doc is not None and checkpoint.add_details(sid, doc):
+                    checkpoint.save()
+            return doc
 
         try:
-            data = json.loads(text)
-        except json.JSONDecodeError as e:
-            logger.error("HUJI scrape got invalid JSON: %s", e)
-            return grants
+            with (
+                make_client() as http,
+                PolicyClient(http, policy_for(self.source_name)) as client,
+                ThreadPoolExecutor(max_workers=DETAILS_WORKERS) as pool,
+            ):
+                # Details requests start while the rest of the listing is still downloading
+                try:
+                    for sid in self._listing_ids(http, checkpoint):
+                        pending.append((sid, pool.submit(details, sid)))
+                except ListingError as e:
+                    # A partial listing would look like removed grants downstream; drop the run
+                    logger.error("HUJI scrape: %s", e)
+                    for _, future in pending:
+                        future.cancel()
+                    checkpoint.save()
+                    return []
+                results = [(sid, future.result()) for sid, future in pending]
+        except BaseException:
+            checkpoint.save()
+            raise
+        grants = self._build_grants(results, client, reused)
+        checkpoint.clear()
+        return grants
 
-        if not isinstance(data, dict):
-            logger.warning("HUJI scrape: root is not a dict")
-            return grants
+    async def ascrape(self) -> list[Grant]:
+        # Imported here (as in pipeline._ascrape): sync-only runs never pay for asyncio
+        import asyncio
 
-        results = data.get("results")
-        if results is None:
-            logger.warning("HUJI scrape: missing 'results' key")
-            return grants
-        if not isinstance(results, list):
-            logger.warning("HUJI scrape: 'results' is not a list")
-            return grants
+        self.run_stats = {}
+        checkpoint = self._checkpoint()
+        reused = len(checkpoint.details)
+        pending: list[tuple[int, asyncio.Task[dict | None]]] = []
+        slots = asyncio.Semaphore(DETAILS_WORKERS)
+
+        async def fetch(sid: int) -> dict | None:
+            doc = checkpoint.cached(sid)
+            if doc is not None:
+                return doc
+            async with slots:
+                doc = await afetch_details(client, sid)
+            if doc is not None and checkpoint.add_details(sid, doc):
+                # File I/O stays off the event loop
+                await asyncio.to_thread(checkpoint.save)
+            return doc
 
-        # Deduplicate by ID; listing uses "scholarshipId", details use "scholarshipsId"
-        seen_ids: set[int] = set()
-        ids_to_fetch: list[int] = []
-        for item in results:
-            if not isinstance(item, dict):
-                logger.debug("HUJI: skipping non-dict item %r", type(item))
-                continue
-            sid = item.get("scholarshipsId") or item.get("scholarshipId")
-            if sid is None:
-                continue
-            try:
-                sid = int(sid)
-            except (TypeError, ValueError):
-                continue
-            if sid in seen_ids:
-                continue
-            seen_ids.add(sid)
-            ids_to_fetch.append(sid)
-
-        total_ids = len(ids_to_fetch)
+        try:
+            async with make_async_client() as http:
+                client = AsyncPolicyClient(http, policy_for(self.source_name))
+                try:
+                    async for sid in self._alisting_ids(http, checkpoint):
+                        pending.append((sid, asyncio.ensure_future(fetch(sid))))
+                    details = await asyncio.gather(*(task for _, task in pending))
+                except ListingError as e:
+                    logger.error("HUJI scrape: %s", e)
+                    checkpoint.save()
+                    return []
+                finally:
+                    # On listing failure or cancellation no details task outlives the client
+                    for _, task in pending:
+                        task.cancel()
+                    await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+        except BaseException:
+            checkpoint.save()
+            raise
+        grants = self._build_grants(zip((sid for sid, _ in pending), details), client, reused)
+        checkpoint.clear()
+        return grants
+
+    def _build_grants(
+        self,
+        results: Iterable[tuple[int, dict | None]],
+        client: PolicyClient | AsyncPolicyClient,
+        reused: int = 0,
+    ) -> list[Grant]:
+        """Map (scholarship_id, details) pairs in listing order to grants and log run stats."""
+        grants: list[Grant] = []
+        total_ids = 0
         details_ok = 0
         details_fail = 0
-
-        with httpx.Client() as client:
-            for scholarship_id in ids_to_fetch:
-                details = _fetch_details(client, scholarship_id)
+        with metrics.timer("parse_duration_seconds", source=self.source_name):
+            ids: list[int] = []
+            docs: list[dict] = []
+            for scholarship_id, details in results:
+                total_ids += 1
                 if details is None or not isinstance(details, dict):
                     details_fail += 1
                     logger.warning("HUJI: details fetch failed for id=%s (skipped, no fallback to listing)", scholarship_id)
                     continue
-                try:
-                    grant = map_huji_json_to_grant(details)
-                    details_ok += 1
-                    grants.append(grant)
-                except Exception as e:
+                ids.append(scholarship_id)
+                docs.append(details)
+            for scholarship_id, grant in zip(ids, map_huji_batch(docs)):
+                if isinstance(grant, Exception):
                     details_fail += 1
-                    logger.warning("HUJI: failed to map details for id=%s: %s", scholarship_id, e)
+                    logger.warning("HUJI: failed to map details for id=%s: %s", scholarship_id, grant)
+                    continue
+                details_ok += 1
+                grants.append(grant)
 
+        self.run_stats = {
+            "total_ids": total_ids,
+            "details_ok": details_ok,
+            "details_fail": details_fail,
+            "retries": client.retries,
+            "hedges": client.hedges,
+            "details_reused": reused,
+        }
+        if not total_ids:
+            logger.warning("HUJI scrape: listing has no scholarships")
+            return grants
         logger.info(
-            "HUJI: total_ids=%s, details_ok=%s, details_fail=%s, grants=%s",
+            "HUJI: total_ids=%s, details_ok=%s, details_fail=%s, grants=%s, retries=%s, hedges=%s",
             total_ids,
             details_ok,
             details_fail,
             len(grants),
+            client.retries,
+            client.hedges,
         )
+        logger.info("HUJI: latency per host %s", latency_report())
         return grants
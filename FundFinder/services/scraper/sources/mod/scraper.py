@@ -5,11 +5,13 @@ from __future__ import annotations
 import logging
 import re
 from datetime import date
+from typing import Iterator
 
 import httpx
 from bs4 import BeautifulSoup
 
-from services.scraper.base import SourceScraper
+from services.scraper.base import AsyncSourceScraper, FetchedPage, StagedScraper
+from services.scraper.http_client import make_async_client, make_client
 from services.scraper.models import Grant
 from services.scraper.utils import content_hash, clean_hebrew_text, utc_now
 
@@ -71,7 +73,15 @@ def _extract_eligibility(container) -> str | None:
     return None
 
 
-class MODScraper(SourceScraper):
+def _page_from_response(resp: httpx.Response) -> FetchedPage | None:
+    if resp.status_code != 200:
+        logger.warning("MOD: non-200 status=%s", resp.status_code)
+        return None
+    text = resp.text or resp.content.decode("utf-8", errors="replace")
+    return FetchedPage(url=SOURCE_URL, body=text, fetched_at=utc_now())
+
+
+class MODScraper(StagedScraper, AsyncSourceScraper):
     """Scrapes the MOD 'Uniform to Studies' (ממדים ללימודים) scholarship page."""
 
     def __init__(self) -> None:
@@ -80,18 +90,30 @@ class MODScraper(SourceScraper):
             base_url="https://www.hachvana.mod.gov.il",
         )
 
-    def scrape(self) -> list[Grant]:
+    def fetch(self) -> Iterator[FetchedPage]:
         try:
-            resp = httpx.get(SOURCE_URL, timeout=TIMEOUT)
+            with make_client() as client:
+                resp = client.get(SOURCE_URL, timeout=TIMEOUT)
+        except httpx.RequestError as e:
+            logger.error("MOD: request failed: %s", e)
+            return
+        page = _page_from_response(resp)
+        if page is not None:
+            yield page
+
+    async def ascrape(self) -> list[Grant]:
+        try:
+            async with make_async_client() as client:
+                resp = await client.get(SOURCE_URL, timeout=TIMEOUT)
         except httpx.RequestError as e:
             logger.error("MOD: request failed: %s", e)
             return []
-        if resp.status_code != 200:
-            logger.warning("MOD: non-200 status=%s", resp.status_code)
-            return []
+        page = _page_from_response(resp)
+        return self.parse_page(page) if page is not None else []
 
-        text = resp.text or resp.content.decode("utf-8", errors="replace")
-        soup = BeautifulSoup(text, "html.parser")
+    @staticmethod
+    def parse(page: FetchedPage) -> list[Grant]:
+        soup = BeautifulSoup(page.body, "html.parser")
 
         title_el = soup.select_one(TITLE_SELECTOR)
         container = soup.select_one(CONTENT_SELECTOR)
@@ -145,7 +167,7 @@ class MODScraper(SourceScraper):
             currency=currency,
             eligibility=eligibility,
             content_hash=hash_str,
-            fetched_at=utc_now(),
+            fetched_at=page.fetched_at,
             extra=None,
         )
         logger.info("MOD: scraped 1 grant")
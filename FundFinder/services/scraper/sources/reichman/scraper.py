@@ -7,13 +7,14 @@ Extracts scholarships from the accordion page at
 from __future__ import annotations
 
 import logging
+from typing import Iterator
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
 
-from services.scraper.base import SourceScraper
+from services.scraper.base import AsyncSourceScraper, FetchedPage, StagedScraper
 from services.scraper.models import Grant
-from services.scraper.utils import clean_hebrew_text, content_hash, load_page_html, utc_now
+from services.scraper.utils import aload_page_html, clean_hebrew_text, content_hash, load_page_html, utc_now
 
 logger = logging.getLogger(__name__)
 
@@ -87,31 +88,44 @@ def _make_absolute_url(base_url: str, href: str) -> str:
     return urljoin(base_url, href)
 
 
-class ReichmanScholarshipSource(SourceScraper):
+class ReichmanScholarshipSource(StagedScraper, AsyncSourceScraper):
     """Scrapes Reichman University undergraduate scholarships page."""
 
     def __init__(self) -> None:
         super().__init__(source_name=SOURCE_NAME, base_url=BASE_URL)
 
-    def scrape(self) -> list[Grant]:
+    @property
+    def page_url(self) -> str:
         full_url = urljoin(self.base_url, SCHOLARSHIPS_PATH)
         if not full_url.endswith("/"):
             full_url = full_url.rstrip("/") + "/"
-        page_base = full_url
+        return full_url
 
-        html = load_page_html(full_url, timeout_ms=TIMEOUT_MS, source_name="Reichman")
+    def fetch(self) -> Iterator[FetchedPage]:
+        html = load_page_html(self.page_url, timeout_ms=TIMEOUT_MS, source_name="Reichman")
+        if not html:
+            logger.warning("Reichman: no HTML received")
+            return
+        yield FetchedPage(url=self.page_url, body=html, fetched_at=utc_now())
+
+    async def ascrape(self) -> list[Grant]:
+        html = await aload_page_html(self.page_url, timeout_ms=TIMEOUT_MS, source_name="Reichman")
         if not html:
             logger.warning("Reichman: no HTML received")
             return []
+        return self.parse_page(FetchedPage(url=self.page_url, body=html, fetched_at=utc_now()))
 
-        soup = BeautifulSoup(html, "html.parser")
+    @staticmethod
+    def parse(page: FetchedPage) -> list[Grant]:
+        page_base = page.url
+        soup = BeautifulSoup(page.body, "html.parser")
         buttons = soup.select("button.btnCollapse")
         if not buttons:
             logger.warning("Reichman: no button.btnCollapse found")
             return []
 
         grants: list[Grant] = []
-        fetched_at = utc_now()
+        fetched_at = page.fetched_at
         seen_urls: set[str] = set()
 
         for button in buttons:
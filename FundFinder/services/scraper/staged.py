@@ -0,0 +1,136 @@
+"""Two-stage runner: concurrent fetching in threads, parsing in a process pool.
+
+Each StagedScraper's fetch() runs in its own thread and puts pages on a bounded
+queue; the dispatcher (the calling thread) hands each page to a ProcessPoolExecutor
+(utils.process_pool: forkserver workers, as the fetch threads are already running)
+running the source's parse(). At most queue_size pages wait on the queue and at
+most queue_size parse jobs are in flight, so a slow stage makes the other wait
+instead of buffering whole sites in memory. BeautifulSoup work for one page
+therefore runs on another core while the next page is still downloading.
+
+Scrapers that are not StagedScraper run scrape() in their fetch thread and skip the
+parse stage. Parse jobs time themselves in the worker; the dispatcher adds those
+durations to the parse_duration_seconds metric, which lives in this process.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from services.scraper import metrics
+from services.scraper.base import FetchedPage, SourceScraper, StagedScraper
+from services.scraper.models import Grant
+from services.scraper.utils import process_pool
+
+logger = logging.getLogger(__name__)
+
+# Bound on pages waiting for the parse stage and on parse jobs in flight
+DEFAULT_QUEUE_SIZE = 8
+
+# Queue message kinds: (index, kind, payload)
+_PAGE = "page"
+_GRANTS = "grants"
+_ERROR = "error"
+_DONE = "done"
+
+
+@dataclass
+class _SourceState:
+    """Parse jobs (in page order) and outcome of one source."""
+
+    jobs: list[Future[tuple[list[Grant], float]]] = field(default_factory=list)
+    grants: list[Grant] | None = None
+    error: BaseException | None = None
+    done: bool = False
+
+
+def _timed_parse(parse: Callable[[FetchedPage], list[Grant]], page: FetchedPage) -> tuple[list[Grant], float]:
+    """Run in a worker process: parse(page) and its duration in seconds."""
+    start = time.perf_counter()
+    grants = parse(page)
+    return grants, time.perf_counter() - start
+
+
+def _fetch(index: int, scraper: SourceScraper, pages: queue.Queue) -> None:
+    try:
+        if isinstance(scraper, StagedScraper):
+            for page in scraper.fetch():
+                pages.put((index, _PAGE, page))
+        else:
+            pages.put((index, _GRANTS, scraper.scrape()))
+    except Exception as e:
+        pages.put((index, _ERROR, e))
+    finally:
+        pages.put((index, _DONE, None))
+
+
+def run_staged(
+    scrapers: list[SourceScraper],
+    parse_workers: int | None = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> list[list[Grant] | BaseException]:
+    """Run scrapers through the fetch and parse stages.
+
+    Returns one entry per scraper, in order: its grants, or the exception raised by
+    its fetch or any of its parse jobs. parse_workers=None uses one process per CPU.
+    """
+    pages: queue.Queue[tuple[int, str, Any]] = queue.Queue(maxsize=max(1, queue_size))
+    states = [_SourceState() for _ in scrapers]
+    threads = [
+        threading.Thread(
+            target=_fetch,
+            args=(i, scraper, pages),
+            name=f"fetch-{scraper.source_name}",
+            daemon=True,
+        )
+        for i, scraper in enumerate(scrapers)
+    ]
+    for t in threads:
+        t.start()
+
+    in_flight: set[Future] = set()
+    with process_pool(parse_workers) as pool:
+        while not all(state.done for state in states):
+            index, kind, payload = pages.get()
+            state = states[index]
+            if kind == _PAGE:
+                if len(in_flight) >= queue_size:
+                    _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                job = pool.submit(_timed_parse, type(scrapers[index]).parse, payload)
+                state.jobs.append(job)
+                in_flight.add(job)
+            elif kind == _GRANTS:
+                state.grants = payload
+            elif kind == _ERROR:
+                state.error = payload
+            else:
+                state.done = True
+
+        results: list[list[Grant] | BaseException] = []
+        for scraper, state in zip(scrapers, states):
+            if state.error is not None:
+                for job in state.jobs:
+                    job.cancel()
+                results.append(state.error)
+                continue
+            grants = list(state.grants or [])
+            try:
+                for job in state.jobs:
+                    page_grants, elapsed = job.result()
+                    grants.extend(page_grants)
+                    metrics.observe("parse_duration_seconds", elapsed, source=scraper.source_name)
+            except Exception as e:
+                results.append(e)
+                continue
+            results.append(grants)
+
+    for t in threads:
+        t.join()
+    return results
+
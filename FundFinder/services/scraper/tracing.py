@@ -0,0 +1,348 @@
+"""Per-request tracing for every httpx client made by http_client.make_client and
+make_async_client.
+
+While a RequestTracer is active (start_tracing), new clients get httpx event hooks
+that record, per request:
+
+- method, host, URL template (numeric/hex path segments replaced by {id}) and that id
+- status, time to first byte and total time (body fully read), both measured from
+  when the request left the per-host limiter; limiter wait is recorded separately
+- response size as read off the wire
+- retry attempt and whether it was a hedge (set by policy.PolicyClient)
+
+A sample_rate share of the records is appended to an NDJSON file; all of them feed
+the in-memory summary (summary() / log_summary()): per endpoint request count,
+bytes, retries, hedges, error statuses and p50/p95/max time, and the slowest ids.
+
+Requests that fail without a response (timeouts, connection errors) have no
+response event and are not traced; their retries show up as attempt > 0.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator
+
+import httpx
+
+from services.scraper import codec
+from services.scraper.utils import utc_now
+
+logger = logging.getLogger(__name__)
+
+# Request extensions read by the tracer (set by the transports and PolicyClient)
+SENT_AT = "fundfinder.sent_at"
+ATTEMPT = "fundfinder.attempt"
+HEDGE = "fundfinder.hedge"
+_STARTED_AT = "fundfinder.trace_start"
+
+# Path segments treated as ids: integers, UUIDs, long hex digests
+_ID_SEGMENT_RE = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}|[0-9a-fA-F]{16,})$")
+
+TOP_ENDPOINTS = 10
+TOP_IDS = 10
+
+
+def url_template(url: httpx.URL) -> tuple[str, str | None]:
+    """(path with id segments replaced by {id}, the last id or None). Query is dropped."""
+    item_id = None
+    segments = []
+    for segment in url.path.split("/"):
+        if _ID_SEGMENT_RE.match(segment):
+            item_id = segment
+            segments.append("{id}")
+        else:
+            segments.append(segment)
+    return "/".join(segments), item_id
+
+
+@dataclass(frozen=True)
+class RequestTrace:
+    """One traced request. Times are in seconds."""
+
+    started_at: str
+    method: str
+    host: str
+    template: str
+    item_id: str | None
+    status: int
+    ttfb: float
+    total: float
+    wait: float
+    size: int
+    attempt: int
+    hedge: bool
+
+
+@dataclass
+class EndpointSummary:
+    host: str
+    template: str
+    requests: int = 0
+    bytes: int = 0
+    retries: int = 0
+    hedges: int = 0
+    errors: int = 0
+    p50: float = 0.0
+    p95: float = 0.0
+    max: float = 0.0
+
+
+@dataclass(frozen=True)
+class SlowItem:
+    host: str
+    template: str
+    item_id: str
+    total: float
+    attempts: int
+
+
+@dataclass
+class TraceSummary:
+    requests: int = 0
+    bytes: int = 0
+    retries: int = 0
+    endpoints: list[EndpointSummary] = field(default_factory=list)
+    slowest_ids: list[SlowItem] = field(default_factory=list)
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class RequestTracer:
+    """Collects RequestTraces from event hooks. Thread-safe.
+
+    path=None keeps the summary only. sample_rate is the share of requests written
+    to path (the summary always covers every request).
+    """
+
+    def __init__(self, path: str | Path | None = None, sample_rate: float = 1.0) -> None:
+        self.path = Path(path) if path is not None else None
+        self.sample_rate = sample_rate
+        self._file = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._totals: dict[tuple[str, str], list[float]] = defaultdict(list)
+        self._endpoints: dict[tuple[str, str], EndpointSummary] = {}
+        # (host, template, id) -> (slowest total, attempts seen)
+        self._items: dict[tuple[str, str, str], tuple[float, int]] = {}
+
+    # --- hooks ---------------------------------------------------------------
+
+    def event_hooks(self) -> dict[str, list[Callable]]:
+        return {"request": [self._on_request], "response": [self._on_response]}
+
+    def async_event_hooks(self) -> dict[str, list[Callable]]:
+        async def on_request(request: httpx.Request) -> None:
+            self._on_request(request)
+
+        async def on_response(response: httpx.Response) -> None:
+            response.stream = _AsyncTracedStream(response.stream, self, response, time.monotonic())
+
+        return {"request": [on_request], "response": [on_response]}
+
+    def _on_request(self, request: httpx.Request) -> None:
+        request.extensions[_STARTED_AT] = time.monotonic()
+
+    def _on_response(self, response: httpx.Response) -> None:
+        response.stream = _TracedStream(response.stream, self, response, time.monotonic())
+
+    # --- recording -----------------------------------------------------------
+
+    def finish(self, response: httpx.Response, first_byte: float, size: int) -> None:
+        """Record a response whose body has been read (or closed) now."""
+        now = time.monotonic()
+        request = response.request
+        ext = request.extensions
+        started = ext.get(_STARTED_AT, first_byte)
+        sent = ext.get(SENT_AT, started)
+        template, item_id = url_template(request.url)
+        trace = RequestTrace(
+            started_at=utc_now().isoformat(),
+            method=request.method,
+            host=request.url.host,
+            template=template,
+            item_id=item_id,
+            status=response.status_code,
+            ttfb=round(first_byte - sent, 6),
+            total=round(now - sent, 6),
+            wait=round(max(0.0, sent - started), 6),
+            size=size,
+            attempt=ext.get(ATTEMPT, 0),
+            hedge=bool(ext.get(HEDGE, False)),
+        )
+        self.record(trace)
+
+    def record(self, trace: RequestTrace) -> None:
+        key = (trace.host, trace.template)
+        with self._lock:
+            endpoint = self._endpoints.get(key)
+            if endpoint is None:
+                endpoint = self._endpoints[key] = EndpointSummary(trace.host, trace.template)
+            endpoint.requests += 1
+            endpoint.bytes += trace.size
+            if trace.hedge:
+                endpoint.hedges += 1
+            elif trace.attempt > 0:
+                endpoint.retries += 1
+            if trace.status >= 400:
+                endpoint.errors += 1
+            self._totals[key].append(trace.total)
+            if trace.item_id is not None:
+                item = (trace.host, trace.template, trace.item_id)
+                slowest, attempts = self._items.get(item, (0.0, 0))
+                self._items[item] = (max(slowest, trace.total), attempts + 1)
+            if self._file is not None and random.random() < self.sample_rate:
+                self._file.write(codec.dumps(asdict(trace)) + "\n")
+
+    # --- reporting -----------------------------------------------------------
+
+    def summary(self, top_endpoints: int = TOP_ENDPOINTS, top_ids: int = TOP_IDS) -> TraceSummary:
+        """Endpoints by p95 time and the slowest ids, slowest first."""
+        with self._lock:
+            endpoints = []
+            for key, endpoint in self._endpoints.items():
+                totals = sorted(self._totals[key])
+                endpoint.p50 = round(_percentile(totals, 50), 6)
+                endpoint.p95 = round(_percentile(totals, 95), 6)
+                endpoint.max = round(totals[-1], 6)
+                endpoints.append(EndpointSummary(**asdict(endpoint)))
+            items = [
+                SlowItem(host, template, item_id, round(total, 6), attempts)
+                for (host, template, item_id), (total, attempts) in self._items.items()
+            ]
+        endpoints.sort(key=lambda e: e.p95, reverse=True)
+        items.sort(key=lambda i: i.total, reverse=True)
+        return TraceSummary(
+            requests=sum(e.requests for e in endpoints),
+            bytes=sum(e.bytes for e in endpoints),
+            retries=sum(e.retries for e in endpoints),
+            endpoints=endpoints[:top_endpoints],
+            slowest_ids=items[:top_ids],
+        )
+
+    def log_summary(self, top_endpoints: int = TOP_ENDPOINTS, top_ids: int = TOP_IDS) -> TraceSummary:
+        summary = self.summary(top_endpoints, top_ids)
+        logger.info(
+            "Trace: %d requests, %.1f KiB, %d retries",
+            summary.requests,
+            summary.bytes / 1024,
+            summary.retries,
+        )
+        for e in summary.endpoints:
+            logger.info(
+                "Trace endpoint %s%s: n=%d p50=%.3fs p95=%.3fs max=%.3fs bytes=%d retries=%d hedges=%d errors=%d",
+                e.host,
+                e.template,
+                e.requests,
+                e.p50,
+                e.p95,
+                e.max,
+                e.bytes,
+                e.retries,
+                e.hedges,
+                e.errors,
+            )
+        for item in summary.slowest_ids:
+            logger.info(
+                "Trace slow id %s on %s%s: %.3fs (%d attempts)",
+                item.item_id,
+                item.host,
+                item.template,
+                item.total,
+                item.attempts,
+            )
+        return summary
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class _TracedStream(httpx.SyncByteStream):
+    def __init__(self, stream: Any, tracer: RequestTracer, response: httpx.Response, first_byte: float) -> None:
+        self._stream = stream
+        self._tracer = tracer
+        self._response = response
+        self._first_byte = first_byte
+        self._size = 0
+        self._done = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._stream:
+            self._size += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if not self._done:
+                self._done = True
+                self._tracer.finish(self._response, self._first_byte, self._size)
+
+
+class _AsyncTracedStream(httpx.AsyncByteStream):
+    def __init__(self, stream: Any, tracer: RequestTracer, response: httpx.Response, first_byte: float) -> None:
+        self._stream = stream
+        self._tracer = tracer
+        self._response = response
+        self._first_byte = first_byte
+        self._size = 0
+        self._done = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            self._size += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._done:
+                self._done = True
+                self._tracer.finish(self._response, self._first_byte, self._size)
+
+
+_tracer: RequestTracer | None = None
+
+
+def start_tracing(path: str | Path | None = None, sample_rate: float = 1.0) -> RequestTracer:
+    """Trace requests of every client made from now on. Replaces an active tracer."""
+    global _tracer
+    stop_tracing()
+    _tracer = RequestTracer(path, sample_rate)
+    return _tracer
+
+
+def stop_tracing() -> RequestTracer | None:
+    """Stop tracing new clients and close the trace file. Returns the stopped tracer."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+    return tracer
+
+
+def event_hooks(asynchronous: bool = False) -> dict[str, list[Callable]]:
+    """Event hooks of the active tracer for a new client ({} while not tracing)."""
+    tracer = _tracer
+    if tracer is None:
+        return {}
+    return tracer.async_event_hooks() if asynchronous else tracer.event_hooks()
@@ -2,20 +2,20 @@
 import hashlib
 import json
 import logging
+import os
 import re
+import time
 from datetime import date, datetime, timezone
-from typing import Any
-
-from playwright.sync_api import sync_playwright
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable
 
 RTL_LTR_MARKS = "\u200e\u200f\u202a\u202b\u202c\u202d\u202e"
 
+# One-letter Hebrew prefixes (ו ה ב ל מ ש כ) stripped for search; mirrored in backend/db/schema.py
+HEBREW_PREFIXES = "והבלמשכ"
+_HEBREW_PREFIXED_WORD_RE = re.compile(rf"^[{HEBREW_PREFIXES}]([\u05D0-\u05EA]{{3,}})$")
+
 RTL_CHAR_RANGES = [
     (0x0590, 0x05FF),
     (0xFB1D, 0xFB4F),
@@ -80,6 +80,26 @@ def content_hash(
     return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
 
 
+def content_hashes(
+    rows: Iterable[tuple[str, str | None, str | None, str | None, str | None, str]],
+) -> list[str]:
+    """content_hash over many (title, description, deadline_text, amount, eligibility,
+    source_url) rows, cleaning each distinct field value once."""
+    cleaned: dict[str, str] = {}
+    sha256 = hashlib.sha256
+    hashes = []
+    for row in rows:
+        parts = []
+        for p in row:
+            p = p or ""
+            c = cleaned.get(p)
+            if c is None:
+                c = cleaned[p] = clean_hebrew_text(p).strip()
+            parts.append(c)
+        hashes.append(sha256("|".join(parts).encode("utf-8")).hexdigest())
+    return hashes
+
+
 def clean_hebrew_text(text: str | None) -> str:
     if text is None:
         return ""
@@ -90,43 +110,257 @@ def clean_hebrew_text(text: str | None) -> str:
     return s.strip()
 
 
+def strip_hebrew_prefix(word: str) -> str:
+    """Drop one leading prefix letter from a Hebrew word of 4+ letters (בלימודים -> לימודים)."""
+    m = _HEBREW_PREFIXED_WORD_RE.match(word)
+    return m.group(1) if m else word
+
+
+def search_terms(text: str | None) -> list[str]:
+    """Lowercased word tokens of text after clean_hebrew_text, as used for full-text search."""
+    return re.findall(r"\w+", clean_hebrew_text(text).lower())
+
+
+# --- Deadline parsing ----------------------------------------------------------
+
+DEADLINE_CACHE_SIZE = 4096
+
+_GREGORIAN_MONTHS = {
+    "ינואר": 1, "פברואר": 2, "מרץ": 3, "מרס": 3, "אפריל": 4, "מאי": 5, "יוני": 6,
+    "יולי": 7, "אוגוסט": 8, "ספטמבר": 9, "אוקטובר": 10, "נובמבר": 11, "דצמבר": 12,
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6, "july": 7,
+    "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+# Hebrew calendar months, numbered from Nisan (1) as in the calendar arithmetic below;
+# "אדר" is Adar in a common year and Adar I in a leap year.
+_HEBREW_MONTHS = {
+    "ניסן": 1, "אייר": 2, "איר": 2, "סיוון": 3, "סיון": 3, "תמוז": 4, "אב": 5, "מנחם אב": 5,
+    "אלול": 6, "תשרי": 7, "חשוון": 8, "חשון": 8, "מרחשוון": 8, "מרחשון": 8, "כסלו": 9,
+    "כסליו": 9, "טבת": 10, "שבט": 11, "אדר": 12, "אדר א": 12, "אדר ראשון": 12,
+    "אדר ב": 13, "אדר שני": 13,
+}
+_GEMATRIA = {
+    "א": 1, "ב": 2, "ג": 3, "ד": 4, "ה": 5, "ו": 6, "ז": 7, "ח": 8, "ט": 9,
+    "י": 10, "כ": 20, "ך": 20, "ל": 30, "מ": 40, "ם": 40, "נ": 50, "ן": 50, "ס": 60,
+    "ע": 70, "פ": 80, "ף": 80, "צ": 90, "ץ": 90, "ק": 100, "ר": 200, "ש": 300, "ת": 400,
+}
+_DASHES = str.maketrans({"\u2013": "-", "\u2014": "-", "\u05be": "-", "\u2212": "-", "\u05f4": '"', "\u05f3": "'"})
+
+
+def _alternation(names) -> str:
+    # Longest first so "אדר ב" wins over "אדר" and "sept" over "sep"
+    return "|".join(re.escape(n).replace(r"\ ", r"\s+") for n in sorted(names, key=len, reverse=True))
+
+
+_GREG_MONTH = _alternation(_GREGORIAN_MONTHS)
+_HEB_MONTH = _alternation(_HEBREW_MONTHS)
+
+_NUMERIC_DMY_RE = re.compile(r"(?<![\d/.])(\d{1,2})([/.-])(\d{1,2})\2(\d{4}|\d{2})(?!\d)")
+_NUMERIC_YMD_RE = re.compile(r"(?<!\d)(\d{4})([/.-])(\d{1,2})\2(\d{1,2})(?!\d)")
+# "30 ביוני 2025", "1-15 במרץ 2025", "30 June, 2025"
+_DAY_MONTH_YEAR_RE = re.compile(
+    rf"(?<!\d)(\d{{1,2}})(?:\s*-\s*(\d{{1,2}}))?\s*(?:of\s+)?(?<![א-ת])[בל]?-?({_GREG_MONTH})(?![a-zא-ת])\.?\s*,?\s*(\d{{4}})(?!\d)"
+)
+# "June 30, 2025", "June 1-15, 2025"
+_MONTH_DAY_YEAR_RE = re.compile(
+    rf"(?<![a-z])({_GREG_MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:\s*-\s*(\d{{1,2}}))?\s*,?\s+(\d{{4}})(?!\d)"
+)
+# "כ\"ה באדר ב תשפ\"ה", "15 בניסן ה'תשפ\"ו"
+_HEBREW_DATE_RE = re.compile(
+    rf"(?<![א-ת\d])([א-ת]{{1,2}}['\"]?[א-ת]?|\d{{1,2}})['\"]?\s+(?<![א-ת])[בל]?-?({_HEB_MONTH})(?![א-ת])\s*,?\s*"
+    rf"(ה['\"]?\s*)?([א-ת]{{1,3}}['\"][א-ת]|[א-ת]{{2,4}}|\d{{4}})(?![א-ת\d])"
+)
+# Words that mark the date right after them as the deadline ("עד ה-30.4", "until June 30")
+_DEADLINE_MARKER_RE = re.compile(r"(?:עד|until|by|deadline)\s*(?:ל|ה|ל?תאריך)?\s*-?\s*$")
+
+
+def _gematria(token: str) -> int:
+    return sum(_GEMATRIA.get(c, 0) for c in token if c not in "'\"")
+
+
+def _is_hebrew_leap_year(year: int) -> bool:
+    return (7 * year + 1) % 19 < 7
+
+
+def _hebrew_elapsed_days(year: int) -> int:
+    """Days from the Hebrew epoch to 1 Tishrei of year (molad with postponement rules)."""
+    months = 235 * ((year - 1) // 19) + 12 * ((year - 1) % 19) + (7 * ((year - 1) % 19) + 1) // 19
+    parts_elapsed = 204 + 793 * (months % 1080)
+    hours_elapsed = 5 + 12 * months + 793 * (months // 1080) + parts_elapsed // 1080
+    day = 1 + 29 * months + hours_elapsed // 24
+    parts = 1080 * (hours_elapsed % 24) + parts_elapsed % 1080
+    if (
+        parts >= 19440
+        or (day % 7 == 2 and parts >= 9924 and not _is_hebrew_leap_year(year))
+        or (day % 7 == 1 and parts >= 16789 and _is_hebrew_leap_year(year - 1))
+    ):
+        day += 1
+    if day % 7 in (0, 3, 5):
+        day += 1
+    return day
+
+
+def _hebrew_month_days(year: int, month: int) -> int:
+    year_days = _hebrew_elapsed_days(year + 1) - _hebrew_elapsed_days(year)
+    if month in (2, 4, 6, 10, 13):
+        return 29
+    if month == 12 and not _is_hebrew_leap_year(year):
+        return 29
+    if month == 8 and year_days % 10 != 5:  # Heshvan is long only in "complete" years
+        return 29
+    if month == 9 and year_days % 10 == 3:  # Kislev is short in "deficient" years
+        return 29
+    return 30
+
+
+def hebrew_to_gregorian(year: int, month: int, day: int) -> date | None:
+    """Gregorian date of a Hebrew calendar date (month 1 = Nisan). None if invalid."""
+    last_month = 13 if _is_hebrew_leap_year(year) else 12
+    if not (1 <= month <= last_month and 1 <= day <= _hebrew_month_days(year, month)):
+        return None
+    days = day
+    if month < 7:
+        days += sum(_hebrew_month_days(year, m) for m in range(7, last_month + 1))
+        days += sum(_hebrew_month_days(year, m) for m in range(1, month))
+    else:
+        days += sum(_hebrew_month_days(year, m) for m in range(7, month))
+    ordinal = days + _hebrew_elapsed_days(year) - 1373429
+    return date.fromordinal(ordinal) if ordinal > 0 else None
+
+
+def _make_date(year: int, month: int, day: int) -> date | None:
+    if year < 100:
+        year += 2000
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _deadline_candidates(text: str) -> list[tuple[int, date]]:
+    """(position, date) for every date found in normalised text."""
+    found: list[tuple[int, date]] = []
+    for m in _NUMERIC_YMD_RE.finditer(text):
+        d = _make_date(int(m.group(1)), int(m.group(3)), int(m.group(4)))
+        if d:
+            found.append((m.start(), d))
+    for m in _NUMERIC_DMY_RE.finditer(text):
+        first, second, year = int(m.group(1)), int(m.group(3)), int(m.group(4))
+        # Day-first (Israeli) unless only month-first is valid
+        d = _make_date(year, second, first) or _make_date(year, first, second)
+        if d:
+            found.append((m.start(), d))
+    for m in _DAY_MONTH_YEAR_RE.finditer(text):
+        # Ranges ("1-15 במרץ") end on the second day
+        day = int(m.group(2) or m.group(1))
+        d = _make_date(int(m.group(4)), _GREGORIAN_MONTHS[re.sub(r"\s+", " ", m.group(3))], day)
+        if d:
+            found.append((m.start(), d))
+    for m in _MONTH_DAY_YEAR_RE.finditer(text):
+        day = int(m.group(3) or m.group(2))
+        d = _make_date(int(m.group(4)), _GREGORIAN_MONTHS[m.group(1)], day)
+        if d:
+            found.append((m.start(), d))
+    for m in _HEBREW_DATE_RE.finditer(text):
+        day_token, month_name, _, year_token = m.groups()
+        day = int(day_token) if day_token.isdigit() else _gematria(day_token)
+        year = int(year_token) if year_token.isdigit() else _gematria(year_token)
+        if year < 1000:
+            year += 5000
+        month = _HEBREW_MONTHS[re.sub(r"\s+", " ", month_name)]
+        if month == 13 and not _is_hebrew_leap_year(year):
+            continue
+        if year >= 5600 and (d := hebrew_to_gregorian(year, month, day)):
+            found.append((m.start(), d))
+    return found
+
+
+@lru_cache(maxsize=DEADLINE_CACHE_SIZE)
+def _parse_deadline_cached(raw: str) -> date | None:
+    text = clean_hebrew_text(raw).translate(_DASHES).lower()
+    text = re.sub(r"\s+", " ", text)
+    candidates = _deadline_candidates(text)
+    if not candidates:
+        return None
+    # A date introduced by "עד"/"until" is the deadline; otherwise the latest date (end of a range)
+    marked = sorted((pos, d) for pos, d in candidates if _DEADLINE_MARKER_RE.search(text[max(0, pos - 16) : pos]))
+    if marked:
+        return marked[0][1]
+    return max(d for _, d in candidates)
+
+
 def parse_deadline(raw: str | None) -> date | None:
+    """Deadline date from free text: numeric (dd/mm/yyyy, yyyy-mm-dd, ISO timestamps),
+    Hebrew/English month names, Hebrew calendar dates (כ"ה באדר תשפ"ה) and ranges.
+
+    A date after "עד"/"until" wins; otherwise the latest date found (the end of a
+    range). Results are memoised in a bounded LRU cache.
+    """
     if not raw or not raw.strip():
         return None
-    raw = clean_hebrew_text(raw)
-
-    m = re.match(r"^(\d{1,2})[/.-](\d{1,2})[/.-](\d{2,4})$", raw)
-    if m:
-        d, mon, y = int(m.group(1)), int(m.group(2)), int(m.group(3))
-        if y < 100:
-            y += 2000
-        try:
-            return date(y, mon, d)
-        except ValueError:
-            pass
+    return _parse_deadline_cached(raw)
 
-    m = re.match(r"^(\d{4})[/.-](\d{1,2})[/.-](\d{1,2})$", raw)
-    if m:
-        y, mon, d = int(m.group(1)), int(m.group(2)), int(m.group(3))
-        try:
-            return date(y, mon, d)
-        except ValueError:
-            pass
 
-    return None
+def parse_deadlines(raws: Iterable[str | None]) -> list[date | None]:
+    """parse_deadline over many values, parsing each distinct value once."""
+    parsed: dict[str | None, date | None] = {}
+    results = []
+    for raw in raws:
+        if raw not in parsed:
+            parsed[raw] = parse_deadline(raw)
+        results.append(parsed[raw])
+    return results
 
 
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def process_pool(max_workers: int | None = None) -> Any:
+    """ProcessPoolExecutor whose workers start from a forkserver (spawn where that is
+    unavailable), never as a fork of this process: callers run it while fetch and
+    HTTP threads are alive, and forking a multithreaded process is unsafe."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(method))
+
+
+def state_dir() -> Path:
+    """Directory for local run state (FUNDFINDER_STATE_DIR, default <project>/.state). Created on demand."""
+    default = Path(__file__).resolve().parent.parent.parent / ".state"
+    path = Path(os.environ.get("FUNDFINDER_STATE_DIR") or default)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _count_page(url: str, html: str, render_time: float) -> None:
+    """Add a browser-rendered page to the per-host byte count (its HTML, not the wire
+    size) and to the render time metric."""
+    from urllib.parse import urlsplit
+
+    from services.scraper import metrics
+    from services.scraper.http_client import TRANSFER
+
+    host = urlsplit(url).hostname or ""
+    TRANSFER.add(host, len(html.encode("utf-8")))
+    metrics.observe("playwright_render_seconds", render_time, host=host)
+
+
 def load_page_html(
     url: str,
     timeout_ms: int = 30_000,
     source_name: str = "scraper",
 ) -> str | None:
     """Load URL with Playwright (headless), wait for networkidle, return HTML."""
+    # Imported here: Playwright is slow to import and only browser sources need it
+    from playwright.sync_api import sync_playwright
+
     logger = logging.getLogger(__name__)
+    start = time.perf_counter()
     try:
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
@@ -134,12 +368,41 @@ def load_page_html(
                 page = browser.new_page()
                 page.goto(url, timeout=timeout_ms)
                 page.wait_for_load_state("networkidle", timeout=timeout_ms)
-                return page.content()
+                html = page.content()
             finally:
                 browser.close()
     except Exception as e:
         logger.warning("%s: Playwright load failed: %s", source_name, e)
         return None
+    _count_page(url, html, time.perf_counter() - start)
+    return html
+
+
+async def aload_page_html(
+    url: str,
+    timeout_ms: int = 30_000,
+    source_name: str = "scraper",
+) -> str | None:
+    """Async variant of load_page_html (Playwright async API)."""
+    from playwright.async_api import async_playwright
+
+    logger = logging.getLogger(__name__)
+    start = time.perf_counter()
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                page = await browser.new_page()
+                await page.goto(url, timeout=timeout_ms)
+                await page.wait_for_load_state("networkidle", timeout=timeout_ms)
+                html = await page.content()
+            finally:
+                await browser.close()
+    except Exception as e:
+        logger.warning("%s: Playwright load failed: %s", source_name, e)
+        return None
+    _count_page(url, html, time.perf_counter() - start)
+    return html
 
 
 def retry_network(
@@ -148,6 +411,8 @@ def retry_network(
     min_wait: float = 1.0,
     max_wait: float = 10.0,
 ):
+    from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
     excs = exceptions if exceptions else (Exception,)
     return retry(
         stop=stop_after_attempt(attempts),
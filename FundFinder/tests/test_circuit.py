@@ -0,0 +1,48 @@
+"""CircuitBreakerStore: open after repeated failures, half-open probe after the cool-down."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from services.scraper.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreakerStore
+
+
+def test_opens_after_threshold_and_persists(tmp_path) -> None:
+    path = tmp_path / "breakers.json"
+    breakers = CircuitBreakerStore(path, failure_threshold=2)
+    breakers.record_failure("huji")
+    assert breakers.allow("huji")
+    breakers.record_failure("huji")
+    assert breakers.state("huji") == OPEN
+    assert not breakers.allow("huji")
+    assert breakers.allow("mod")
+
+    # A later run (new store) still sees the open circuit
+    assert not CircuitBreakerStore(path, failure_threshold=2).allow("huji")
+
+
+def test_success_resets_failures(tmp_path) -> None:
+    breakers = CircuitBreakerStore(tmp_path / "breakers.json", failure_threshold=2)
+    breakers.record_failure("huji")
+    breakers.record_success("huji")
+    breakers.record_failure("huji")
+    assert breakers.state("huji") == CLOSED
+
+
+def test_half_open_probe_after_cooldown(tmp_path) -> None:
+    breakers = CircuitBreakerStore(tmp_path / "breakers.json", failure_threshold=1, cooldown=timedelta(0))
+    breakers.record_failure("huji")
+    assert breakers.allow("huji")
+    assert breakers.state("huji") == HALF_OPEN
+    # A failed probe reopens at once; a successful one closes
+    breakers.record_failure("huji")
+    assert breakers.state("huji") == OPEN
+    assert breakers.allow("huji")
+    breakers.record_success("huji")
+    assert breakers.state("huji") == CLOSED
+
+
+def test_unreadable_state_file_is_ignored(tmp_path) -> None:
+    path = tmp_path / "breakers.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert CircuitBreakerStore(path).state("huji") == CLOSED
@@ -0,0 +1,54 @@
+"""JSON codec round-trip with every installed backend."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+import pytest
+
+from services.scraper import codec
+
+CODECS = codec.available_codecs()
+
+DOC = {
+    "title": "מלגה לסטודנטים",
+    "amount": 5000,
+    "ratio": 0.5,
+    "open": True,
+    "contact": None,
+    "tags": ["מחקר", "תואר שני"],
+    "nested": {"emoji": "✓", "escape": 'line\nbreak "quoted"'},
+}
+
+
+@pytest.mark.parametrize("name", list(CODECS))
+def test_round_trip(name: str) -> None:
+    c = CODECS[name]
+    text = c.dumps(DOC)
+    assert "מלגה" in text  # non-ASCII kept, not \u-escaped
+    assert c.loads(text) == DOC
+    assert c.loads(text.encode("utf-8")) == DOC
+
+
+@pytest.mark.parametrize("name", list(CODECS))
+def test_bom_whitespace_and_dates(name: str) -> None:
+    c = CODECS[name]
+    assert c.loads(codec.UTF8_BOM + b' \n{"a": [1, 2]}') == {"a": [1, 2]}
+    assert c.loads(memoryview(b'  {"a": 1}')) == {"a": 1}
+    when = datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc)
+    assert c.loads(c.dumps({"d": date(2025, 3, 1), "t": when})) == {
+        "d": "2025-03-01",
+        "t": when.isoformat(),
+    }
+
+
+@pytest.mark.parametrize("name", list(CODECS))
+def test_invalid_input_raises_value_error(name: str) -> None:
+    with pytest.raises(ValueError):
+        CODECS[name].loads(b"{not json")
+
+
+def test_unknown_codec() -> None:
+    with pytest.raises(ValueError):
+        codec.get_codec("yaml")
+    assert codec.is_blank(codec.UTF8_BOM + b" \r\n")
@@ -0,0 +1,61 @@
+"""NearDuplicateIndex: MinHash/LSH grouping of near-identical grants across sources."""
+
+from __future__ import annotations
+
+from services.scraper.dedupe import NearDuplicateIndex, estimated_similarity, grant_text, minhash_signature
+from services.scraper.models import Grant
+from services.scraper.utils import utc_now
+
+TEXT = (
+    "מלגת הצטיינות לסטודנטים לתואר שני במדעי המחשב. גובה המלגה 10,000 ש\"ח לשנה, "
+    "ההגשה עד סוף חודש מרץ דרך מזכירות הפקולטה. המלגה מיועדת לסטודנטים מצטיינים."
+)
+OTHER = "קרן סיוע לחיילי מילואים: מענק חד פעמי לסטודנטים ששירתו מעל 30 יום במהלך שנת הלימודים."
+
+
+def _grant(source: str, n: int, description: str) -> Grant:
+    return Grant(
+        title="מלגת הצטיינות",
+        description=description,
+        source_url=f"https://{source}.example/{n}",
+        source_name=source,
+        content_hash=f"{source}-{n}",
+        fetched_at=utc_now(),
+    )
+
+
+def test_signature_is_deterministic_and_similarity_tracks_overlap() -> None:
+    a = minhash_signature(grant_text(_grant("a", 1, TEXT)))
+    assert a == minhash_signature(grant_text(_grant("b", 1, TEXT)))
+    near = minhash_signature(grant_text(_grant("b", 1, TEXT + " פרטים נוספים")))
+    far = minhash_signature(grant_text(_grant("b", 1, OTHER)))
+    assert estimated_similarity(a, near) > 0.85 > estimated_similarity(a, far)
+
+
+def test_groups_near_duplicates_across_sources_only() -> None:
+    index = NearDuplicateIndex()
+    first = _grant("huji", 1, TEXT)
+    copy = _grant("mod", 7, TEXT + " פרטים נוספים")
+    same_source = _grant("huji", 2, TEXT)
+    unrelated = _grant("mod", 8, OTHER)
+
+    assert index.add(first) == first.source_url
+    assert index.add(copy) == first.source_url
+    assert index.add(same_source) == same_source.source_url
+    assert index.add(unrelated) == unrelated.source_url
+    assert index.groups() == {first.source_url: [copy.source_url]}
+    assert index.added_duplicates() == {copy.source_url}
+
+
+def test_loaded_records_keep_the_grouping() -> None:
+    index = NearDuplicateIndex()
+    first, copy = _grant("huji", 1, TEXT), _grant("mod", 7, TEXT)
+    index.add(first)
+    index.add(copy)
+
+    later = NearDuplicateIndex()
+    later.load(index.records())
+    # Seen in the other order next run: the canonical grant stays the same
+    assert later.add(copy) == first.source_url
+    assert later.add(first) == first.source_url
+    assert later.added_duplicates() == {copy.source_url}
@@ -0,0 +1,72 @@
+"""HujiCheckpoint: header plus append-only details journal."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from services.scraper.sources.huji import checkpoint as checkpoint_module
+from services.scraper.sources.huji.checkpoint import HujiCheckpoint
+
+
+def _listed(path, ids) -> HujiCheckpoint:
+    checkpoint = HujiCheckpoint(path)
+    for sid in ids:
+        checkpoint.add_id(sid)
+    checkpoint.complete_listing()
+    checkpoint.save()
+    return checkpoint
+
+
+def test_round_trip(tmp_path) -> None:
+    path = tmp_path / "huji_checkpoint.json"
+    checkpoint = _listed(path, [1, 2, 3])
+    checkpoint.add_details(1, {"id": 1, "name": "מלגה"})
+    checkpoint.add_details(2, {"id": 2})
+    checkpoint.save()
+
+    loaded = HujiCheckpoint.load(path)
+    assert loaded.listing_complete and loaded.ids == [1, 2, 3]
+    assert loaded.cached(1) == {"id": 1, "name": "מלגה"}
+    assert loaded.cached(3) is None
+
+
+def test_save_appends_only_new_documents(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(checkpoint_module, "SAVE_EVERY", 2)
+    path = tmp_path / "huji_checkpoint.json"
+    checkpoint = _listed(path, [1, 2, 3, 4])
+    header = path.stat().st_mtime_ns
+
+    assert not checkpoint.add_details(1, {"id": 1})
+    assert checkpoint.add_details(2, {"id": 2})
+    checkpoint.save()
+    assert checkpoint.add_details(3, {"id": 3}) is False
+    checkpoint.add_details(4, {"id": 4})
+    checkpoint.save()
+
+    assert len(checkpoint.journal_path.read_text(encoding="utf-8").splitlines()) == 4
+    assert path.stat().st_mtime_ns == header  # listing unchanged: header not rewritten
+
+
+def test_torn_last_line_and_stale_entries_are_dropped(tmp_path) -> None:
+    path = tmp_path / "huji_checkpoint.json"
+    checkpoint = _listed(path, [1, 2])
+    checkpoint.add_details(1, {"id": 1})
+    checkpoint.details[2] = ("2000-01-01T00:00:00+00:00", {"id": 2})
+    checkpoint._unsaved.append(2)
+    checkpoint.save()
+    with checkpoint.journal_path.open("a", encoding="utf-8") as f:
+        f.write('[3,"2099-01-01T0')
+
+    loaded = HujiCheckpoint.load(path, freshness=timedelta(hours=1))
+    assert set(loaded.details) == {1}
+    loaded.save()  # compacts the journal
+    assert len(loaded.journal_path.read_text(encoding="utf-8").splitlines()) == 1
+
+
+def test_clear_removes_both_files(tmp_path) -> None:
+    path = tmp_path / "huji_checkpoint.json"
+    checkpoint = _listed(path, [1])
+    checkpoint.add_details(1, {"id": 1})
+    checkpoint.save()
+    checkpoint.clear()
+    assert not path.exists() and not checkpoint.journal_path.exists()
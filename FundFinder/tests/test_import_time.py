@@ -0,0 +1,72 @@
+"""Import-time regression test for scraper entry points.
+
+Each module in ENTRY_POINTS is imported in a fresh interpreter under
+"python -X importtime". The test fails if a heavy dependency that the entry point
+does not need (Playwright, BeautifulSoup, tenacity) gets imported. Timing depends
+on the machine, so the import time budget is only checked when
+FUNDFINDER_IMPORT_BUDGET_MS is set: the module's cumulative import time (best of
+REPEAT runs) must not exceed it.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("playwright", "bs4", "tenacity")
+
+# Entry point module -> heavy modules it must not import
+ENTRY_POINTS: dict[str, tuple[str, ...]] = {
+    "services.scraper.scrapers": HEAVY_MODULES,
+    "services.scraper.pipeline": HEAVY_MODULES,
+    "services.scraper.sources.huji.scraper": HEAVY_MODULES,
+}
+
+BUDGET_ENV = "FUNDFINDER_IMPORT_BUDGET_MS"
+REPEAT = 3
+
+_LINE_RE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+def import_profile(module: str) -> tuple[float, set[str]]:
+    """(cumulative import time of module in ms, names of all modules imported)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_ms = 0.0
+    imported: set[str] = set()
+    for line in result.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if not m:
+            continue
+        name = m.group(4)
+        imported.add(name)
+        if name == module:
+            cumulative_ms = int(m.group(2)) / 1000
+    return cumulative_ms, imported
+
+
+@pytest.mark.parametrize("module", list(ENTRY_POINTS))
+def test_entry_point_import(module: str) -> None:
+    budget = os.environ.get(BUDGET_ENV)
+    # Repeat only to time the import; the heavy module check needs one run
+    runs = [import_profile(module) for _ in range(REPEAT if budget else 1)]
+    best_ms = min(ms for ms, _ in runs)
+    heavy = sorted(
+        name for name in runs[0][1] if any(name == f or name.startswith(f + ".") for f in ENTRY_POINTS[module])
+    )
+    assert not heavy, f"{module} imports {', '.join(sorted({name.split('.')[0] for name in heavy}))}"
+    if budget:
+        budget_ms = float(budget)
+        assert best_ms <= budget_ms, f"{module} takes {best_ms:.1f} ms to import (budget {budget_ms:.0f} ms)"
@@ -0,0 +1,122 @@
+"""MemoryGrantRepository through DATABASE_URL=memory://: upserts, change feed, facets, run history."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import date, timedelta
+
+import pytest
+
+from backend.db import FacetValue, MemoryGrantRepository, create_tables, get_connection, get_repository
+from backend.db.memory import reset
+from backend.db.repository import DELETE, INSERT, UPDATE
+from services.scraper.models import Grant
+from services.scraper.runstats import CONCURRENT, SEQUENTIAL, ScrapeRun, SourceRun
+from services.scraper.utils import utc_now
+
+
+@pytest.fixture
+def db(monkeypatch):
+    url = f"memory://test-{uuid.uuid4().hex}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    repo = get_repository()
+    assert isinstance(repo, MemoryGrantRepository)
+    with get_connection() as conn:
+        create_tables(conn)
+        yield conn, repo
+    reset(url)
+
+
+def _grant(n: int, source: str = "huji", content: str = "v1", **fields) -> Grant:
+    return Grant(
+        title=f"מלגה {n}",
+        source_url=f"https://example.org/{source}/{n}",
+        source_name=source,
+        content_hash=f"{n}-{content}",
+        fetched_at=utc_now(),
+        **fields,
+    )
+
+
+def test_upsert_many_inserts_and_updates_by_source_url(db) -> None:
+    conn, repo = db
+    assert repo.upsert_many(conn, [_grant(1), _grant(2)]) == 2
+    assert repo.upsert_many(conn, [_grant(2, content="v2", amount="₪5,000")]) == 1
+
+    stored = repo.get_all(conn)
+    assert [g.source_url for g in stored] == ["https://example.org/huji/1", "https://example.org/huji/2"]
+    assert stored[1].amount == "₪5,000"
+    # Another connection to the same URL sees the same database
+    with get_connection() as other:
+        assert len(repo.get_all(other)) == 2
+
+
+def test_upsert_keeps_the_stored_source_name(db) -> None:
+    conn, repo = db
+    repo.upsert_many(conn, [_grant(1)])
+    moved = _grant(1).model_copy(update={"source_name": "mod"})
+    repo.upsert_many(conn, [moved])
+    assert repo.get_by_source(conn, "huji")[0].source_url == moved.source_url
+    assert repo.get_by_source(conn, "mod") == []
+
+
+def test_changes_since_records_content_changes_only(db) -> None:
+    conn, repo = db
+    repo.upsert_many(conn, [_grant(1), _grant(2)])
+    repo.upsert_many(conn, [_grant(1), _grant(2, content="v2")])  # grant 1 unchanged
+    repo.delete_many(conn, [_grant(1).source_url])
+
+    changes = repo.changes_since(conn)
+    assert [(c.cursor, c.change, c.grant_id) for c in changes] == [
+        (1, INSERT, 1),
+        (2, INSERT, 2),
+        (3, UPDATE, 2),
+        (4, DELETE, 1),
+    ]
+    assert [c.cursor for c in repo.changes_since(conn, cursor=2, limit=1)] == [3]
+    assert repo.changes_since(conn, cursor=4) == []
+
+
+def test_get_facets_counts_values_and_deadline_range(db) -> None:
+    conn, repo = db
+    today = date.today()
+    repo.upsert_many(
+        conn,
+        [
+            _grant(1, currency="ILS", deadline=today, extra={"category": "מחקר"}),
+            _grant(2, currency="ILS", deadline=today + timedelta(days=10)),
+            _grant(3, source="mod", extra={"scholarship_type": "מחקר"}),
+        ],
+    )
+
+    facets = repo.get_facets(conn)
+    assert facets["source_name"] == [
+        FacetValue("huji", 2, today, today + timedelta(days=10)),
+        FacetValue("mod", 1, None, None),
+    ]
+    assert facets["currency"] == [FacetValue("ILS", 2, today, today + timedelta(days=10))]
+    assert facets["category"] == [FacetValue("מחקר", 2, today, today)]
+    assert "academic_year" not in facets
+
+
+def _run(mode: str, *sources: tuple[str, float, int], error: str | None = None) -> ScrapeRun:
+    now = utc_now()
+    runs = [SourceRun(name, now, wall_time=t, grants=n, error_class=error) for name, t, n in sources]
+    return ScrapeRun(mode=mode, started_at=now, finished_at=now, sources=runs)
+
+
+def test_record_run_and_source_history(db) -> None:
+    conn, repo = db
+    first = repo.record_run(conn, _run(SEQUENTIAL, ("huji", 10.0, 100), ("mod", 2.0, 5)))
+    repo.record_run(conn, _run(CONCURRENT, ("huji", 1.0, 100)))
+    latest = repo.record_run(conn, _run(SEQUENTIAL, ("huji", 12.0, 90), ("huji", 99.0, 0)))
+
+    history = repo.source_history(conn, SEQUENTIAL, window=10)
+    assert list(history) == ["huji", "mod"]
+    # Newest first, one entry per source and run (the first one recorded)
+    assert [(r.run_id, r.wall_time, r.mode) for r in history["huji"]] == [
+        (latest, 12.0, SEQUENTIAL),
+        (first, 10.0, SEQUENTIAL),
+    ]
+    assert [r.grants for r in history["mod"]] == [5]
+    assert [len(runs) for runs in repo.source_history(conn, SEQUENTIAL, window=1).values()] == [1, 1]
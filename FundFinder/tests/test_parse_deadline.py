@@ -0,0 +1,63 @@
+"""parse_deadline over Hebrew, English, numeric and Hebrew-calendar deadline texts."""
+
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from services.scraper.utils import hebrew_to_gregorian, parse_deadline
+
+CASES = [
+    # Numeric: day-first (Israeli), ISO, two-digit years
+    ("30/06/2025", date(2025, 6, 30)),
+    ("1.3.2025", date(2025, 3, 1)),
+    ("05-04-25", date(2025, 4, 5)),
+    ("2025-06-30", date(2025, 6, 30)),
+    ("2025-06-30T23:59:00+03:00", date(2025, 6, 30)),
+    # Month-first only when day-first is not a valid date
+    ("12/31/2025", date(2025, 12, 31)),
+    ("04/05/2025", date(2025, 5, 4)),
+    ("31/31/2025", None),
+    # Hebrew and English month names
+    ("30 ביוני 2025", date(2025, 6, 30)),
+    ("עד ה-15 במרץ 2026", date(2026, 3, 15)),
+    ("1-15 במרץ 2025", date(2025, 3, 15)),
+    ("June 30, 2025", date(2025, 6, 30)),
+    ("30 June 2025", date(2025, 6, 30)),
+    ("Sept 1st, 2025", date(2025, 9, 1)),
+    # Hebrew calendar
+    ('כ"ה באדר תשפ"ה', date(2025, 3, 25)),
+    ('י"ד באדר ב תשפ"ד', date(2024, 3, 24)),
+    ("15 בניסן ה'תשפ\"ו", date(2026, 4, 2)),
+    ('א\' בתשרי תשפ"ו', date(2025, 9, 23)),
+    ('י"ד באדר ב תשפ"ה', None),  # 5785 is not a leap year
+    # Ranges and markers: the end of a range, or the date after "עד"/"until"
+    ("מ-01/01/2025 עד 31/01/2025", date(2025, 1, 31)),
+    ("until 15/02/2025 (results by 01/04/2025)", date(2025, 2, 15)),
+    # No date
+    ("", None),
+    ("   ", None),
+    (None, None),
+    ("בהתאם להודעה", None),
+]
+
+
+@pytest.mark.parametrize(("raw", "expected"), CASES)
+def test_parse_deadline(raw: str | None, expected: date | None) -> None:
+    assert parse_deadline(raw) == expected
+
+
+@pytest.mark.parametrize(
+    ("hebrew", "gregorian"),
+    [
+        ((5785, 7, 1), date(2024, 10, 3)),  # 1 Tishrei 5785
+        ((5785, 12, 14), date(2025, 3, 14)),  # Purim 5785
+        ((5784, 13, 14), date(2024, 3, 24)),  # Purim 5784 (Adar II)
+        ((5786, 1, 15), date(2026, 4, 2)),  # Pesach 5786
+        ((5785, 13, 1), None),
+        ((5785, 2, 30), None),  # Iyar has 29 days
+    ],
+)
+def test_hebrew_to_gregorian(hebrew: tuple[int, int, int], gregorian: date | None) -> None:
+    assert hebrew_to_gregorian(*hebrew) == gregorian
@@ -0,0 +1,40 @@
+"""SourceProfiler over a block that starts threads."""
+
+from __future__ import annotations
+
+import pstats
+import threading
+
+from services.scraper.profiling import SourceProfiler
+
+
+def _busy_worker(results: list[int]) -> None:
+    results.append(sum(i * i for i in range(20_000)))
+
+
+def test_profile_covers_threads_started_in_block(tmp_path) -> None:
+    profiler = SourceProfiler(tmp_path)
+    results: list[int] = []
+    with profiler.profile("threaded"):
+        threads = [threading.Thread(target=_busy_worker, args=(results,)) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    # Every thread ran its target under the profiler
+    assert len(results) == 3
+    stats = pstats.Stats(str(tmp_path / "threaded.pstats"))
+    calls = {func[2]: timing[1] for func, timing in stats.stats.items()}  # type: ignore[attr-defined]
+    assert calls.get("_busy_worker") == 3
+    assert (tmp_path / "threaded.collapsed").read_text()
+    assert [p.source_name for p in profiler.profiles] == ["threaded"]
+
+
+def test_profile_sampler_collects_stacks(tmp_path) -> None:
+    profiler = SourceProfiler(tmp_path, sample_interval=0.001)
+    with profiler.profile("sampled"):
+        t = threading.Thread(target=_busy_worker, args=([],))
+        t.start()
+        t.join()
+    assert (tmp_path / "summary.json").exists()
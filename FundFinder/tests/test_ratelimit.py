@@ -0,0 +1,80 @@
+"""HostLimiter: AIMD concurrency limit, failure cooldown and Retry-After."""
+
+from __future__ import annotations
+
+import pytest
+
+from services.scraper.ratelimit import (
+    LATENCY_WARMUP,
+    HostLimitConfig,
+    HostLimiter,
+    parse_retry_after,
+)
+
+CONFIG = HostLimitConfig(rate=1000.0, burst=100, initial_concurrency=2.0, max_concurrency=4)
+
+
+def _limiter() -> HostLimiter:
+    return HostLimiter("example.org", CONFIG)
+
+
+def _ok(limiter: HostLimiter, latency: float = 0.1) -> None:
+    limiter.acquire()
+    limiter.release(200, latency)
+
+
+def test_additive_increase_up_to_max_concurrency() -> None:
+    limiter = _limiter()
+    _ok(limiter)
+    assert limiter.limit == pytest.approx(2.5)
+    for _ in range(50):
+        _ok(limiter)
+    assert limiter.limit == CONFIG.max_concurrency
+    assert limiter.in_flight == 0
+
+
+def test_server_error_halves_limit_once_per_window_and_blocks_host() -> None:
+    limiter = _limiter()
+    for _ in range(20):
+        _ok(limiter)
+    limiter.acquire()
+    limiter.acquire()
+    limiter.release(503)
+    limiter.release(500)  # same latency window: no second decrease
+    assert limiter.limit == CONFIG.max_concurrency / 2
+    assert limiter.snapshot()["blocked_for"] > 0
+
+
+def test_retry_after_sets_the_block() -> None:
+    limiter = _limiter()
+    limiter.acquire()
+    limiter.release(429, retry_after="120")
+    assert 119 < limiter.snapshot()["blocked_for"] <= 120
+
+
+def test_latency_spike_counts_as_congestion_after_warmup() -> None:
+    limiter = _limiter()
+    for _ in range(LATENCY_WARMUP):
+        _ok(limiter, latency=0.1)
+    before = limiter.limit
+    _ok(limiter, latency=5.0)
+    assert limiter.limit == max(1.0, before / 2)
+    # Slow responses do not feed the latency baseline
+    assert limiter.latency_ewma == pytest.approx(0.1)
+    assert limiter.snapshot()["blocked_for"] == 0
+
+
+def test_cancel_frees_the_slot_without_adapting() -> None:
+    limiter = _limiter()
+    limiter.acquire()
+    limiter.cancel()
+    assert limiter.in_flight == 0
+    assert limiter.limit == CONFIG.initial_concurrency
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("30", 30.0), ("100000", 300.0), ("", None), ("soon", None)],
+)
+def test_parse_retry_after(value: str, expected: float | None) -> None:
+    assert parse_retry_after(value) == expected
@@ -0,0 +1,47 @@
+"""find_anomalies: errors, slowdowns and yield changes against each source's history."""
+
+from __future__ import annotations
+
+from services.scraper.runstats import SourceRun, find_anomalies
+from services.scraper.utils import utc_now
+
+
+def _runs(*runs: tuple[float, int] | str) -> list[SourceRun]:
+    """SourceRuns newest first from (wall_time, grants) pairs or an error class name."""
+    now = utc_now()
+    return [
+        SourceRun("huji", now, error_class=r, run_id=i)
+        if isinstance(r, str)
+        else SourceRun("huji", now, wall_time=r[0], grants=r[1], run_id=i)
+        for i, r in enumerate(runs, 1)
+    ]
+
+
+def _kinds(history: dict[str, list[SourceRun]], **kwargs) -> list[tuple[str, str]]:
+    return [(a.source_name, a.kind) for a in find_anomalies(history, **kwargs)]
+
+
+def test_healthy_run_has_no_anomalies() -> None:
+    assert _kinds({"huji": _runs((11, 95), (10, 100), (12, 90), (10, 100))}) == []
+
+
+def test_error_is_reported_alone() -> None:
+    anomalies = find_anomalies({"huji": _runs("ReadTimeout", (10, 100), (10, 100), (10, 100))})
+    assert [(a.kind, a.run_id, a.detail) for a in anomalies] == [("error", 1, "failed with ReadTimeout")]
+
+
+def test_slowdown_and_yield_drop_against_median() -> None:
+    anomalies = find_anomalies({"huji": _runs((25, 40), (10, 100), (12, 90), (9, 110))})
+    assert [(a.kind, a.value, a.baseline) for a in anomalies] == [("slow", 25, 10), ("yield", 40, 100)]
+
+
+def test_failed_runs_stay_out_of_the_baseline() -> None:
+    # Two healthy older runs only: below MIN_BASELINE_RUNS, so no timing baseline
+    history = {"huji": _runs((50, 100), "HTTPError", (10, 100), "HTTPError", (10, 100))}
+    assert _kinds(history) == []
+
+
+def test_expected_size_stands_in_until_enough_history() -> None:
+    history = {"huji": _runs((10, 20), (10, 20)), "mod": _runs((1, 5))}
+    assert _kinds(history, expected_sizes={"huji": 100, "mod": None}) == [("huji", "yield")]
+    assert _kinds(history, expected_sizes={"huji": 100}, min_runs=1) == []
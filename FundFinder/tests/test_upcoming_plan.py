@@ -0,0 +1,104 @@
+"""GrantRepository.upcoming() must be served by index-only scans of its partial covering indexes.
+
+Needs PostgreSQL at DATABASE_URL (default postgresql://localhost:5432/fundfinder);
+skipped when none is reachable. The schema is created in a throwaway schema that is
+the session's only search_path entry and is dropped afterwards, so the database's
+own tables are never touched. Synthetic grants (some without a deadline) are loaded
+and vacuumed first: index-only scans need the visibility map.
+"""
+
+from __future__ import annotations
+
+import io
+import random
+import uuid
+from datetime import date, timedelta
+
+import psycopg2
+import pytest
+
+from backend.db import GrantRepository, create_tables
+from backend.db.connection import get_database_url, is_memory_database
+from backend.db.repository import _upcoming_query
+
+ROWS = 20_000
+SOURCES = ["huji", "mod", "reichman", "government_miluim"]
+
+
+def _row(i: int, rng: random.Random, today: date) -> str:
+    deadline = "\\N" if rng.random() < 0.3 else (today + timedelta(days=rng.randint(-200, 400))).isoformat()
+    fields = [
+        f"מלגה {i}",
+        f"https://bench.example/grant/{i}",
+        rng.choice(SOURCES),
+        deadline,
+        f"{i:064x}",
+        "2025-01-01T00:00:00+00:00",
+    ]
+    return "\t".join(fields) + "\n"
+
+
+@pytest.fixture(scope="module")
+def conn():
+    if is_memory_database():
+        pytest.skip("DATABASE_URL selects the in-memory backend")
+    try:
+        conn = psycopg2.connect(get_database_url(), connect_timeout=3)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"PostgreSQL not reachable: {e}")
+    schema = f"fundfinder_test_{uuid.uuid4().hex[:12]}"
+    try:
+        conn.autocommit = True  # VACUUM cannot run inside a transaction block
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE SCHEMA {schema}")
+            cur.execute(f"SET search_path TO {schema}")
+        create_tables(conn)
+        rng = random.Random(42)
+        today = date.today()
+        buf = io.StringIO("".join(_row(i, rng, today) for i in range(ROWS)))
+        with conn.cursor() as cur:
+            cur.copy_expert(
+                "COPY grants (title, source_url, source_name, deadline, content_hash, fetched_at) FROM STDIN",
+                buf,
+            )
+            cur.execute("VACUUM ANALYZE grants")
+        yield conn
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        conn.close()
+
+
+def _explain(conn, *args) -> str:
+    """EXPLAIN (ANALYZE) output for the query GrantRepository.upcoming() runs with args."""
+    sql, params = _upcoming_query(*args)
+    with conn.cursor() as cur:
+        cur.execute("EXPLAIN (ANALYZE, COSTS OFF) " + sql, params)
+        return "\n".join(row[0] for row in cur.fetchall())
+
+
+def _assert_index_only(plan: str, index: str) -> None:
+    assert f"Index Only Scan using {index}" in plan, plan
+    assert "Heap Fetches: 0" in plan, plan
+
+
+def test_upcoming_uses_upcoming_index(conn) -> None:
+    today = date.today()
+    plan = _explain(conn, today, today + timedelta(days=30), None, 20, None)
+    _assert_index_only(plan, "idx_grants_upcoming")
+
+
+def test_upcoming_by_source_uses_source_index(conn) -> None:
+    today = date.today()
+    plan = _explain(conn, today, today + timedelta(days=30), "huji", 20, None)
+    _assert_index_only(plan, "idx_grants_source_upcoming")
+
+
+def test_upcoming_next_page_uses_upcoming_index(conn) -> None:
+    repo = GrantRepository()
+    today = date.today()
+    window = today + timedelta(days=30)
+    first_page = repo.upcoming(conn, today, window, limit=20)
+    assert first_page
+    plan = _explain(conn, today, window, None, 20, first_page[-1].cursor)
+    _assert_index_only(plan, "idx_grants_upcoming")